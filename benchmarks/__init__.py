@@ -0,0 +1,7 @@
+"""
+Benchmarks for the hot paths of nn, run with ``python -m benchmarks run`` from the repository root.
+
+The corpus is synthetic and deterministic (see :mod:`benchmarks.corpus`), so the JSON results
+of different runs can be compared. ``python -m benchmarks check`` fails when the hot paths
+regressed compared to ``benchmarks/baseline.json`` (see :mod:`benchmarks.gate`).
+"""
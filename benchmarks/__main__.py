@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import click
+
+from nn import term
+from nn.utils import format_bytes
+
+from .corpus import CorpusSpec, generate_corpus
+from .gate import (
+    BASELINE_FILE,
+    DEFAULT_THRESHOLD,
+    GATE_PATTERNS,
+    ComparisonStatus,
+    compare_results,
+    environment_mismatch,
+    format_comparisons,
+)
+from .runner import BenchmarkResult, environment_info, read_results, run_benchmarks, write_results
+from .suite import Benchmark, select_benchmarks
+
+console = term.get_console()
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+DEFAULT_CORPUS_DIR = Path(tempfile.gettempdir()) / "nnbench-corpus"
+
+
+def corpus_options(func):
+    func = click.option(
+        "--corpus-dir",
+        "corpus_dir",
+        type=click.Path(file_okay=False, path_type=Path),
+        default=DEFAULT_CORPUS_DIR,
+        show_default=True,
+        help="Where the synthetic corpus is generated, reused when generated with the same options",
+    )(func)
+    func = click.option("--volumes", type=click.IntRange(min=1), default=2, show_default=True)(func)
+    func = click.option("--chapters", type=click.IntRange(min=1), default=4, show_default=True, help="Per volume")(func)
+    func = click.option("--pages", type=click.IntRange(min=1), default=10, show_default=True, help="Per chapter")(func)
+    func = click.option("--width", type=click.IntRange(min=100), default=1200, show_default=True)(func)
+    func = click.option("--height", type=click.IntRange(min=100), default=1700, show_default=True)(func)
+    func = click.option("--seed", type=int, default=1337, show_default=True)(func)
+    return func
+
+
+def _make_spec(volumes: int, chapters: int, pages: int, width: int, height: int, seed: int) -> CorpusSpec:
+    return CorpusSpec(
+        volumes=volumes, chapters_per_volume=chapters, pages_per_chapter=pages, width=width, height=height, seed=seed
+    )
+
+
+def _format_result(result: BenchmarkResult) -> str:
+    if result.failed:
+        return f"{result.name:<36} failed: {result.error}"
+    text = f"{result.name:<36} {result.median * 1000:10.2f} ms  {result.items_per_second:10.1f} {result.unit}/s"
+    if result.size > 0:
+        text += f"  {format_bytes(result.bytes_per_second)}/s"
+    return text
+
+
+@click.group(context_settings=CONTEXT_SETTINGS)
+def cli():
+    """Benchmarks for nn"""
+
+
+@cli.command("list")
+@click.argument("patterns", nargs=-1)
+def list_benchmarks(patterns: Tuple[str, ...]):
+    """List the benchmarks, optionally filtered by glob patterns"""
+    for bench in select_benchmarks(patterns):
+        console.info(f"{bench.name:<36} {bench.description}")
+
+
+@cli.command("corpus")
+@corpus_options
+@click.option("--force", is_flag=True, default=False, help="Regenerate even if the corpus already exist")
+def make_corpus(
+    corpus_dir: Path, volumes: int, chapters: int, pages: int, width: int, height: int, seed: int, force: bool
+):
+    """Only generate the synthetic corpus"""
+    spec = _make_spec(volumes, chapters, pages, width, height, seed)
+    corpus = generate_corpus(corpus_dir, spec, force=force)
+    console.info(f"Corpus at {corpus.root}: {corpus.total_pages} pages, {format_bytes(corpus.total_size)}")
+
+
+def _run_quiet(benchmarks: List[Benchmark], spec: CorpusSpec, corpus_dir: Path, repeat: int, warmup: int):
+    console.status("Generating corpus...")
+    corpus = generate_corpus(corpus_dir, spec)
+    console.stop_status(f"Corpus at {corpus.root}: {corpus.total_pages} pages, {format_bytes(corpus.total_size)}")
+
+    def _print_result(result: BenchmarkResult):
+        console.console.quiet = False
+        console.info(_format_result(result))
+        console.console.quiet = True
+
+    # The commands are noisy, only the results are shown
+    console.console.quiet = True
+    try:
+        return run_benchmarks(benchmarks, corpus, repeat, warmup, on_result=_print_result)
+    finally:
+        console.console.quiet = False
+
+
+def _select_or_fail(patterns: Sequence[str]) -> List[Benchmark]:
+    benchmarks = select_benchmarks(patterns)
+    if not benchmarks:
+        raise click.ClickException("No benchmarks matched")
+    return benchmarks
+
+
+@cli.command("run")
+@click.argument("patterns", nargs=-1)
+@corpus_options
+@click.option("-r", "--repeat", type=click.IntRange(min=1), default=5, show_default=True, help="Timed runs")
+@click.option("-w", "--warmup", type=click.IntRange(min=0), default=1, show_default=True, help="Untimed runs")
+@click.option(
+    "-o",
+    "--output",
+    "output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the results as JSON to this file",
+)
+def run(
+    patterns: Tuple[str, ...],
+    corpus_dir: Path,
+    volumes: int,
+    chapters: int,
+    pages: int,
+    width: int,
+    height: int,
+    seed: int,
+    repeat: int,
+    warmup: int,
+    output: Optional[Path],
+):
+    """Run the benchmarks matching the glob patterns (e.g. `archive.*`), or all of them"""
+    benchmarks = _select_or_fail(patterns)
+    spec = _make_spec(volumes, chapters, pages, width, height, seed)
+    results = _run_quiet(benchmarks, spec, corpus_dir, repeat, warmup)
+
+    if output is not None:
+        write_results(output, results, spec, repeat, warmup)
+        console.info(f"Results written to {output}")
+
+
+@cli.command("check")
+@click.argument("patterns", nargs=-1)
+@click.option(
+    "--baseline",
+    "baseline_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=BASELINE_FILE,
+    show_default=True,
+    help="The baseline to compare to",
+)
+@click.option(
+    "--corpus-dir",
+    "corpus_dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=DEFAULT_CORPUS_DIR,
+    show_default=True,
+    help="Where the synthetic corpus is generated, the corpus options are taken from the baseline",
+)
+@click.option(
+    "-t",
+    "--threshold",
+    "threshold",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_THRESHOLD * 100,
+    show_default=True,
+    help="Slowdown in percent that is considered a regression, unless the baseline override it",
+)
+@click.option("-r", "--repeat", type=click.IntRange(min=1), default=9, show_default=True, help="Timed runs")
+@click.option("-w", "--warmup", type=click.IntRange(min=0), default=1, show_default=True, help="Untimed runs")
+@click.option(
+    "--results",
+    "results_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Compare this results file (from `run -o`) instead of running the benchmarks",
+)
+@click.option(
+    "-o",
+    "--output",
+    "output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the current results as JSON to this file",
+)
+@click.pass_context
+def check(
+    ctx: click.Context,
+    patterns: Tuple[str, ...],
+    baseline_file: Path,
+    corpus_dir: Path,
+    threshold: float,
+    repeat: int,
+    warmup: int,
+    results_file: Optional[Path],
+    output: Optional[Path],
+):
+    """Fail when the hot-path benchmarks regressed compared to the baseline"""
+    benchmarks = _select_or_fail(patterns or GATE_PATTERNS)
+    baseline = read_results(baseline_file)
+
+    if results_file is not None:
+        current_file = read_results(results_file)
+        if current_file.corpus != baseline.corpus:
+            raise click.ClickException(f"{results_file} was not run with the same corpus as the baseline")
+        current = current_file.results
+        current_environment = current_file.environment
+    else:
+        results = _run_quiet(benchmarks, baseline.corpus, corpus_dir, repeat, warmup)
+        if output is not None:
+            write_results(output, results, baseline.corpus, repeat, warmup)
+            console.info(f"Results written to {output}")
+        current = {result.name: result for result in results}
+        current_environment = environment_info()
+
+    for mismatch in environment_mismatch(baseline, current_environment):
+        console.warning(f"Baseline was recorded in a different environment ({mismatch})")
+
+    selected = [bench.name for bench in benchmarks]
+    comparisons = compare_results(baseline, current, threshold / 100, only=selected)
+    console.enter()
+    for line in format_comparisons(comparisons):
+        console.console.print(line, markup=False, highlight=False)
+    console.enter()
+
+    regressed = [comparison for comparison in comparisons if comparison.status == ComparisonStatus.regressed]
+    # Only a benchmark that worked in the baseline is broken, the others can't be compared anyway
+    failed = [
+        comparison
+        for comparison in comparisons
+        if comparison.status == ComparisonStatus.failed and comparison.baseline is not None
+    ]
+    for comparison in comparisons:
+        if comparison.status == ComparisonStatus.failed and comparison.baseline is None:
+            console.warning(f"{comparison.name} failed and is not in the baseline, it is not gated")
+    if failed:
+        console.error(f"{len(failed)} benchmark(s) in the baseline failed to run!")
+    if regressed:
+        console.error(
+            f"{len(regressed)} benchmark(s) regressed! If the slowdown is expected, "
+            "update the baseline with `python -m benchmarks baseline` and commit it."
+        )
+    if failed or regressed:
+        ctx.exit(1)
+    console.info(f"No regression found in {len(comparisons)} benchmarks")
+
+
+def _without_failed(results: List[BenchmarkResult]) -> List[BenchmarkResult]:
+    for result in results:
+        if result.failed:
+            console.warning(f"{result.name} failed, it is left out of the baseline: {result.error}")
+    return [result for result in results if not result.failed]
+
+
+@cli.command("baseline")
+@click.argument("patterns", nargs=-1)
+@corpus_options
+@click.option(
+    "--baseline",
+    "baseline_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=BASELINE_FILE,
+    show_default=True,
+    help="The baseline file to write",
+)
+@click.option("-r", "--repeat", type=click.IntRange(min=1), default=9, show_default=True, help="Timed runs")
+@click.option("-w", "--warmup", type=click.IntRange(min=0), default=1, show_default=True, help="Untimed runs")
+@click.option(
+    "--results",
+    "results_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Use this results file (from `run -o`) as the new baseline instead of running the benchmarks",
+)
+def baseline(
+    patterns: Tuple[str, ...],
+    corpus_dir: Path,
+    volumes: int,
+    chapters: int,
+    pages: int,
+    width: int,
+    height: int,
+    seed: int,
+    baseline_file: Path,
+    repeat: int,
+    warmup: int,
+    results_file: Optional[Path],
+):
+    """Record a new baseline for the hot-path benchmarks (or the glob patterns)"""
+    # The per benchmark thresholds are written by hand, keep them
+    thresholds = read_results(baseline_file).thresholds if baseline_file.exists() else {}
+
+    if results_file is not None:
+        results_data = read_results(results_file)
+        write_results(
+            baseline_file,
+            _without_failed(list(results_data.results.values())),
+            results_data.corpus,
+            results_data.repeat,
+            results_data.warmup,
+            thresholds=thresholds,
+            environment=results_data.environment,
+        )
+        benchmark_count = len(results_data.results)
+    else:
+        benchmarks = _select_or_fail(patterns or GATE_PATTERNS)
+        spec = _make_spec(volumes, chapters, pages, width, height, seed)
+        results = _without_failed(_run_quiet(benchmarks, spec, corpus_dir, repeat, warmup))
+        write_results(baseline_file, results, spec, repeat, warmup, thresholds=thresholds)
+        benchmark_count = len(results)
+    console.info(f"Baseline of {benchmark_count} benchmarks written to {baseline_file}, review and commit it")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,346 @@
+"""
+Deterministic synthetic manga corpus.
+
+The same spec always produce the same pages (pixel for pixel) and the same filenames,
+so the benchmark results of two runs or two machines can be compared. The archives are
+byte for byte identical too, except the 7z one since py7zr always store the current time.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import random
+import shutil
+import tarfile
+import zipfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import py7zr
+from PIL import Image, ImageDraw
+
+from nn.cli.constants import M_PUBLICATION_TYPES
+from nn.common import ChapterRange, format_archive_filename, format_daiz_like_filename
+from nn.templates.epub import EPUB_CONTAINER, EPUB_CONTENT, EPUB_PAGE, EPUB_STYLES
+from nn.utils import secure_filename
+
+__all__ = (
+    "CORPUS_VERSION",
+    "VOLUME_FORMATS",
+    "CorpusSpec",
+    "Corpus",
+    "SyntheticPage",
+    "render_page",
+    "iter_volume_pages",
+    "generate_corpus",
+)
+
+# Bump this when the generated content change, so the cached corpus is regenerated
+CORPUS_VERSION = 1
+VOLUME_FORMATS = ("folder", "cbz", "cb7", "cbr", "cbt")
+_MANIFEST_NAME = "corpus.json"
+# Fixed timestamp so the archive bytes does not depend on when the corpus is generated
+_FIXED_DATE_TIME = (2023, 1, 1, 0, 0, 0)
+_FIXED_MTIME = 1672531200
+
+
+@dataclass
+class CorpusSpec:
+    title: str = "Synthetic Manga"
+    publisher: str = "Synthetic Publisher"
+    credit: str = "nnbench"
+    year: int = 2023
+    volumes: int = 2
+    chapters_per_volume: int = 4
+    pages_per_chapter: int = 10
+    width: int = 1200
+    height: int = 1700
+    # Every n-th page is a PNG, the rest are JPEG (0 to only use JPEG)
+    png_every: int = 4
+    jpeg_quality: int = 90
+    seed: int = 1337
+
+    @property
+    def pages_per_volume(self) -> int:
+        return self.chapters_per_volume * self.pages_per_chapter
+
+    def chapter_number(self, volume: int, chapter: int) -> int:
+        return (volume - 1) * self.chapters_per_volume + chapter
+
+    def volume_name(self, volume: int) -> str:
+        return format_archive_filename(
+            m_title=self.title,
+            m_year=self.year,
+            publication_type=M_PUBLICATION_TYPES["digital"],
+            rip_credit=self.credit,
+            bracket_type="square",
+            m_volume_text=f"v{volume:02d}",
+        )
+
+
+@dataclass
+class SyntheticPage:
+    volume: int
+    chapter: int
+    page: int
+    filename: str
+    seed: int
+
+    @property
+    def extension(self) -> str:
+        return self.filename.rsplit(".", 1)[-1]
+
+
+@dataclass
+class Corpus:
+    root: Path
+    spec: CorpusSpec
+    # format -> volume number -> path
+    volumes: Dict[str, Dict[int, Path]] = field(default_factory=dict)
+    chapters: List[Path] = field(default_factory=list)
+    epub_folder: Optional[Path] = None
+    total_pages: int = 0
+    total_size: int = 0
+
+    def volume(self, volume_format: str, volume: int = 1) -> Path:
+        return self.volumes[volume_format][volume]
+
+
+def iter_volume_pages(spec: CorpusSpec, volume: int) -> Iterator[SyntheticPage]:
+    """Yield the pages of a volume, named like the output of `nn releases`."""
+    digital = M_PUBLICATION_TYPES["digital"]
+    page_number = 0
+    for chapter in range(1, spec.chapters_per_volume + 1):
+        chapter_number = spec.chapter_number(volume, chapter)
+        chapter_info = ChapterRange(chapter_number, f"Chapter {chapter_number}")
+        for _ in range(spec.pages_per_chapter):
+            image_name, _ = format_daiz_like_filename(
+                m_title=spec.title,
+                m_publisher=spec.publisher,
+                m_year=spec.year,
+                chapter_info=chapter_info,
+                page_number=f"{page_number:03d}",
+                publication_type=digital,
+                rip_credit=spec.credit,
+                bracket_type="square",
+                m_volume=volume,
+            )
+            is_png = spec.png_every > 0 and page_number % spec.png_every == spec.png_every - 1
+            extension = "png" if is_png else "jpg"
+            yield SyntheticPage(
+                volume=volume,
+                chapter=chapter_number,
+                page=page_number,
+                filename=f"{image_name}.{extension}",
+                seed=spec.seed * 1_000_003 + volume * 10_007 + page_number,
+            )
+            page_number += 1
+
+
+def render_page(spec: CorpusSpec, page: SyntheticPage) -> bytes:
+    """Draw a page that roughly looks like a manga page: white paper, panels, line art and screentone."""
+    rng = random.Random(page.seed)
+    width, height = spec.width, spec.height
+    im = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(im)
+
+    margin = width // 20
+    rows = rng.randint(2, 4)
+    row_edges = sorted(rng.sample(range(margin * 2, height - margin * 2), rows - 1))
+    row_edges = [margin] + row_edges + [height - margin]
+    for top, bottom in zip(row_edges, row_edges[1:]):
+        columns = rng.randint(1, 3)
+        col_edges = sorted(rng.sample(range(margin * 2, width - margin * 2), columns - 1))
+        col_edges = [margin] + col_edges + [width - margin]
+        for left, right in zip(col_edges, col_edges[1:]):
+            panel = (left + 6, top + 6, right - 6, bottom - 6)
+            if panel[2] - panel[0] < 20 or panel[3] - panel[1] < 20:
+                continue
+            draw.rectangle(panel, outline=0, width=4)
+            if rng.random() < 0.4:
+                # Screentone, the worst case for the compressor
+                tone = rng.randint(120, 220)
+                step = rng.choice((4, 6, 8))
+                tone_points = [
+                    (x, y)
+                    for y in range(panel[1] + 4, panel[3] - 4, step)
+                    for x in range(panel[0] + 4 + (y // step % 2) * (step // 2), panel[2] - 4, step)
+                ]
+                draw.point(tone_points, fill=tone)
+            for _ in range(rng.randint(5, 20)):
+                points = [
+                    (rng.randint(panel[0], panel[2]), rng.randint(panel[1], panel[3])) for _ in range(rng.randint(2, 5))
+                ]
+                draw.line(points, fill=rng.randint(0, 80), width=rng.randint(1, 4))
+            if rng.random() < 0.5:
+                bubble_w = min(panel[2] - panel[0], rng.randint(80, 200))
+                bubble_h = min(panel[3] - panel[1], rng.randint(60, 160))
+                bubble_x = rng.randint(panel[0], panel[2] - bubble_w)
+                bubble_y = rng.randint(panel[1], panel[3] - bubble_h)
+                draw.ellipse(
+                    (bubble_x, bubble_y, bubble_x + bubble_w, bubble_y + bubble_h), fill=255, outline=0, width=2
+                )
+
+    output = io.BytesIO()
+    if page.extension == "png":
+        im.save(output, format="PNG", optimize=False)
+    else:
+        im.save(output, format="JPEG", quality=spec.jpeg_quality)
+    return output.getvalue()
+
+
+def _zip_info(name: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=_FIXED_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def _write_zip(target: Path, pages: List[Tuple[str, bytes]]):
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for name, data in pages:
+            zip_file.writestr(_zip_info(name), data)
+
+
+def _write_tar(target: Path, pages: List[Tuple[str, bytes]]):
+    with tarfile.open(target, "w") as tar_file:
+        for name, data in pages:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = _FIXED_MTIME
+            tar_file.addfile(info, io.BytesIO(data))
+
+
+def _write_7z(target: Path, pages: List[Tuple[str, bytes]]):
+    with py7zr.SevenZipFile(target, "w") as sevenzip_file:
+        for name, data in pages:
+            sevenzip_file.writestr(data, name)
+
+
+def _write_volume(volume_format: str, target: Path, pages: List[Tuple[str, bytes]]):
+    if volume_format == "folder":
+        target.mkdir(parents=True, exist_ok=True)
+        for name, data in pages:
+            (target / name).write_bytes(data)
+    elif volume_format == "cbz":
+        _write_zip(target, pages)
+    elif volume_format == "cbr":
+        # rar can only be created with the proprietary tool, most .cbr found in the wild
+        # are a renamed zip anyway, which go through the extension-less detection.
+        _write_zip(target, pages)
+    elif volume_format == "cb7":
+        _write_7z(target, pages)
+    elif volume_format == "cbt":
+        _write_tar(target, pages)
+    else:
+        raise ValueError(f"Unknown volume format: {volume_format}")
+
+
+def _write_epub_folder(target: Path, spec: CorpusSpec, pages: List[Tuple[str, bytes]]):
+    """An extracted EPUB, the input of `nn packepub`."""
+    (target / "META-INF").mkdir(parents=True, exist_ok=True)
+    (target / "OEBPS" / "Images").mkdir(parents=True, exist_ok=True)
+    (target / "OEBPS" / "Text").mkdir(parents=True, exist_ok=True)
+    (target / "OEBPS" / "Styles").mkdir(parents=True, exist_ok=True)
+    (target / "mimetype").write_bytes(b"application/epub+zip")
+    (target / "META-INF" / "container.xml").write_text(EPUB_CONTAINER, encoding="utf-8")
+    (target / "OEBPS" / "Styles" / "styles.css").write_text(EPUB_STYLES, encoding="utf-8")
+    for number, (name, data) in enumerate(pages, 1):
+        image_name = f"page_{number:03d}.{name.rsplit('.', 1)[-1]}"
+        (target / "OEBPS" / "Images" / image_name).write_bytes(data)
+        page_xhtml = EPUB_PAGE.format(
+            title=f"{spec.title} - Page #{number}", filename=image_name, width=spec.width, height=spec.height
+        )
+        (target / "OEBPS" / "Text" / f"page_{number:03d}.xhtml").write_text(page_xhtml, encoding="utf-8")
+    content_opf = EPUB_CONTENT.format(title=spec.title, identifier="nnbench", time=_FIXED_MTIME)
+    (target / "OEBPS" / "content.opf").write_text(content_opf, encoding="utf-8")
+
+
+def _load_manifest(root: Path, spec: CorpusSpec) -> Optional[Corpus]:
+    manifest_file = root / _MANIFEST_NAME
+    if not manifest_file.exists():
+        return None
+    try:
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+    if manifest.get("version") != CORPUS_VERSION or manifest.get("spec") != asdict(spec):
+        return None
+    corpus = Corpus(root, spec, total_pages=manifest["total_pages"], total_size=manifest["total_size"])
+    for volume_format, volumes in manifest["volumes"].items():
+        corpus.volumes[volume_format] = {int(volume): root / rel_path for volume, rel_path in volumes.items()}
+    corpus.chapters = [root / rel_path for rel_path in manifest["chapters"]]
+    corpus.epub_folder = root / manifest["epub_folder"]
+    all_paths = [corpus.epub_folder, *corpus.chapters]
+    for volumes in corpus.volumes.values():
+        all_paths.extend(volumes.values())
+    if not all(path.exists() for path in all_paths):
+        return None
+    return corpus
+
+
+def _write_manifest(corpus: Corpus):
+    manifest = {
+        "version": CORPUS_VERSION,
+        "spec": asdict(corpus.spec),
+        "total_pages": corpus.total_pages,
+        "total_size": corpus.total_size,
+        "volumes": {
+            volume_format: {str(volume): path.relative_to(corpus.root).as_posix() for volume, path in volumes.items()}
+            for volume_format, volumes in corpus.volumes.items()
+        },
+        "chapters": [path.relative_to(corpus.root).as_posix() for path in corpus.chapters],
+        "epub_folder": corpus.epub_folder.relative_to(corpus.root).as_posix(),
+    }
+    (corpus.root / _MANIFEST_NAME).write_text(json.dumps(manifest, indent=4), encoding="utf-8")
+
+
+def generate_corpus(root: Path, spec: Optional[CorpusSpec] = None, force: bool = False) -> Corpus:
+    """
+    Generate the corpus in the root folder, or reuse it if it was already generated with the same spec.
+
+    Layout::
+
+        volumes/<format>/<Title vXX (Year) (Digital) [credit]>[.cbz|.cb7|.cbr|.cbt]
+        chapters/<001 - Chapter 1>.cbz  (volume 1 only, like the output of `nn autosplit`)
+        epub/  (volume 1 as an extracted EPUB)
+    """
+    spec = spec or CorpusSpec()
+    root = root.absolute()
+    if not force:
+        corpus = _load_manifest(root, spec)
+        if corpus is not None:
+            return corpus
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    corpus = Corpus(root, spec, volumes={volume_format: {} for volume_format in VOLUME_FORMATS})
+    for volume in range(1, spec.volumes + 1):
+        pages = [(page.filename, render_page(spec, page)) for page in iter_volume_pages(spec, volume)]
+        corpus.total_pages += len(pages)
+        corpus.total_size += sum(len(data) for _, data in pages)
+        volume_name = spec.volume_name(volume)
+        for volume_format in VOLUME_FORMATS:
+            format_dir = root / "volumes" / volume_format
+            format_dir.mkdir(parents=True, exist_ok=True)
+            target = format_dir / (volume_name if volume_format == "folder" else f"{volume_name}.{volume_format}")
+            _write_volume(volume_format, target, pages)
+            corpus.volumes[volume_format][volume] = target
+
+        if volume != 1:
+            continue
+        chapters_dir = root / "chapters"
+        chapters_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(spec.chapters_per_volume):
+            chapter_number = spec.chapter_number(volume, index + 1)
+            chapter_pages = pages[index * spec.pages_per_chapter : (index + 1) * spec.pages_per_chapter]
+            target = chapters_dir / f"{secure_filename(f'{chapter_number:03d} - Chapter {chapter_number}')}.cbz"
+            _write_zip(target, chapter_pages)
+            corpus.chapters.append(target)
+        corpus.epub_folder = root / "epub" / spec.volume_name(volume)
+        _write_epub_folder(corpus.epub_folder, spec, pages)
+
+    _write_manifest(corpus)
+    return corpus
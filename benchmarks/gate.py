@@ -0,0 +1,158 @@
+"""
+Performance regression gate.
+
+Compare the hot-path benchmarks to the committed baseline (``benchmarks/baseline.json``),
+a benchmark regress when its median is slower than the threshold *and* the confidence
+intervals of the two medians do not overlap, so a noisy run does not fail the gate.
+A benchmark of the baseline that raise fails the gate too.
+The baseline is only updated explicitly with ``python -m benchmarks baseline``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .runner import BenchmarkResult, ResultsFile
+
+__all__ = (
+    "BASELINE_FILE",
+    "GATE_PATTERNS",
+    "DEFAULT_THRESHOLD",
+    "ComparisonStatus",
+    "Comparison",
+    "compare_results",
+    "environment_mismatch",
+    "format_comparisons",
+)
+
+BASELINE_FILE = Path(__file__).absolute().parent / "baseline.json"
+# Archive read, compression and naming, the paths every release goes through.
+# cb7 (LZMA) takes seconds per run and is left out, run it with `python -m benchmarks check export.cb7`
+GATE_PATTERNS = ("archive.iter.*", "export.cbz", "export.epub", "naming.*")
+DEFAULT_THRESHOLD = 0.10
+_COMPARED_ENVIRONMENT = ("python", "implementation", "machine", "cpu_count")
+
+
+class ComparisonStatus(str, Enum):
+    ok = "ok"
+    regressed = "REGRESSED"
+    improved = "improved"
+    new = "new"
+    missing = "missing"
+    failed = "FAILED"
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: Optional[BenchmarkResult]
+    current: Optional[BenchmarkResult]
+    threshold: float
+
+    @property
+    def change(self) -> Optional[float]:
+        """Relative change of the median time, positive is slower."""
+        if self.baseline is None or self.current is None or self.current.failed or self.baseline.median <= 0:
+            return None
+        return self.current.median / self.baseline.median - 1
+
+    @property
+    def status(self) -> ComparisonStatus:
+        if self.current is not None and self.current.failed:
+            return ComparisonStatus.failed
+        if self.baseline is None:
+            return ComparisonStatus.new
+        if self.current is None:
+            return ComparisonStatus.missing
+        change = self.change or 0.0
+        baseline_low, baseline_high = self.baseline.median_ci
+        current_low, current_high = self.current.median_ci
+        if change > self.threshold and current_low > baseline_high:
+            return ComparisonStatus.regressed
+        if change < -self.threshold and current_high < baseline_low:
+            return ComparisonStatus.improved
+        return ComparisonStatus.ok
+
+
+def compare_results(
+    baseline: ResultsFile,
+    current: Dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+    only: Optional[List[str]] = None,
+) -> List[Comparison]:
+    """Compare the current results to the baseline, restricted to the benchmark names in `only` if given."""
+    names = list(baseline.results.keys())
+    names.extend(name for name in current.keys() if name not in baseline.results)
+    if only is not None:
+        names = [name for name in names if name in only]
+    return [
+        Comparison(
+            name=name,
+            baseline=baseline.results.get(name),
+            current=current.get(name),
+            threshold=baseline.thresholds.get(name, threshold),
+        )
+        for name in names
+    ]
+
+
+def environment_mismatch(baseline: ResultsFile, current_environment: Dict[str, object]) -> List[str]:
+    """List the differences in the environment that make the comparison less meaningful."""
+    mismatches: List[str] = []
+    for key in _COMPARED_ENVIRONMENT:
+        baseline_value = baseline.environment.get(key)
+        current_value = current_environment.get(key)
+        if baseline_value != current_value:
+            mismatches.append(f"{key}: {baseline_value} -> {current_value}")
+    return mismatches
+
+
+def _format_timing(result: Optional[BenchmarkResult]) -> str:
+    if result is None:
+        return "-"
+    if result.failed:
+        return "error"
+    ci_low, ci_high = result.median_ci
+    return f"{result.median * 1000:.2f} ms [{ci_low * 1000:.2f}, {ci_high * 1000:.2f}]"
+
+
+def format_comparisons(comparisons: List[Comparison]) -> List[str]:
+    """Format the comparisons as a plain text table, readable in a CI log."""
+    rows = [("Benchmark", "Baseline median [95% CI]", "Current median [95% CI]", "Change", "Status")]
+    for comparison in comparisons:
+        change = comparison.change
+        rows.append(
+            (
+                comparison.name,
+                _format_timing(comparison.baseline),
+                _format_timing(comparison.current),
+                "-" if change is None else f"{change * 100:+.1f}%",
+                comparison.status.value,
+            )
+        )
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines: List[str] = []
+    for index, row in enumerate(rows):
+        lines.append("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+        if index == 0:
+            lines.append("  ".join("-" * width for width in widths))
+
+    for comparison in comparisons:
+        if comparison.status == ComparisonStatus.failed:
+            lines.append("")
+            lines.append(f"{comparison.name} failed: {comparison.current.error}")
+            continue
+        if comparison.status != ComparisonStatus.regressed:
+            continue
+        current = comparison.current
+        baseline = comparison.baseline
+        lines.append("")
+        lines.append(
+            f"{comparison.name} regressed by {comparison.change * 100:.1f}% "
+            f"(threshold {comparison.threshold * 100:.0f}%): "
+            f"{baseline.items_per_second:.1f} -> {current.items_per_second:.1f} {current.unit}/s"
+        )
+    return lines
@@ -0,0 +1,205 @@
+"""
+Run the benchmarks and write the result as JSON.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from nn.constants import __version__
+
+from .corpus import Corpus, CorpusSpec
+from .stats import median, median_ci
+from .suite import BenchContext, Benchmark
+
+__all__ = (
+    "RESULTS_VERSION",
+    "BenchmarkResult",
+    "run_benchmark",
+    "run_benchmarks",
+    "environment_info",
+    "ResultsFile",
+    "write_results",
+    "read_results",
+)
+
+RESULTS_VERSION = 1
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    group: str
+    description: str
+    unit: str
+    # Wall time of each timed run, in seconds
+    timings: List[float] = field(default_factory=list)
+    items: int = 0
+    size: int = 0
+    # Set when the benchmark raised, there is no timing then
+    error: Optional[str] = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    @property
+    def median(self) -> float:
+        return median(self.timings)
+
+    @property
+    def median_ci(self) -> Tuple[float, float]:
+        """95% confidence interval of the median"""
+        return median_ci(self.timings)
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.median if self.median > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.size / self.median if self.median > 0 else 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        if self.failed:
+            return asdict(self)
+        ci_low, ci_high = self.median_ci
+        return {
+            **asdict(self),
+            "min": min(self.timings),
+            "max": max(self.timings),
+            "median": self.median,
+            "median_ci": [ci_low, ci_high],
+            "items_per_second": self.items_per_second,
+            "bytes_per_second": self.bytes_per_second,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "BenchmarkResult":
+        return cls(
+            name=data["name"],
+            group=data["group"],
+            description=data["description"],
+            unit=data["unit"],
+            timings=list(data["timings"]),
+            items=data["items"],
+            size=data["size"],
+            error=data.get("error"),
+        )
+
+
+def run_benchmark(bench: Benchmark, corpus: Corpus, repeat: int = 5, warmup: int = 1) -> BenchmarkResult:
+    """Run the benchmark ``warmup + repeat`` times, only the last ``repeat`` runs are recorded."""
+    result = BenchmarkResult(bench.name, bench.group, bench.description, bench.unit)
+    for iteration in range(warmup + repeat):
+        scratch = Path(tempfile.mkdtemp(prefix="nnbench-"))
+        try:
+            ctx = BenchContext(corpus, scratch)
+            if bench.setup is not None:
+                bench.setup(ctx)
+            # Do not let the garbage from the setup or the previous run be collected in this run
+            gc.collect()
+            start = time.perf_counter()
+            workload = bench.run(ctx)
+            elapsed = time.perf_counter() - start
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        if iteration < warmup:
+            continue
+        result.timings.append(elapsed)
+        result.items = workload.items
+        result.size = workload.size
+    return result
+
+
+def run_benchmarks(
+    benchmarks: List[Benchmark],
+    corpus: Corpus,
+    repeat: int = 5,
+    warmup: int = 1,
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> List[BenchmarkResult]:
+    """Run every benchmark, a benchmark that raise is returned as a failed result instead of stopping the run."""
+    results: List[BenchmarkResult] = []
+    for bench in benchmarks:
+        try:
+            result = run_benchmark(bench, corpus, repeat, warmup)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            result = BenchmarkResult(bench.name, bench.group, bench.description, bench.unit, error=error)
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return results
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "nn": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+@dataclass
+class ResultsFile:
+    corpus: CorpusSpec
+    results: Dict[str, BenchmarkResult]
+    environment: Dict[str, Any] = field(default_factory=dict)
+    repeat: int = 0
+    warmup: int = 0
+    created: Optional[str] = None
+    # Per benchmark regression threshold, only used in the baseline
+    thresholds: Dict[str, float] = field(default_factory=dict)
+
+
+def write_results(
+    output: Path,
+    results: List[BenchmarkResult],
+    spec: CorpusSpec,
+    repeat: int,
+    warmup: int,
+    thresholds: Optional[Dict[str, float]] = None,
+    environment: Optional[Dict[str, Any]] = None,
+):
+    data: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment or environment_info(),
+        "corpus": asdict(spec),
+        "repeat": repeat,
+        "warmup": warmup,
+    }
+    if thresholds:
+        data["thresholds"] = dict(sorted(thresholds.items()))
+    data["benchmarks"] = {result.name: result.to_json() for result in results}
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(data, indent=4) + "\n", encoding="utf-8")
+
+
+def read_results(results_file: Path) -> ResultsFile:
+    data = json.loads(results_file.read_text(encoding="utf-8"))
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported benchmark results version in {results_file}: {data.get('version')}")
+    return ResultsFile(
+        corpus=CorpusSpec(**data["corpus"]),
+        results={name: BenchmarkResult.from_json(result) for name, result in data["benchmarks"].items()},
+        environment=data.get("environment", {}),
+        repeat=data.get("repeat", 0),
+        warmup=data.get("warmup", 0),
+        created=data.get("created"),
+        thresholds=data.get("thresholds", {}),
+    )
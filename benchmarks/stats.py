@@ -0,0 +1,48 @@
+"""
+Small statistics helpers for the benchmark timings, without depending on numpy.
+"""
+
+from math import factorial
+from typing import List, Sequence, Tuple
+
+__all__ = (
+    "median",
+    "median_ci",
+)
+
+
+def median(values: Sequence[float]) -> float:
+    if not values:
+        raise ValueError("median of an empty sequence")
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2 == 1:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _binomial_cdf(count: int, total: int) -> float:
+    """P(X <= count) for X ~ Binomial(total, 0.5)"""
+    return sum(factorial(total) // (factorial(k) * factorial(total - k)) for k in range(count + 1)) / 2**total
+
+
+def median_ci(values: Sequence[float], confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Distribution-free confidence interval of the median.
+
+    Use the order statistics of the sorted values, the timings are usually skewed
+    (a few slow runs) so the normal approximation does not fit.
+    When there are too few values for the confidence, the full range is returned.
+    """
+    if not values:
+        raise ValueError("median_ci of an empty sequence")
+    ordered: List[float] = sorted(values)
+    total = len(ordered)
+    alpha = (1 - confidence) / 2
+    # Largest rank where the chance of the median being below the value is still under alpha
+    rank = 0
+    while rank + 1 <= total // 2 and _binomial_cdf(rank, total) <= alpha:
+        rank += 1
+    if rank == 0:
+        return ordered[0], ordered[-1]
+    return ordered[rank - 1], ordered[total - rank]
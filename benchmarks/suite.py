@@ -0,0 +1,303 @@
+"""
+The benchmarks, each one time a single hot path of nn against the synthetic corpus.
+"""
+
+from __future__ import annotations
+
+import shutil
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from nn.cli.archive import pack_releases_epub_mode
+from nn.cli.auto_split import auto_split
+from nn.cli.constants import M_PUBLICATION_TYPES
+from nn.cli.merge_chapters import merge_chapters
+from nn.common import ChapterRange, ReleaseNamingPlan, create_chapter, format_daiz_like_filename
+from nn.exporter import ExporterType, exporter_factory
+from nn.file_handler import MArchive
+from nn.parser import get_chapter_parser
+
+from .corpus import VOLUME_FORMATS, Corpus, SyntheticPage, iter_volume_pages
+
+__all__ = (
+    "Workload",
+    "BenchContext",
+    "Benchmark",
+    "BENCHMARKS",
+    "select_benchmarks",
+)
+
+
+@dataclass
+class Workload:
+    """How much work was done by a single run, used for the throughput."""
+
+    items: int = 0
+    size: int = 0
+
+    def add(self, size: int = 0):
+        self.items += 1
+        self.size += size
+
+
+@dataclass
+class BenchContext:
+    corpus: Corpus
+    # Empty folder for each run, removed after the run
+    scratch: Path
+    # Whatever the setup function prepared, the setup is not timed
+    state: Any = None
+
+
+@dataclass
+class Benchmark:
+    name: str
+    group: str
+    description: str
+    run: Callable[[BenchContext], Workload]
+    setup: Optional[Callable[[BenchContext], None]] = None
+    # Unit of Workload.items
+    unit: str = "pages"
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def _register(
+    name: str,
+    group: str,
+    description: str,
+    run: Callable[[BenchContext], Workload],
+    setup: Optional[Callable[[BenchContext], None]] = None,
+    unit: str = "pages",
+):
+    if name in BENCHMARKS:
+        raise ValueError(f"Benchmark {name} is already registered")
+    BENCHMARKS[name] = Benchmark(name, group, description, run, setup, unit)
+
+
+def benchmark(name: str, group: str, setup: Optional[Callable[[BenchContext], None]] = None, unit: str = "pages"):
+    def decorator(func: Callable[[BenchContext], Workload]):
+        _register(name, group, (func.__doc__ or "").strip(), func, setup, unit)
+        return func
+
+    return decorator
+
+
+def select_benchmarks(patterns: Sequence[str] = ()) -> List[Benchmark]:
+    """Select the benchmarks matching any of the glob patterns (e.g. ``archive.*``), or all of them."""
+    if not patterns:
+        return list(BENCHMARKS.values())
+    return [bench for bench in BENCHMARKS.values() if any(fnmatch(bench.name, pattern) for pattern in patterns)]
+
+
+def _check_exit_code(name: str, result: Optional[int]):
+    if isinstance(result, int) and result > 0:
+        raise RuntimeError(f"{name} failed with exit code {result}")
+
+
+# --> Archive reading
+
+
+def _make_archive_iter(volume_format: str) -> Callable[[BenchContext], Workload]:
+    def run(ctx: BenchContext) -> Workload:
+        workload = Workload()
+        with MArchive(ctx.corpus.volume(volume_format)) as archive:
+            for image, _ in archive:
+                workload.add(len(archive.read(image)))
+        return workload
+
+    return run
+
+
+for _volume_format in VOLUME_FORMATS:
+    _register(
+        f"archive.iter.{_volume_format}",
+        "archive",
+        f"Iterate and read every page of a {_volume_format} volume with MArchive",
+        _make_archive_iter(_volume_format),
+    )
+
+
+# --> Exporters
+
+
+def _setup_export(ctx: BenchContext):
+    folder = ctx.corpus.volume("folder")
+    ctx.state = sorted(path for path in folder.iterdir() if path.is_file())
+
+
+def _make_export(export_type: ExporterType) -> Callable[[BenchContext], Workload]:
+    def run(ctx: BenchContext) -> Workload:
+        workload = Workload()
+        target = exporter_factory("bench", ctx.scratch / "output", export_type, manga_title=ctx.corpus.spec.title)
+        for image_path in ctx.state:
+            target.add_image(image_path.name, image_path)
+            workload.add(image_path.stat().st_size)
+        target.close()
+        return workload
+
+    return run
+
+
+for _export_type in ExporterType:
+    _register(
+        f"export.{_export_type.value}",
+        "export",
+        f"Write every page of a volume with the {_export_type.value} exporter",
+        _make_export(_export_type),
+        setup=_setup_export,
+    )
+
+
+# --> Naming
+
+# A volume only has a few hundred pages, which is too fast to time reliably
+_NAMING_ROUNDS = 200
+
+
+def _all_pages(corpus: Corpus):
+    for volume in range(1, corpus.spec.volumes + 1):
+        yield from iter_volume_pages(corpus.spec, volume)
+
+
+def _setup_pages(ctx: BenchContext):
+    ctx.state = list(_all_pages(ctx.corpus)) * _NAMING_ROUNDS
+
+
+@benchmark("naming.format_daiz_like_filename", "naming", setup=_setup_pages, unit="names")
+def bench_format_daiz_like_filename(ctx: BenchContext) -> Workload:
+    """Format the filename of every page with format_daiz_like_filename"""
+    spec = ctx.corpus.spec
+    digital = M_PUBLICATION_TYPES["digital"]
+    chapters: Dict[int, ChapterRange] = {}
+    workload = Workload()
+    for page in ctx.state:
+        chapter_info = chapters.setdefault(page.chapter, ChapterRange(page.chapter, f"Chapter {page.chapter}"))
+        image_name, _ = format_daiz_like_filename(
+            m_title=spec.title,
+            m_publisher=spec.publisher,
+            m_year=spec.year,
+            chapter_info=chapter_info,
+            page_number=f"{page.page:03d}",
+            publication_type=digital,
+            rip_credit=spec.credit,
+            bracket_type="square",
+            m_volume=page.volume,
+        )
+        workload.add(len(image_name))
+    return workload
+
+
+@benchmark("naming.release_plan", "naming", setup=_setup_pages, unit="names")
+def bench_release_plan(ctx: BenchContext) -> Workload:
+    """Format the filename of every page with ReleaseNamingPlan"""
+    spec = ctx.corpus.spec
+    all_pages: List[SyntheticPage] = ctx.state
+    chapters: Dict[int, ChapterRange] = {}
+    for page in all_pages:
+        chapters.setdefault(page.chapter, ChapterRange(page.chapter, f"Chapter {page.chapter}"))
+    naming_plan = ReleaseNamingPlan(
+        m_title=spec.title,
+        m_publisher=spec.publisher,
+        m_year=spec.year,
+        chapters=list(chapters.values()),
+        publication_type=M_PUBLICATION_TYPES["digital"],
+        rip_credit=spec.credit,
+        bracket_type="square",
+    )
+    workload = Workload()
+    for page in all_pages:
+        image_name, _ = naming_plan.render(chapters[page.chapter], f"{page.page:03d}", page.volume)
+        workload.add(len(image_name))
+    return workload
+
+
+@benchmark("naming.chapter_parser", "naming", setup=_setup_pages, unit="names")
+def bench_chapter_parser(ctx: BenchContext) -> Workload:
+    """Parse the filename of every page with the chapter parser used by autosplit"""
+    spec = ctx.corpus.spec
+    chapter_parser = get_chapter_parser(spec.title, spec.publisher)
+    workload = Workload()
+    for page in ctx.state:
+        if chapter_parser.parse(page.filename) is None:
+            raise RuntimeError(f"Unable to parse: {page.filename}")
+        workload.add(len(page.filename))
+    return workload
+
+
+def _setup_chapter_matches(ctx: BenchContext):
+    spec = ctx.corpus.spec
+    chapter_parser = get_chapter_parser(spec.title, spec.publisher)
+    ctx.state = [chapter_parser.parse(page.filename) for page in _all_pages(ctx.corpus)] * _NAMING_ROUNDS
+
+
+@benchmark("naming.create_chapter", "naming", setup=_setup_chapter_matches, unit="names")
+def bench_create_chapter(ctx: BenchContext) -> Workload:
+    """Create the chapter name from every parsed page filename"""
+    workload = Workload()
+    for match in ctx.state:
+        workload.add(len(create_chapter(match, True)))
+    return workload
+
+
+# --> Commands, end-to-end
+
+
+def _setup_auto_split(ctx: BenchContext):
+    source = ctx.corpus.volume("cbz")
+    ctx.state = ctx.scratch / source.name
+    shutil.copyfile(source, ctx.state)
+
+
+@benchmark("command.autosplit", "command", setup=_setup_auto_split)
+def bench_auto_split(ctx: BenchContext) -> Workload:
+    """Split a cbz volume into chapters with `nn autosplit`"""
+    spec = ctx.corpus.spec
+    _check_exit_code(
+        "autosplit", auto_split.callback(path_or_archive=ctx.state, title=spec.title, publisher=spec.publisher)
+    )
+    return Workload(spec.pages_per_volume, ctx.state.stat().st_size)
+
+
+def _setup_merge(ctx: BenchContext):
+    ctx.state = []
+    for chapter in ctx.corpus.chapters:
+        target = ctx.scratch / chapter.name
+        shutil.copyfile(chapter, target)
+        ctx.state.append(target)
+
+
+@benchmark("command.merge", "command", setup=_setup_merge)
+def bench_merge(ctx: BenchContext) -> Workload:
+    """Merge the chapters of a volume together with `nn merge`"""
+    total_size = sum(path.stat().st_size for path in ctx.state)
+    _check_exit_code("merge", merge_chapters.callback(archives=ctx.state, output_file="merged"))
+    return Workload(ctx.corpus.spec.pages_per_volume, total_size)
+
+
+def _setup_pack_epub(ctx: BenchContext):
+    ctx.state = ctx.scratch / ctx.corpus.epub_folder.name
+    shutil.copytree(ctx.corpus.epub_folder, ctx.state)
+
+
+@benchmark("command.packepub", "command", setup=_setup_pack_epub, unit="files")
+def bench_pack_epub(ctx: BenchContext) -> Workload:
+    """Pack an extracted EPUB with `nn packepub`"""
+    spec = ctx.corpus.spec
+    workload = Workload()
+    for path in ctx.state.glob("**/*"):
+        if path.is_file():
+            workload.add(path.stat().st_size)
+    result = pack_releases_epub_mode.callback(
+        path_or_archive=ctx.state,
+        epub_title=spec.title,
+        epub_source="Digital",
+        m_volume=1,
+        rls_credit=spec.credit,
+        jobs=None,
+    )
+    _check_exit_code("packepub", result)
+    return workload
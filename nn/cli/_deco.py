@@ -1,36 +1,52 @@
-import time
-
-from .. import config, term
-
-__all__ = (
-    "check_config_first",
-    "time_program",
-)
-
-console = term.get_console()
-cfhandler = config.get_config_handler()
-
-
-def time_program(func):
-    def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        delta = end - start
-        if isinstance(result, int) and result > 0:
-            console.error(f"Failure! (Took {delta:.2f}s) [exit code {result}]")
-        else:
-            console.info(f"Done! (Took {delta:.2f}s)")
-        return result
-
-    return wrapper
-
-
-def check_config_first(func):
-    def wrapper(*args, **kwargs):
-        if cfhandler.is_first_time():
-            console.warning("First time setup not complete, please run `nn config`")
-        result = func(*args, **kwargs)
-        return result
-
+import time
+
+import click
+
+from .. import config, term
+from ..utils import format_bytes, get_peak_rss
+
+__all__ = (
+    "check_config_first",
+    "time_program",
+)
+
+console = term.get_console()
+cfhandler = config.get_config_handler()
+
+
+def _is_server_job() -> bool:
+    ctx = click.get_current_context(silent=True)
+    if ctx is None:
+        return False
+    root_obj = ctx.find_root().obj
+    return isinstance(root_obj, dict) and bool(root_obj.get("SERVER_JOB"))
+
+
+def time_program(func):
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        result = func(*args, **kwargs)
+        end = time.time()
+        delta = end - start
+        took_text = f"Took {delta:.2f}s"
+        # The peak memory of `nn serve` is the one of the whole server, not of this job
+        peak_rss = None if _is_server_job() else get_peak_rss()
+        if peak_rss is not None:
+            took_text += f", peak memory {format_bytes(peak_rss)}"
+        if isinstance(result, int) and result > 0:
+            console.error(f"Failure! ({took_text}) [exit code {result}]")
+        else:
+            console.info(f"Done! ({took_text})")
+        return result
+
+    return wrapper
+
+
+def check_config_first(func):
+    def wrapper(*args, **kwargs):
+        if cfhandler.is_first_time():
+            console.warning("First time setup not complete, please run `nn config`")
+        result = func(*args, **kwargs)
+        return result
+
     return wrapper
\ No newline at end of file
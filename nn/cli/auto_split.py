@@ -1,154 +1,330 @@
-from __future__ import annotations
-
-from os import path
-from pathlib import Path
-from typing import Dict, List, Optional
-
-import click
-
-from .. import exporter, file_handler, term, utils
-from . import options
-from ._deco import time_program
-from .base import NNCommandHandler, RegexCollection
-from .common import check_cbz_exist, create_chapter
-
-console = term.get_console()
-
-
-@click.command(
-    name="autosplit",
-    help="Automatically split volumes into chapters using regex",
-    cls=NNCommandHandler,
-)
-@options.path_or_archive()
-@click.option(
-    "-t",
-    "--title",
-    "title",
-    required=True,
-    help="The title of the series (used on volume filename, and inner filename)",
-)
-@click.option(
-    "-pub",
-    "--publisher",
-    "publisher",
-    required=False,
-    default=None,
-    help="The publisher of the series (used on inner filename)",
-)
-@click.option(
-    "-it",
-    "--inner-title",
-    "inner_title",
-    required=False,
-    default=None,
-    help="The title of the series (used on inner filename, will override --title)",
-)
-@click.option(
-    "-lt",
-    "--limit-to",
-    "limit_to_credit",
-    required=False,
-    default=None,
-    help="Limit the volume regex to certain ripper only.",
-)
-@click.option(
-    "-oshot",
-    "--is-oneshot",
-    "is_oneshot",
-    is_flag=True,
-    default=False,
-    help="Mark the series as oneshot",
-)
-@time_program
-def auto_split(
-    path_or_archive: Path,
-    title: str,
-    publisher: Optional[str] = None,
-    inner_title: Optional[str] = None,
-    limit_to_credit: Optional[str] = None,
-    is_oneshot: bool = False,
-):
-    """
-    Automatically split volumes into chapters using regex
-    """
-    if inner_title is None:
-        inner_title = title
-
-    all_comic_files: Dict[str, Path] = {}
-    parent_dir = path_or_archive
-    volume_re = RegexCollection.volume_re(title, limit_to_credit)
-    if file_handler.is_archive(path_or_archive):
-        match_re = volume_re.match(path_or_archive.name)
-        if not match_re:
-            console.warning("Unable to match volume regex, falling back to v00...")
-            volume_num = "00"
-        else:
-            volume_num = match_re.group(1)
-        all_comic_files[volume_num] = path_or_archive
-        parent_dir = path_or_archive.parent
-    else:
-        for comic_file in file_handler.collect_all_comics(path_or_archive):
-            if is_oneshot:
-                if not all_comic_files:
-                    next_key_data = "00"
-                else:
-                    _next_key = list(all_comic_files.keys())[-1]
-                    if "." in _next_key:
-                        _bk, _fk = _next_key.split(".")
-                        next_key_data = f"{(int(_bk) + 1):02d}.{_fk}"
-                    else:
-                        next_key_data = f"{(int(_next_key) + 1):02d}"
-                console.info(f"Marking as oneshot (v{next_key_data}): {comic_file}")
-                all_comic_files[next_key_data] = comic_file
-                continue
-
-            match_re = volume_re.match(comic_file.name)
-            if not match_re:
-                continue
-            volume_num = match_re.group(1)
-            if not volume_num:
-                continue
-            all_comic_files[volume_num] = comic_file
-        if not all_comic_files:
-            console.error("No valid comic files found with title provided!")
-            return 1
-
-    chapter_re = RegexCollection.chapter_re(inner_title, publisher)
-    for volume, file_path in all_comic_files.items():
-        console.info(f"[?] Processing: {file_path}")
-        target_path = parent_dir / f"v{volume}"
-
-
-        collected_chapters: Dict[str, exporter.CBZMExporter] = {}
-        skipped_chapters: List[str] = []
-        with file_handler.MArchive(file_path) as archive:
-            for image, _ in archive:
-                filename = image.filename
-                match_re = chapter_re.match(path.basename(filename))
-                if not match_re:
-                    console.error(f"[{volume}][!] Unable to match chapter: {filename}")
-                    console.error(f"[{volume}][!] Exiting...")
-                    return 1
-                chapter_data = create_chapter(match_re, publisher is not None)
-                if chapter_data in skipped_chapters:
-                    continue
-
-                if chapter_data not in collected_chapters:
-                    if check_cbz_exist(target_path, utils.secure_filename(chapter_data)):
-                        console.warning(f"[{volume}][?] Skipping chapter: {chapter_data}")
-                        skipped_chapters.append(chapter_data)
-                        continue
-                    console.info(f"[{volume}][+] Creating chapter: {chapter_data}")
-                    collected_chapters[chapter_data] = exporter.CBZMExporter(
-                        utils.secure_filename(chapter_data), target_path
-                    )
-
-                image_bita = archive.read(image)
-                collected_chapters[chapter_data].add_image(path.basename(filename), image_bita)
-
-        for chapter, cbz_export in collected_chapters.items():
-            console.info(f"[{volume}][+] Finishing chapter: {chapter}")
-            cbz_export.close()
-        console.enter()
-    return 0
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from os import path
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO
+
+import click
+
+from .. import exporter, file_handler, term, utils
+from ..parser import get_chapter_parser
+from . import options
+from ._deco import time_program
+from .base import NNCommandHandler, RegexCollection
+from .common import check_cbz_exist, create_chapter
+
+console = term.get_console()
+
+
+@dataclass
+class ChapterPlan:
+    name: str
+    pages: int = 0
+    size: int = 0
+    skipped: bool = False
+
+
+@dataclass
+class VolumePlan:
+    volume: str
+    source: str
+    target: str
+    chapters: List[ChapterPlan] = field(default_factory=list)
+    unmatched: List[str] = field(default_factory=list)
+
+    @property
+    def pages(self) -> int:
+        return sum(chapter.pages for chapter in self.chapters)
+
+    @property
+    def size(self) -> int:
+        return sum(chapter.size for chapter in self.chapters)
+
+
+@click.command(
+    name="autosplit",
+    help="Automatically split volumes into chapters using regex",
+    cls=NNCommandHandler,
+)
+@options.path_or_archive()
+@click.option(
+    "-t",
+    "--title",
+    "title",
+    required=True,
+    help="The title of the series (used on volume filename, and inner filename)",
+)
+@click.option(
+    "-pub",
+    "--publisher",
+    "publisher",
+    required=False,
+    default=None,
+    help="The publisher of the series (used on inner filename)",
+)
+@click.option(
+    "-it",
+    "--inner-title",
+    "inner_title",
+    required=False,
+    default=None,
+    help="The title of the series (used on inner filename, will override --title)",
+)
+@click.option(
+    "-lt",
+    "--limit-to",
+    "limit_to_credit",
+    required=False,
+    default=None,
+    help="Limit the volume regex to certain ripper only.",
+)
+@click.option(
+    "-oshot",
+    "--is-oneshot",
+    "is_oneshot",
+    is_flag=True,
+    default=False,
+    help="Mark the series as oneshot",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of volumes to split in parallel",
+)
+@click.option(
+    "--plan",
+    "plan_only",
+    is_flag=True,
+    default=False,
+    help="Only show the chapters that would be created, using the archive listing without extracting anything",
+)
+@click.option(
+    "--plan-json",
+    "plan_json",
+    type=click.File("w", encoding="utf-8"),
+    default=None,
+    help="Write the split plan as JSON to the file (use - for stdout), implies --plan",
+)
+@time_program
+def auto_split(
+    path_or_archive: Path,
+    title: str,
+    publisher: Optional[str] = None,
+    inner_title: Optional[str] = None,
+    limit_to_credit: Optional[str] = None,
+    is_oneshot: bool = False,
+    jobs: int = 1,
+    plan_only: bool = False,
+    plan_json: Optional[TextIO] = None,
+):
+    """
+    Automatically split volumes into chapters using regex
+    """
+    if inner_title is None:
+        inner_title = title
+
+    all_comic_files: Dict[str, Path] = {}
+    parent_dir = path_or_archive
+    volume_re = RegexCollection.volume_re(title, limit_to_credit)
+    if file_handler.is_archive(path_or_archive):
+        match_re = volume_re.match(path_or_archive.name)
+        if not match_re:
+            console.warning("Unable to match volume regex, falling back to v00...")
+            volume_num = "00"
+        else:
+            volume_num = match_re.group(1)
+        all_comic_files[volume_num] = path_or_archive
+        parent_dir = path_or_archive.parent
+    else:
+        for comic_file in file_handler.collect_all_comics(path_or_archive):
+            if is_oneshot:
+                if not all_comic_files:
+                    next_key_data = "00"
+                else:
+                    _next_key = list(all_comic_files.keys())[-1]
+                    if "." in _next_key:
+                        _bk, _fk = _next_key.split(".")
+                        next_key_data = f"{(int(_bk) + 1):02d}.{_fk}"
+                    else:
+                        next_key_data = f"{(int(_next_key) + 1):02d}"
+                console.info(f"Marking as oneshot (v{next_key_data}): {comic_file}")
+                all_comic_files[next_key_data] = comic_file
+                continue
+
+            match_re = volume_re.match(comic_file.name)
+            if not match_re:
+                continue
+            volume_num = match_re.group(1)
+            if not volume_num:
+                continue
+            all_comic_files[volume_num] = comic_file
+        if not all_comic_files:
+            console.error("No valid comic files found with title provided!")
+            return 1
+
+    if plan_only or plan_json is not None:
+        return _show_split_plan(all_comic_files, parent_dir, inner_title, publisher, plan_json)
+
+    if jobs > 1 and len(all_comic_files) > 1:
+        return _split_volumes_parallel(all_comic_files, parent_dir, inner_title, publisher, jobs)
+
+    for volume, file_path in all_comic_files.items():
+        console.info(f"[?] Processing: {file_path}")
+        if _split_volume(volume, file_path, parent_dir / f"v{volume}", inner_title, publisher) != 0:
+            return 1
+    return 0
+
+
+def _split_volume(
+    volume: str,
+    file_path: Path,
+    target_path: Path,
+    inner_title: str,
+    publisher: Optional[str],
+    show_progress: bool = True,
+) -> int:
+    chapter_parser = get_chapter_parser(inner_title, publisher)
+    collected_chapters: Dict[str, exporter.CBZMExporter] = {}
+    skipped_chapters: List[str] = []
+    # Worker processes share the terminal, so only the serial mode shows the progress.
+    progress_context = console.progress(f"[{volume}] Splitting") if show_progress else nullcontext()
+    with progress_context as progress, file_handler.MArchive(file_path) as archive:
+        for image, total_count in archive:
+            if progress is not None:
+                progress.advance(total=total_count)
+            filename = image.filename
+            match_re = chapter_parser.parse(path.basename(filename))
+            if not match_re:
+                if progress is not None:
+                    progress.stop()
+                console.error(f"[{volume}][!] Unable to match chapter: {filename}")
+                console.error(f"[{volume}][!] Exiting...")
+                return 1
+            chapter_data = create_chapter(match_re, publisher is not None)
+            if chapter_data in skipped_chapters:
+                continue
+
+            if chapter_data not in collected_chapters:
+                if check_cbz_exist(target_path, utils.secure_filename(chapter_data)):
+                    console.warning(f"[{volume}][?] Skipping chapter: {chapter_data}")
+                    skipped_chapters.append(chapter_data)
+                    continue
+                console.info(f"[{volume}][+] Creating chapter: {chapter_data}")
+                collected_chapters[chapter_data] = exporter.CBZMExporter(
+                    utils.secure_filename(chapter_data), target_path
+                )
+
+            image_bita = archive.read(image)
+            collected_chapters[chapter_data].add_image(path.basename(filename), image_bita)
+            if progress is not None:
+                progress.advance(count=0, size=len(image_bita))
+
+    for chapter, cbz_export in collected_chapters.items():
+        console.info(f"[{volume}][+] Finishing chapter: {chapter}")
+        cbz_export.close()
+    console.enter()
+    return 0
+
+
+def _split_volumes_parallel(
+    all_comic_files: Dict[str, Path], parent_dir: Path, inner_title: str, publisher: Optional[str], jobs: int
+) -> int:
+    # Each volume is independent, so a failing volume is only reported and the rest are still processed.
+    failed_volumes: List[str] = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for volume, file_path in all_comic_files.items():
+            console.info(f"[{volume}][?] Processing: {file_path}")
+            future = executor.submit(
+                _split_volume, volume, file_path, parent_dir / f"v{volume}", inner_title, publisher, False
+            )
+            futures[future] = volume
+
+        for future in as_completed(futures):
+            volume = futures[future]
+            try:
+                exit_code = future.result()
+            except Exception as exc:
+                console.error(f"[{volume}][!] Failed to split volume: {exc}")
+                exit_code = 1
+            if exit_code != 0:
+                failed_volumes.append(volume)
+
+    if failed_volumes:
+        failed_text = ", ".join(f"v{volume}" for volume in sorted(failed_volumes))
+        console.error(f"Failed to split {len(failed_volumes)}/{len(all_comic_files)} volumes: {failed_text}")
+        return 1
+    console.info(f"Split {len(all_comic_files)} volumes using {jobs} jobs")
+    return 0
+
+
+def _plan_volume(volume: str, file_path: Path, target_path: Path, inner_title: str, publisher: Optional[str]):
+    chapter_parser = get_chapter_parser(inner_title, publisher)
+    volume_plan = VolumePlan(volume, str(file_path), str(target_path))
+    planned_chapters: Dict[str, ChapterPlan] = {}
+    with file_handler.MArchive(file_path) as archive:
+        for image, _ in archive:
+            filename = image.filename
+            match_re = chapter_parser.parse(path.basename(filename))
+            if not match_re:
+                volume_plan.unmatched.append(filename)
+                continue
+            chapter_data = create_chapter(match_re, publisher is not None)
+            chapter_plan = planned_chapters.get(chapter_data)
+            if chapter_plan is None:
+                skipped = check_cbz_exist(target_path, utils.secure_filename(chapter_data))
+                chapter_plan = planned_chapters[chapter_data] = ChapterPlan(chapter_data, skipped=skipped)
+                volume_plan.chapters.append(chapter_plan)
+            chapter_plan.pages += 1
+            chapter_plan.size += image.size
+    return volume_plan
+
+
+def _show_split_plan(
+    all_comic_files: Dict[str, Path],
+    parent_dir: Path,
+    inner_title: str,
+    publisher: Optional[str],
+    plan_json: Optional[TextIO] = None,
+) -> int:
+    volume_plans: List[VolumePlan] = []
+    for volume, file_path in all_comic_files.items():
+        volume_plans.append(_plan_volume(volume, file_path, parent_dir / f"v{volume}", inner_title, publisher))
+
+    if plan_json is not None:
+        json_data = []
+        for volume_plan in volume_plans:
+            json_data.append({**asdict(volume_plan), "pages": volume_plan.pages, "size": volume_plan.size})
+        json.dump(json_data, plan_json, indent=4, ensure_ascii=False)
+        plan_json.write("\n")
+        plan_json.flush()
+    else:
+        for volume_plan in volume_plans:
+            skipped_count = len([chapter for chapter in volume_plan.chapters if chapter.skipped])
+            console.info(
+                f"[{volume_plan.volume}] {path.basename(volume_plan.source)} -> {volume_plan.target} "
+                f"({len(volume_plan.chapters)} chapters, {skipped_count} skipped, {volume_plan.pages} pages, "
+                f"{utils.format_bytes(volume_plan.size)})"
+            )
+            for chapter in volume_plan.chapters:
+                marker = "?" if chapter.skipped else "+"
+                console.info(
+                    f"[{volume_plan.volume}][{marker}] {chapter.name}: {chapter.pages} pages, "
+                    f"{utils.format_bytes(chapter.size)}" + (" (exists, will be skipped)" if chapter.skipped else "")
+                )
+            for filename in volume_plan.unmatched:
+                console.error(f"[{volume_plan.volume}][!] Unable to match chapter: {filename}")
+            console.enter()
+
+    # Mirror the actual split, which fails when any of the file cannot be matched.
+    if any(volume_plan.unmatched for volume_plan in volume_plans):
+        return 1
+    return 0
@@ -1,53 +1,112 @@
-from pathlib import Path
-
-import click
-
-from .. import term
-from . import options
-from ._deco import check_config_first, time_program
-from .base import NNCommandHandler, is_executeable_global_path, test_or_find_pingo
-from .common import optimize_images
-
-console = term.get_console()
-
-
-@click.command(
-    name="optimize",
-    help="Optimize images with pingo",
-    cls=NNCommandHandler,
-)
-@options.path_or_archive(disable_archive=True)
-@click.option(
-    "-ax",
-    "--aggressive",
-    "aggresive_mode",
-    default=False,
-    show_default=True,
-)
-@options.pingo_path
-@check_config_first
-@time_program
-def image_optimizer(
-    path_or_archive: Path,
-    aggresive_mode: bool,
-    pingo_path: str,
-):
-    """
-    Optimize images with pingo
-    """
-
-    if not path_or_archive.is_dir():
-        raise click.BadParameter(
-            f"{path_or_archive} is not a directory. Please provide a directory.",
-            param_hint="path_or_archive",
-        )
-
-    force_search = not is_executeable_global_path(pingo_path, "exiftool")
-    pingo_exe = test_or_find_pingo(pingo_path, force_search)
-    if pingo_exe is None:
-        console.error("pingo not found dumbass, unable to optimize images")
-        raise click.exceptions.Exit(1)
-
-    console.info(f"Using pingo at {pingo_exe}")
-    console.info("Optimizing images...")
-    optimize_images(pingo_exe, path_or_archive, aggresive_mode)
\ No newline at end of file
+from pathlib import Path
+from typing import Iterator, List, Tuple
+from zipfile import ZipFile, ZipInfo
+
+import click
+
+from .. import file_handler, term
+from ..optimizer import (
+    OPTIMIZABLE_SUFFIXES,
+    EntryOptimizer,
+    OptimizerBackend,
+    optimize_archive,
+    optimize_images_pillow,
+)
+from ..utils import format_bytes
+from . import options
+from ._deco import check_config_first, time_program
+from .base import NNCommandHandler, is_executeable_global_path, test_or_find_pingo
+from .common import optimize_images
+
+console = term.get_console()
+
+
+def _images_size(target_directory: Path) -> int:
+    total_size = 0
+    for file in target_directory.iterdir():
+        if file.is_file() and file.suffix.lower() in OPTIMIZABLE_SUFFIXES:
+            total_size += file.stat().st_size
+    return total_size
+
+
+def _pingo_entry_optimizer(pingo_exe: str, aggresive: bool) -> EntryOptimizer:
+    def _optimize_entries(source: ZipFile, entries: List[ZipInfo]) -> Iterator[Tuple[bytes, bytes]]:
+        # pingo only works on files, so run it once on a temporary folder with all the images.
+        temp_dir = file_handler.create_temp_dir()
+        try:
+            temp_files: List[Path] = []
+            for idx, info in enumerate(entries):
+                suffix = Path(info.filename).suffix.lower()
+                temp_file = temp_dir / f"{idx:05d}{'.jpg' if suffix == '.jpeg' else suffix}"
+                temp_file.write_bytes(source.read(info))
+                temp_files.append(temp_file)
+            optimize_images(pingo_exe, temp_dir, aggresive)
+            for info, temp_file in zip(entries, temp_files):
+                yield source.read(info), temp_file.read_bytes()
+        finally:
+            file_handler.remove_folder_and_contents(temp_dir)
+
+    return _optimize_entries
+
+
+@click.command(
+    name="optimize",
+    help="Optimize images with pingo or Pillow",
+    cls=NNCommandHandler,
+)
+@options.path_or_archive()
+@click.option(
+    "-ax",
+    "--aggressive",
+    "aggresive_mode",
+    default=False,
+    show_default=True,
+)
+@options.optimizer_backend
+@options.pingo_path
+@options.rediscover_exec
+@check_config_first
+@time_program
+def image_optimizer(
+    path_or_archive: Path,
+    aggresive_mode: bool,
+    optimizer_backend: OptimizerBackend,
+    pingo_path: str,
+):
+    """
+    Optimize images with pingo or Pillow
+    """
+
+    is_archive = path_or_archive.is_file()
+    if is_archive and not file_handler.is_cbz(path_or_archive):
+        raise click.BadParameter(
+            f"{path_or_archive} is not a ZIP/CBZ archive. Please provide a directory or a ZIP/CBZ archive.",
+            param_hint="path_or_archive",
+        )
+
+    if optimizer_backend == OptimizerBackend.pillow:
+        console.info("Optimizing images with Pillow...")
+        if is_archive:
+            optimize_archive(path_or_archive, aggresive_mode)
+        else:
+            optimize_images_pillow(path_or_archive, aggresive_mode)
+        return
+
+    force_search = not is_executeable_global_path(pingo_path, "pingo")
+    pingo_exe = test_or_find_pingo(pingo_path, force_search)
+    if pingo_exe is None:
+        console.error("pingo not found dumbass, unable to optimize images (use `--backend pillow` instead)")
+        raise click.exceptions.Exit(1)
+
+    console.info(f"Using pingo at {pingo_exe}")
+    console.info("Optimizing images...")
+    if is_archive:
+        optimize_archive(path_or_archive, entry_optimizer=_pingo_entry_optimizer(pingo_exe, aggresive_mode))
+        return
+
+    size_before = _images_size(path_or_archive)
+    optimize_images(pingo_exe, path_or_archive, aggresive_mode)
+    size_after = _images_size(path_or_archive)
+    console.info(
+        f"Saved {format_bytes(size_before - size_after)} ({format_bytes(size_before)} -> {format_bytes(size_after)})"
+    )
@@ -1,422 +1,456 @@
-from datetime import datetime, timedelta, timezone
-from pathlib import Path
-from typing import Dict, List, Literal, Optional, Union
-
-import click
-
-from .. import config, file_handler, term
-from . import options
-from ._deco import check_config_first, time_program
-from .base import (
-    NNCommandHandler,
-    RegexCollection,
-    WithDeprecatedOption,
-    is_executeable_global_path,
-    test_or_find_exiftool,
-    test_or_find_pingo,
-)
-from .common import (
-    ChapterRange,
-    format_daiz_like_filename,
-    inject_metadata,
-    inquire_chapter_ranges,
-    optimize_images,
-    safe_int,
-)
-from .constants import MPublication
-
-console = term.get_console()
-conf = config.get_config()
-
-__all__ = (
-    "prepare_releases",
-    "prepare_releases_chapter",
-)
-
-
-class SpecialNaming:
-    def __init__(self, page: int, data: str):
-        self.page = page
-        self.data = data
-
-
-@click.command(
-    name="releases",
-    help="Prepare a release of a manga series.",
-    cls=NNCommandHandler,
-)
-@options.path_or_archive(disable_archive=True)
-@options.m_title
-@options.m_year
-@options.m_publisher
-@options.m_publication_type()
-@options.rls_credit
-@options.rls_email
-@options.rls_revision
-@click.option(
-    "-hq",
-    "--is-high-quality",
-    "is_high_quality",
-    cls=WithDeprecatedOption,
-    is_flag=True,
-    help="Whether this is a high quality release",
-    default=False,
-    deprecated=True,
-    preferred=["-mq", "--quality"],
-)
-@click.option(
-    "-mq",
-    "--quality",
-    "image_quality",
-    type=click.Choice(["LQ", "HQ"]),
-    default=None,
-    help="Image quality of this release.",
-)
-@click.option(
-    "--tag/--no-tag",
-    "do_exif_tagging",
-    default=True,
-    show_default=True,
-    help="Do exif metadata tagging on the files.",
-)
-@click.option(
-    "--optimize/--no-optimize",
-    "do_img_optimize",
-    default=False,
-    show_default=True,
-    help="Optimize the images using pingo.",
-)
-@options.exiftool_path
-@options.pingo_path
-@options.use_bracket_type
-@check_config_first
-@time_program
-def prepare_releases(
-    path_or_archive: Path,
-    m_title: str,
-    m_year: Optional[int],
-    m_publisher: str,
-    m_publication_type: MPublication,
-    rls_credit: str,
-    rls_email: str,
-    rls_revision: int,
-    is_high_quality: bool,
-    image_quality: Optional[str],
-    do_exif_tagging: bool,
-    do_img_optimize: bool,
-    exiftool_path: str,
-    pingo_path: str,
-    bracket_type: Literal["square", "round", "curly"],
-):
-    """
-    Prepare a release of a manga series.
-    """
-
-    if not path_or_archive.is_dir():
-        raise click.BadParameter(
-            f"{path_or_archive} is not a directory. Please provide a directory.",
-            param_hint="path_or_archive",
-        )
-
-    current_pst = datetime.now(timezone(timedelta(hours=-8)))
-    current_year = m_year or current_pst.year
-
-    force_search_exif = not is_executeable_global_path(exiftool_path, "exiftool")
-    exiftool_exe = test_or_find_exiftool(exiftool_path, force_search_exif)
-    if exiftool_exe is None and do_exif_tagging:
-        console.warning("Exiftool not found, will skip tagging image with exif metadata!")
-    force_search_pingo = not is_executeable_global_path(pingo_path, "pingo")
-    pingo_exe = test_or_find_pingo(pingo_path, force_search_pingo)
-    if pingo_exe is None and do_img_optimize:
-        console.warning("Pingo not found, will skip optimizing image!")
-
-    cmx_re = RegexCollection.cmx_re()
-    console.status("Checking folder contents...")
-    for image, _, total_img, _ in file_handler.collect_image_from_folder(path_or_archive):
-        title_match = cmx_re.match(image.name)
-        if title_match is None:
-            console.error("Unmatching file name: {}".format(image.name))
-            return 1
-    console.stop_status("Checking folder contents... done!")
-
-    has_ch_title = console.confirm("Does this release have chapter titles?")
-    rls_information = inquire_chapter_ranges(
-        "Please input information regarding this release...",
-        "Do you want to add another release?",
-        has_ch_title,
-    )
-    rls_information.sort(key=lambda x: x.number)
-
-    packing_extra: Dict[int, List[ChapterRange]] = {}
-    for info in rls_information:
-        if info.base not in packing_extra:
-            packing_extra[info.base] = []
-        packing_extra[info.base].append(info)
-
-    special_naming: Dict[int, SpecialNaming] = {}
-    do_special_get = console.confirm("Do you want to add some special naming?")
-    if do_special_get:
-        while True:
-            page = console.inquire("Page number", lambda y: safe_int(y) is not None)
-            page_number = int(page)
-
-            data = console.inquire("Page type", lambda y: len(y.strip()) > 0)
-            special_naming[page_number] = SpecialNaming(page_number, data)
-
-            do_more = console.confirm("Do you want to add another naming?")
-            if not do_more:
-                break
-
-    console.info("Preparing release...")
-    console.info(f"Has {len(rls_information)} chapters")
-    current = 1
-    console.info("Processing: 1/???")
-    image_titling: Optional[str] = None
-    vol_oshot_warn = False
-    for image, _, total_img, _ in file_handler.collect_image_from_folder(path_or_archive):
-        title_match = cmx_re.match(image.name)
-        if title_match is None:
-            console.error("Unmatching file name: {}".format(image.name))
-            return 1
-
-        p01 = title_match.group("a")
-        p01_copy = int(title_match.group("a"))
-        p02 = title_match.group("b")
-        vol = title_match.group("vol")
-        if p02 is not None:
-            p01 = f"{p01}-{p02}"
-        if vol is None:
-            vol_act = None
-            if not vol_oshot_warn:
-                vol_oshot_warn = True
-                console.warning(
-                    "Volume is not specified, using OShot (Oneshot) as default for image and empty for archive name!"  # noqa: E501
-                )
-        else:
-            if vol.startswith("v"):
-                vol = vol[1:]
-            vol_act = int(vol)
-
-        selected_range: ChapterRange = None
-        for rls_info in rls_information:
-            if rls_info.is_single:
-                if p01_copy >= rls_info.range[0]:
-                    selected_range = rls_info
-                    break
-            else:
-                if p01_copy in rls_info.range:
-                    selected_range = rls_info
-                    break
-        if selected_range is None:
-            console.warning(f"Page {p01} are not included in any range, skipping!")
-            current += 1
-            continue
-
-        extra_name = None
-        if p01_copy in special_naming:
-            extra_name = special_naming[p01_copy].data
-
-        act_img_quality = "HQ" if is_high_quality else None
-        if image_quality is not None:
-            act_img_quality = image_quality
-
-        image_filename, archive_filename = format_daiz_like_filename(
-            m_title=m_title,
-            m_publisher=m_publisher,
-            m_year=current_year,
-            chapter_info=selected_range,
-            page_number=p01,
-            publication_type=m_publication_type,
-            rip_credit=rls_credit,
-            bracket_type=bracket_type,
-            m_volume=vol_act,
-            extra_metadata=extra_name,
-            image_quality=act_img_quality,
-            rls_revision=rls_revision,
-            chapter_extra_maps=packing_extra,
-        )
-
-        if not image_titling:
-            image_titling = archive_filename
-
-        image_filename += image.suffix
-        new_name = image.parent / image_filename
-        image.rename(new_name)
-        console.status(f"Processing: {current}/{total_img}")
-        current += 1
-    console.stop_status(f"Processed {current - 1} images!")
-
-    if pingo_exe is not None and do_img_optimize:
-        console.info("Optimizing images...")
-        optimize_images(pingo_exe, path_or_archive)
-    if exiftool_exe is not None and do_exif_tagging:
-        console.info("Tagging images with exif metadata...")
-        inject_metadata(exiftool_exe, path_or_archive, image_titling, rls_email)
-
-
-@click.command(
-    name="releasesch",
-    help="Prepare a release of a manga chapter.",
-    cls=NNCommandHandler,
-)
-@options.path_or_archive(disable_archive=True)
-@options.m_title
-@options.m_year
-@options.m_publisher
-@options.m_chapter
-@options.m_volume
-@click.option(
-    "-cht",
-    "--chapter-title",
-    "chapter_title",
-    help="Chapter title that will be included between the publication type and publisher",
-    default=None,
-    required=False,
-)
-@options.m_publication_type(chapter_mode=True)
-@options.rls_credit
-@options.rls_email
-@options.rls_revision
-@click.option(
-    "-hq",
-    "--is-high-quality",
-    "is_high_quality",
-    cls=WithDeprecatedOption,
-    is_flag=True,
-    help="Whether this is a high quality release",
-    default=False,
-    deprecated=True,
-    preferred=["-mq", "--quality"],
-)
-@click.option(
-    "-mq",
-    "--quality",
-    "image_quality",
-    type=click.Choice(["LQ", "HQ"]),
-    default=None,
-    help="Image quality of this release.",
-)
-@click.option(
-    "--tag/--no-tag",
-    "do_exif_tagging",
-    default=True,
-    show_default=True,
-    help="Do exif metadata tagging on the files.",
-)
-@click.option(
-    "--optimize/--no-optimize",
-    "do_img_optimize",
-    default=False,
-    show_default=True,
-    help="Optimize the images using pingo.",
-)
-@options.exiftool_path
-@options.pingo_path
-@options.use_bracket_type
-@check_config_first
-@time_program
-def prepare_releases_chapter(
-    path_or_archive: Path,
-    m_title: str,
-    m_year: Optional[int],
-    m_publisher: str,
-    m_chapter: Optional[Union[float, int]],
-    m_volume: Optional[int],
-    chapter_title: Optional[str],
-    m_publication_type: MPublication,
-    rls_credit: str,
-    rls_email: str,
-    rls_revision: int,
-    is_high_quality: bool,
-    image_quality: Optional[str],
-    do_exif_tagging: bool,
-    do_img_optimize: bool,
-    exiftool_path: str,
-    pingo_path: str,
-    bracket_type: Literal["square", "round", "curly"],
-):
-    """
-    Prepare a release of a manga chapter.
-    """
-
-    if not path_or_archive.is_dir():
-        raise click.BadParameter(
-            f"{path_or_archive} is not a directory. Please provide a directory.",
-            param_hint="path_or_archive",
-        )
-
-    if m_chapter is None:
-        raise click.BadParameter(
-            "-ch/--chapter is required for this command.",
-            param_hint="m_chapter",
-        )
-
-    current_pst = datetime.now(timezone(timedelta(hours=-8)))
-    current_year = m_year or current_pst.year
-
-    force_search_exif = not is_executeable_global_path(exiftool_path, "exiftool")
-    exiftool_exe = test_or_find_exiftool(exiftool_path, force_search_exif)
-    if exiftool_exe is None and do_exif_tagging:
-        console.warning("Exiftool not found, will skip tagging image with exif metadata!")
-    force_search_pingo = not is_executeable_global_path(pingo_path, "pingo")
-    pingo_exe = test_or_find_pingo(pingo_path, force_search_pingo)
-    if pingo_exe is None and do_img_optimize:
-        console.warning("Pingo not found, will skip optimizing image!")
-
-    page_re = RegexCollection.page_re()
-    console.status("Checking folder contents...")
-    for image, _, total_img, _ in file_handler.collect_image_from_folder(path_or_archive):
-        title_match = page_re.match(image.name)
-        if title_match is None:
-            console.error("Unmatching file name: {}".format(image.name))
-            return 1
-    console.stop_status("Checking folder contents... done!")
-
-    console.info("Preparing release...")
-    current = 1
-    console.info("Processing: 1/???")
-    image_titling: Optional[str] = None
-    for image, _, total_img, _ in file_handler.collect_image_from_folder(path_or_archive):
-        title_match = page_re.match(image.name)
-        if title_match is None:
-            console.error("Unmatching file name: {}".format(image.name))
-            return 1
-
-        p01 = title_match.group("a")
-        p02 = title_match.group("b")
-        if p02 is not None:
-            p01 = f"{p01}-{p02}"
-
-        ch_range = ChapterRange(m_chapter, chapter_title, [], True)
-        act_img_quality = "HQ" if is_high_quality else None
-        if image_quality is not None:
-            act_img_quality = image_quality
-
-        image_filename, _ = format_daiz_like_filename(
-            m_title=m_title,
-            m_publisher=m_publisher,
-            m_year=current_year,
-            chapter_info=ch_range,
-            page_number=p01,
-            publication_type=m_publication_type,
-            rip_credit=rls_credit,
-            bracket_type=bracket_type,
-            m_volume=m_volume,
-            image_quality=act_img_quality,
-            rls_revision=rls_revision,
-            fallback_volume_name="NA",
-        )
-
-        image_filename += image.suffix
-        new_name = image.parent / image_filename
-        image.rename(new_name)
-        console.status(f"Processing: {current}/{total_img}")
-        current += 1
-    console.stop_status(f"Processed {current - 1} images!")
-
-    if pingo_exe is not None and do_img_optimize:
-        console.info("Optimizing images...")
-        optimize_images(pingo_exe, path_or_archive)
-    if exiftool_exe is not None and do_exif_tagging:
-        console.info("Tagging images with exif metadata...")
-        inject_metadata(exiftool_exe, path_or_archive, image_titling, rls_email)
\ No newline at end of file
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Tuple, Union
+
+import click
+from rich.markup import escape
+
+from .. import config, file_handler, term
+from ..parser import ParsedFilename, parse_cmx_filename, parse_page_filename
+from ..renamer import RenameCollisionError, RenameJournalError, RenamePlan, undo_renames
+from ..spec import SpecError, load_release_spec
+from . import options
+from ._deco import check_config_first, time_program
+from .base import (
+    NNCommandHandler,
+    WithDeprecatedOption,
+    is_executeable_global_path,
+    test_or_find_exiftool,
+    test_or_find_pingo,
+)
+from .common import (
+    ChapterRange,
+    ReleaseNamingPlan,
+    inject_metadata,
+    inquire_chapter_ranges,
+    optimize_images,
+    safe_int,
+)
+from .constants import MPublication
+
+console = term.get_console()
+conf = config.get_config()
+
+__all__ = (
+    "prepare_releases",
+    "prepare_releases_chapter",
+)
+
+
+class SpecialNaming:
+    def __init__(self, page: int, data: str):
+        self.page = page
+        self.data = data
+
+
+def _undo_releases_callback(ctx: click.Context, param: click.Parameter, value: Optional[Path]):
+    if value is None or ctx.resilient_parsing:
+        return
+    try:
+        restored = undo_renames(value)
+    except (RenameJournalError, RenameCollisionError) as exc:
+        console.error(escape(str(exc)))
+        ctx.exit(1)
+    console.info(f"Restored {restored} images to their original name!")
+    ctx.exit(0)
+
+
+def _apply_rename_plan(rename_plan: RenamePlan) -> bool:
+    try:
+        rename_plan.check_collisions()
+    except RenameCollisionError as exc:
+        console.error(escape(str(exc)))
+        return False
+    cycles = rename_plan.find_cycles()
+    if cycles:
+        console.warning(f"Found {len(cycles)} rename cycles, using temporary names for them!")
+    console.status(f"Renaming {len(rename_plan)} images...")
+    rename_plan.apply()
+    console.stop_status(f"Renamed {len(rename_plan)} images!")
+    return True
+
+
+undo_option = click.option(
+    "--undo",
+    "undo_folder",
+    type=click.Path(exists=True, resolve_path=True, file_okay=False, dir_okay=True, path_type=Path),
+    default=None,
+    is_eager=True,
+    expose_value=False,
+    callback=_undo_releases_callback,
+    metavar="FOLDER_PATH",
+    help="Rename the images in the folder back using the journal from the last run, then exit.",
+)
+
+
+@click.command(
+    name="releases",
+    help="Prepare a release of a manga series.",
+    cls=NNCommandHandler,
+)
+@options.path_or_archive(disable_archive=True)
+@options.m_title
+@options.m_year
+@options.m_publisher
+@options.m_publication_type()
+@options.rls_credit
+@options.rls_email
+@options.rls_revision
+@click.option(
+    "-hq",
+    "--is-high-quality",
+    "is_high_quality",
+    cls=WithDeprecatedOption,
+    is_flag=True,
+    help="Whether this is a high quality release",
+    default=False,
+    deprecated=True,
+    preferred=["-mq", "--quality"],
+)
+@click.option(
+    "-mq",
+    "--quality",
+    "image_quality",
+    type=click.Choice(["LQ", "HQ"]),
+    default=None,
+    help="Image quality of this release.",
+)
+@click.option(
+    "--tag/--no-tag",
+    "do_exif_tagging",
+    default=True,
+    show_default=True,
+    help="Do exif metadata tagging on the files.",
+)
+@click.option(
+    "--optimize/--no-optimize",
+    "do_img_optimize",
+    default=False,
+    show_default=True,
+    help="Optimize the images using pingo.",
+)
+@options.exiftool_path
+@options.pingo_path
+@options.rediscover_exec
+@options.use_bracket_type
+@options.rls_spec
+@undo_option
+@check_config_first
+@time_program
+def prepare_releases(
+    path_or_archive: Path,
+    m_title: str,
+    m_year: Optional[int],
+    m_publisher: str,
+    m_publication_type: MPublication,
+    rls_credit: str,
+    rls_email: str,
+    rls_revision: int,
+    is_high_quality: bool,
+    image_quality: Optional[str],
+    do_exif_tagging: bool,
+    do_img_optimize: bool,
+    exiftool_path: str,
+    pingo_path: str,
+    bracket_type: Literal["square", "round", "curly"],
+    spec_file: Optional[Path],
+):
+    """
+    Prepare a release of a manga series.
+    """
+
+    if not path_or_archive.is_dir():
+        raise click.BadParameter(
+            f"{path_or_archive} is not a directory. Please provide a directory.",
+            param_hint="path_or_archive",
+        )
+
+    release_spec = None
+    if spec_file is not None:
+        try:
+            release_spec = load_release_spec(spec_file)
+        except SpecError as exc:
+            raise click.BadParameter(str(exc), param_hint="spec_file")
+
+    current_pst = datetime.now(timezone(timedelta(hours=-8)))
+    current_year = m_year or current_pst.year
+
+    force_search_exif = not is_executeable_global_path(exiftool_path, "exiftool")
+    exiftool_exe = test_or_find_exiftool(exiftool_path, force_search_exif)
+    if exiftool_exe is None and do_exif_tagging:
+        console.warning("Exiftool not found, will skip tagging image with exif metadata!")
+    force_search_pingo = not is_executeable_global_path(pingo_path, "pingo")
+    pingo_exe = test_or_find_pingo(pingo_path, force_search_pingo)
+    if pingo_exe is None and do_img_optimize:
+        console.warning("Pingo not found, will skip optimizing image!")
+
+    console.status("Checking folder contents...")
+    matched_images: List[Tuple[Path, ParsedFilename]] = []
+    for image, _, total_img, _ in file_handler.collect_image_from_folder(path_or_archive):
+        title_match = parse_cmx_filename(image.name)
+        if title_match is None:
+            console.error("Unmatching file name: {}".format(image.name))
+            return 1
+        matched_images.append((image, title_match))
+    console.stop_status("Checking folder contents... done!")
+
+    special_naming: Dict[int, SpecialNaming] = {}
+    if release_spec is not None:
+        console.info(f"Using release information from {spec_file.name}")
+        rls_information = release_spec.chapters
+        for page_number, data in release_spec.special_naming.items():
+            special_naming[page_number] = SpecialNaming(page_number, data)
+    else:
+        has_ch_title = console.confirm("Does this release have chapter titles?")
+        rls_information = inquire_chapter_ranges(
+            "Please input information regarding this release...",
+            "Do you want to add another release?",
+            has_ch_title,
+        )
+
+    do_special_get = release_spec is None and console.confirm("Do you want to add some special naming?")
+    if do_special_get:
+        while True:
+            page = console.inquire("Page number", lambda y: safe_int(y) is not None)
+            page_number = int(page)
+
+            data = console.inquire("Page type", lambda y: len(y.strip()) > 0)
+            special_naming[page_number] = SpecialNaming(page_number, data)
+
+            do_more = console.confirm("Do you want to add another naming?")
+            if not do_more:
+                break
+
+    act_img_quality = "HQ" if is_high_quality else None
+    if image_quality is not None:
+        act_img_quality = image_quality
+
+    naming_plan = ReleaseNamingPlan(
+        m_title=m_title,
+        m_publisher=m_publisher,
+        m_year=current_year,
+        chapters=list(rls_information),
+        publication_type=m_publication_type,
+        rip_credit=rls_credit,
+        bracket_type=bracket_type,
+        image_quality=act_img_quality,
+        rls_revision=rls_revision,
+    )
+
+    console.info("Preparing release...")
+    console.info(f"Has {len(rls_information)} chapters")
+    total_img = len(matched_images)
+    image_titling: Optional[str] = None
+    vol_oshot_warn = False
+    rename_plan = RenamePlan(path_or_archive)
+    with console.progress("Processing", total=total_img, unit="images") as progress:
+        for image, title_match in matched_images:
+            p01 = title_match.group("a")
+            p01_copy = int(title_match.group("a"))
+            p02 = title_match.group("b")
+            vol = title_match.group("vol")
+            if p02 is not None:
+                p01 = f"{p01}-{p02}"
+            if vol is None:
+                vol_act = None
+                if not vol_oshot_warn:
+                    vol_oshot_warn = True
+                    console.warning(
+                        "Volume is not specified, using OShot (Oneshot) as default for image and empty for archive name!"  # noqa: E501
+                    )
+            else:
+                if vol.startswith("v"):
+                    vol = vol[1:]
+                vol_act = int(vol)
+
+            selected_range = rls_information.find(p01_copy)
+            if selected_range is None:
+                console.warning(f"Page {p01} are not included in any range, skipping!")
+                progress.advance()
+                continue
+
+            extra_name = None
+            if p01_copy in special_naming:
+                extra_name = special_naming[p01_copy].data
+
+            if not image_titling:
+                image_titling = naming_plan.archive_name(selected_range, vol_act)
+
+            image_filename = naming_plan.image_name(selected_range, p01, vol_act, extra_name)
+            rename_plan.add(image, image_filename + image.suffix)
+            progress.advance()
+        progress.stop(f"Processed {progress.count} images!")
+    if not _apply_rename_plan(rename_plan):
+        return 1
+
+    if pingo_exe is not None and do_img_optimize:
+        console.info("Optimizing images...")
+        optimize_images(pingo_exe, path_or_archive)
+    if exiftool_exe is not None and do_exif_tagging:
+        console.info("Tagging images with exif metadata...")
+        inject_metadata(exiftool_exe, path_or_archive, image_titling, rls_email)
+
+
+@click.command(
+    name="releasesch",
+    help="Prepare a release of a manga chapter.",
+    cls=NNCommandHandler,
+)
+@options.path_or_archive(disable_archive=True)
+@options.m_title
+@options.m_year
+@options.m_publisher
+@options.m_chapter
+@options.m_volume
+@click.option(
+    "-cht",
+    "--chapter-title",
+    "chapter_title",
+    help="Chapter title that will be included between the publication type and publisher",
+    default=None,
+    required=False,
+)
+@options.m_publication_type(chapter_mode=True)
+@options.rls_credit
+@options.rls_email
+@options.rls_revision
+@click.option(
+    "-hq",
+    "--is-high-quality",
+    "is_high_quality",
+    cls=WithDeprecatedOption,
+    is_flag=True,
+    help="Whether this is a high quality release",
+    default=False,
+    deprecated=True,
+    preferred=["-mq", "--quality"],
+)
+@click.option(
+    "-mq",
+    "--quality",
+    "image_quality",
+    type=click.Choice(["LQ", "HQ"]),
+    default=None,
+    help="Image quality of this release.",
+)
+@click.option(
+    "--tag/--no-tag",
+    "do_exif_tagging",
+    default=True,
+    show_default=True,
+    help="Do exif metadata tagging on the files.",
+)
+@click.option(
+    "--optimize/--no-optimize",
+    "do_img_optimize",
+    default=False,
+    show_default=True,
+    help="Optimize the images using pingo.",
+)
+@options.exiftool_path
+@options.pingo_path
+@options.rediscover_exec
+@options.use_bracket_type
+@undo_option
+@check_config_first
+@time_program
+def prepare_releases_chapter(
+    path_or_archive: Path,
+    m_title: str,
+    m_year: Optional[int],
+    m_publisher: str,
+    m_chapter: Optional[Union[float, int]],
+    m_volume: Optional[int],
+    chapter_title: Optional[str],
+    m_publication_type: MPublication,
+    rls_credit: str,
+    rls_email: str,
+    rls_revision: int,
+    is_high_quality: bool,
+    image_quality: Optional[str],
+    do_exif_tagging: bool,
+    do_img_optimize: bool,
+    exiftool_path: str,
+    pingo_path: str,
+    bracket_type: Literal["square", "round", "curly"],
+):
+    """
+    Prepare a release of a manga chapter.
+    """
+
+    if not path_or_archive.is_dir():
+        raise click.BadParameter(
+            f"{path_or_archive} is not a directory. Please provide a directory.",
+            param_hint="path_or_archive",
+        )
+
+    if m_chapter is None:
+        raise click.BadParameter(
+            "-ch/--chapter is required for this command.",
+            param_hint="m_chapter",
+        )
+
+    current_pst = datetime.now(timezone(timedelta(hours=-8)))
+    current_year = m_year or current_pst.year
+
+    force_search_exif = not is_executeable_global_path(exiftool_path, "exiftool")
+    exiftool_exe = test_or_find_exiftool(exiftool_path, force_search_exif)
+    if exiftool_exe is None and do_exif_tagging:
+        console.warning("Exiftool not found, will skip tagging image with exif metadata!")
+    force_search_pingo = not is_executeable_global_path(pingo_path, "pingo")
+    pingo_exe = test_or_find_pingo(pingo_path, force_search_pingo)
+    if pingo_exe is None and do_img_optimize:
+        console.warning("Pingo not found, will skip optimizing image!")
+
+    console.status("Checking folder contents...")
+    matched_images: List[Tuple[Path, ParsedFilename]] = []
+    for image, _, total_img, _ in file_handler.collect_image_from_folder(path_or_archive):
+        title_match = parse_page_filename(image.name)
+        if title_match is None:
+            console.error("Unmatching file name: {}".format(image.name))
+            return 1
+        matched_images.append((image, title_match))
+    console.stop_status("Checking folder contents... done!")
+
+    act_img_quality = "HQ" if is_high_quality else None
+    if image_quality is not None:
+        act_img_quality = image_quality
+
+    ch_range = ChapterRange(m_chapter, chapter_title, [], True)
+    naming_plan = ReleaseNamingPlan(
+        m_title=m_title,
+        m_publisher=m_publisher,
+        m_year=current_year,
+        chapters=[ch_range],
+        publication_type=m_publication_type,
+        rip_credit=rls_credit,
+        bracket_type=bracket_type,
+        image_quality=act_img_quality,
+        rls_revision=rls_revision,
+        fallback_volume_name="NA",
+    )
+
+    console.info("Preparing release...")
+    total_img = len(matched_images)
+    image_titling: Optional[str] = None
+    rename_plan = RenamePlan(path_or_archive)
+    with console.progress("Processing", total=total_img, unit="images") as progress:
+        for image, title_match in matched_images:
+            p01 = title_match.group("a")
+            p02 = title_match.group("b")
+            if p02 is not None:
+                p01 = f"{p01}-{p02}"
+
+            image_filename = naming_plan.image_name(ch_range, p01, m_volume)
+            rename_plan.add(image, image_filename + image.suffix)
+            progress.advance()
+        progress.stop(f"Processed {progress.count} images!")
+    if not _apply_rename_plan(rename_plan):
+        return 1
+
+    if pingo_exe is not None and do_img_optimize:
+        console.info("Optimizing images...")
+        optimize_images(pingo_exe, path_or_archive)
+    if exiftool_exe is not None and do_exif_tagging:
+        console.info("Tagging images with exif metadata...")
+        inject_metadata(exiftool_exe, path_or_archive, image_titling, rls_email)
@@ -0,0 +1,67 @@
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from .. import term
+from ..client import SOCKET_ENV, default_socket_path
+from .base import NNCommandHandler
+
+console = term.get_console()
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+@click.command(
+    name="serve",
+    help="Run a job server, `nn --client <command>` then runs the command in it without the startup cost."
+    " The commands can't ask questions, give the answers as options (e.g. --spec)",
+    cls=NNCommandHandler,
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, resolve_path=True, path_type=Path),
+    default=None,
+    help=f"The Unix socket to listen on, default to ${SOCKET_ENV}, or nn.sock in $XDG_RUNTIME_DIR or the temp folder",
+)
+def serve(socket_path: Optional[Path]):
+    if not hasattr(socket, "AF_UNIX"):
+        console.error("Unix sockets are not supported on this platform!")
+        return 1
+
+    from ..server import JobServer, ServerAlreadyRunning
+
+    server = JobServer(socket_path or default_socket_path())
+    try:
+        server.bind()
+    except (ServerAlreadyRunning, OSError) as exc:
+        console.error(str(exc))
+        return 1
+
+    try:
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+    except ValueError:
+        # Not in the main thread
+        pass
+
+    try:
+        start = time.perf_counter()
+        console.status("Warming up...")
+        server.warm_up()
+        console.stop_status(f"Warmed up in {time.perf_counter() - start:.2f}s")
+        console.info(f"Listening on {server.socket_path}")
+        if socket_path is not None:
+            console.info(f"Run the commands with `{SOCKET_ENV}={server.socket_path} nn --client <command>`")
+        else:
+            console.info("Run the commands with `nn --client <command>`")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.info("Stopping the server")
+    finally:
+        server.close()
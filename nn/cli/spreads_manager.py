@@ -1,338 +1,583 @@
-import re
-import subprocess as sp
-from dataclasses import dataclass
-from os import path
-from pathlib import Path
-from shutil import move as mv
-from typing import Dict, List, Optional, TypedDict
-
-import click
-
-from .. import file_handler, term
-from . import options
-from ._deco import time_program
-from .base import NNCommandHandler, RegexCollection, test_or_find_magick
-
-console = term.get_console()
-_SpreadsRe = re.compile(r"[\d]{1,3}(-[\d]{1,3}){1,}")
-
-
-def _is_default_path(path: str) -> bool:
-    path = path.lower()
-    if path == "magick":
-        return True
-    if path == "./magick":
-        return True
-    if path == ".\\magick":
-        return True
-    return False
-
-
-def make_prefix_convert(magick_exe: str):
-    name = path.splitext(path.basename(magick_exe))[0]
-    if name.lower() == "convert":
-        return ["convert"]
-    return ["magick", "convert"]
-
-
-@dataclass
-class _ExportedImage:
-    path: Path
-    prefix: Optional[str] = None
-    postfix: Optional[str] = None
-
-
-def execute_spreads_join(
-    magick_dir: str,
-    quality: float,
-    input_imgs: List[_ExportedImage],
-    out_dir: Path,
-    reverse_mode: bool,
-    output_fmt: str = "auto",
-):
-    extensions = [x.path.suffix for x in input_imgs]
-    select_ext = ".jpg"
-    if ".png" in extensions:
-        select_ext = ".png"
-    if output_fmt != "auto":
-        select_ext = f".{output_fmt}"
-    output_name = file_handler.random_name() + select_ext
-    execute_this = make_prefix_convert(magick_dir)
-    input_imgs.sort(key=lambda x: x.path.name)
-    if reverse_mode:
-        input_imgs.reverse()
-    execute_this += list(map(lambda x: str(x.path), input_imgs))
-    execute_this += ["-quality", f"{quality:.2f}%", "+append", f"{out_dir / output_name}"]
-    try:
-        sp.run(execute_this, check=True, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
-    except sp.CalledProcessError as e:
-        console.error(f"Error: {e.output.decode('utf-8')}")
-        raise e
-    return output_name
-
-
-def execute_spreads_split(
-    magick_dir: str,
-    quality: float,
-    input_img: _ExportedImage,
-    out_dir: Path,
-    output_fmt: str = "auto",
-):
-    select_ext = ".jpg"
-    if ".png" in input_img.path.suffix:
-        select_ext = ".png"
-    if output_fmt != "auto":
-        select_ext = f".{output_fmt}"
-    output_name = file_handler.random_name() + select_ext
-    execute_this = make_prefix_convert(magick_dir)
-    execute_this += ["-crop", "50%x100%", f"{input_img.path}"]
-    execute_this += ["-quality", f"{quality:.2f}%", f"{out_dir / output_name}"]
-    try:
-        sp.run(execute_this, check=True, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
-    except sp.CalledProcessError as e:
-        console.error(f"Error: {e.output.decode('utf-8')}")
-        raise e
-    return output_name
-
-
-class _ExportedImages(TypedDict):
-    imgs: List[_ExportedImage]
-    pattern: List[int]
-
-
-@dataclass
-class _SplitSpreads:
-    img: _ExportedImage
-    a_part: int
-    b_part: int
-
-
-quality_option = click.option(
-    "-q",
-    "--quality",
-    "quality",
-    default=100.0,
-    show_default=True,
-    type=click.FloatRange(1.0, 100.0),
-    help="The quality of the output image",
-)
-reverse_direction = click.option(
-    "-r",
-    "--reverse",
-    "reverse",
-    is_flag=True,
-    default=False,
-    help="Reverse the order of the spreads (manga mode)",
-)
-format_output = click.option(
-    "-f",
-    "--format",
-    "image_fmt",
-    default="auto",
-    show_default=True,
-    type=click.Choice(["auto", "png", "jpg"]),
-    help="The format of the output image, auto will detect the format from the input images",
-)
-
-
-@click.group(name="spreads", help="Manage spreads from a directory of images")
-def spreads():
-    pass
-
-
-@spreads.command(name="join", help="Join multiple spreads into a single image", cls=NNCommandHandler)
-@options.path_or_archive(disable_archive=True)
-@quality_option
-@click.option(
-    "-s",
-    "--spreads",
-    "spreads_data",
-    required=True,
-    multiple=True,
-    help="The spread information, can be repeated and must contain something like: 1-2",
-    metavar="A-B",
-)
-@reverse_direction
-@format_output
-@options.magick_path
-@time_program
-def spreads_join(
-    path_or_archive: Path,
-    quality: float,
-    spreads_data: List[str],
-    reverse: bool,
-    image_fmt: str,
-    magick_path: str,
-):
-    """
-    Join multiple spreads into a single image
-    """
-    force_search = not _is_default_path(magick_path)
-    magick_exe = test_or_find_magick(magick_path, force_search)
-    if magick_exe is None:
-        console.error("Could not find the magick executable")
-        return 1
-    console.info("Using magick executable: {}".format(magick_exe))
-
-    if not path_or_archive.is_dir():
-        raise click.BadParameter(
-            f"{path_or_archive} is not a directory. Please provide a directory.",
-            param_hint="path_or_archive",
-        )
-
-    spreads_data = [x.strip() for x in spreads_data]
-    valid_spreads_data: Dict[str, List[int]] = {}
-    for idx, spread in enumerate(spreads_data):
-        matched_data = _SpreadsRe.match(spread)
-        if not matched_data:
-            console.error(f"Invalid spread data: {spread}")
-            return 1
-        matched_data = matched_data.group(0)
-        matched_data = matched_data.split("-")
-        matched_data = [int(x) for x in matched_data]
-        valid_spreads_data[f"spread_{idx}"] = matched_data
-
-    page_re = RegexCollection.page_re()
-
-    exported_imgs: Dict[str, _ExportedImages] = {x: {"imgs": [], "pattern": y} for x, y in valid_spreads_data.items()}
-    console.info("Collecting image for spreads...")
-    with file_handler.MArchive(path_or_archive) as archive:
-        for image, _ in archive:
-            title_match = page_re.match(image.stem)
-
-            if title_match is None:
-                console.error("Unmatching file name: {}".format(image.filename))
-                return 1
-
-            a_part = title_match.group("a")
-            b_part = title_match.group("b")
-            prefix_text = title_match.group("any")
-            postfix_text = title_match.group("anyback")
-            if b_part:
-                continue
-            a_part = int(a_part)
-            for spd, spreads in valid_spreads_data.items():
-                if a_part in spreads:
-                    im_data = _ExportedImage(image.access(), prefix_text, postfix_text)
-                    exported_imgs[spd]["imgs"].append(im_data)
-
-    total_match_spread = len(list(exported_imgs.keys()))
-    current = 1
-    for spread, imgs in exported_imgs.items():
-        console.status(f"Joining spreads: {current}/{total_match_spread}")
-        temp_output = execute_spreads_join(magick_exe, quality, imgs["imgs"], path_or_archive, reverse, image_fmt)
-        pattern = imgs["pattern"]
-        pattern.sort()
-        first_val = pattern[0]
-        last_val = pattern[-1]
-        first_img = imgs["imgs"][0]
-        pre_t = first_img.prefix or ""
-        post_t = first_img.postfix or ""
-
-        extension = path.splitext(temp_output)[1]
-        final_filename = f"{pre_t}p{first_val:03d}-{last_val:03d}{post_t}"
-        final_filename += extension
-        final_path = path_or_archive / final_filename
-        temp_output_path = path_or_archive / temp_output
-        temp_output_path.rename(final_path)
-        current += 1
-    console.stop_status(f"Joined {total_match_spread} spreads")
-
-    BACKUP_DIR = path_or_archive / "backup"
-    BACKUP_DIR.mkdir(exist_ok=True)
-    console.info("Backing up old files to: {}".format(BACKUP_DIR))
-    for img_data in exported_imgs.values():
-        for image in img_data["imgs"]:
-            try:
-                mv(image.path, BACKUP_DIR / path.basename(image.path.name))
-            except FileNotFoundError:
-                pass
-
-
-@spreads.command(name="split", help="Split a joined spreads into two images", cls=NNCommandHandler)
-@options.path_or_archive(disable_archive=True)
-@quality_option
-@reverse_direction
-@format_output
-@options.magick_path
-@time_program
-def spreads_split(
-    path_or_archive: Path,
-    quality: float,
-    reverse: bool,
-    image_fmt: str,
-    magick_path: str,
-):
-    """
-    Split a joined spreads into two images
-    """
-    force_search = not _is_default_path(magick_path)
-    magick_exe = test_or_find_magick(magick_path, force_search)
-    if magick_exe is None:
-        console.error("Could not find the magick executable")
-        return 1
-    console.info("Using magick executable: {}".format(magick_exe))
-
-    if not path_or_archive.is_dir():
-        raise click.BadParameter(
-            f"{path_or_archive} is not a directory. Please provide a directory.",
-            param_hint="path_or_archive",
-        )
-
-    image_list: List[_SplitSpreads] = []
-    page_re = RegexCollection.page_re()
-    console.info("Collecting image for spreads...")
-    with file_handler.MArchive(path_or_archive) as archive:
-        for image, _ in archive:
-            title_match = page_re.match(image.stem)
-
-            if title_match is None:
-                console.warning("Unmatching file name: {}".format(image.filename))
-                continue
-
-            a_part = title_match.group("a")
-            b_part = title_match.group("b")
-            prefix_text = title_match.group("any")
-            postfix_text = title_match.group("anyback")
-            if not b_part:
-                continue
-            a_part = int(a_part)
-            b_part = int(b_part)
-            im_data = _ExportedImage(image.access(), prefix_text, postfix_text)
-            split_spread = _SplitSpreads(img=im_data, a_part=a_part, b_part=b_part)
-            image_list.append(split_spread)
-    console.info(f"Found {len(image_list)} spreads to split")
-
-    for idx, split_spread in enumerate(image_list):
-        console.status(f"Splitting spreads: {idx + 1}/{len(image_list)}")
-        output_name = execute_spreads_split(
-            magick_exe,
-            quality,
-            split_spread.img,
-            path_or_archive,
-            image_fmt,
-        )
-
-        output_fn, output_fmt = path.splitext(output_name)
-        first_img = output_fn + "-0" + output_fmt
-        second_img = output_fn + "-1" + output_fmt
-
-        pre_t = split_spread.img.prefix or ""
-        post_t = split_spread.img.postfix or ""
-        first_val = split_spread.a_part if not reverse else split_spread.b_part
-        second_val = split_spread.b_part if not reverse else split_spread.a_part
-
-        final_a = f"{pre_t}p{first_val:03d}{post_t}{output_fmt}"
-        final_b = f"{pre_t}p{second_val:03d}{post_t}{output_fmt}"
-
-        (path_or_archive / first_img).rename(path_or_archive / final_a)
-        (path_or_archive / second_img).rename(path_or_archive / final_b)
-    console.stop_status(f"Splitted {len(image_list)} spreads")
-
-    BACKUP_DIR = path_or_archive / "backup"
-    BACKUP_DIR.mkdir(exist_ok=True)
-    for image in image_list:
-        try:
-            mv(image.img.path, BACKUP_DIR / path.basename(image.img.path.name))
-        except FileNotFoundError:
-            pass
\ No newline at end of file
+import json
+import re
+import subprocess as sp
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from os import path
+from pathlib import Path
+from shutil import move as mv
+from typing import Dict, List, Optional, Set, TextIO, Tuple, TypedDict
+
+import click
+
+from .. import file_handler, term
+from ..parser import parse_page_filename
+from ..spreads import (
+    SplitOffset,
+    SpreadsBackend,
+    detect_spreads,
+    find_gutter_offset,
+    join_spread,
+    split_spread,
+)
+from ..trace import span
+from . import options
+from ._deco import time_program
+from .base import NNCommandHandler, test_or_find_magick
+
+console = term.get_console()
+_SpreadsRe = re.compile(r"[\d]{1,3}(-[\d]{1,3}){1,}")
+
+
+def _is_default_path(path: str) -> bool:
+    path = path.lower()
+    if path == "magick":
+        return True
+    if path == "./magick":
+        return True
+    if path == ".\\magick":
+        return True
+    return False
+
+
+def make_prefix_convert(magick_exe: str):
+    name = path.splitext(path.basename(magick_exe))[0]
+    if name.lower() == "convert":
+        return ["convert"]
+    return ["magick", "convert"]
+
+
+@dataclass
+class _ExportedImage:
+    path: Path
+    prefix: Optional[str] = None
+    postfix: Optional[str] = None
+
+
+def _select_join_ext(input_imgs: List[_ExportedImage], output_fmt: str = "auto") -> str:
+    if output_fmt != "auto":
+        return f".{output_fmt}"
+    extensions = [x.path.suffix for x in input_imgs]
+    if ".png" in extensions:
+        return ".png"
+    return ".jpg"
+
+
+def _select_split_ext(input_img: _ExportedImage, output_fmt: str = "auto") -> str:
+    if output_fmt != "auto":
+        return f".{output_fmt}"
+    if ".png" in input_img.path.suffix:
+        return ".png"
+    return ".jpg"
+
+
+def execute_spreads_join(
+    magick_dir: str,
+    quality: float,
+    input_imgs: List[_ExportedImage],
+    out_dir: Path,
+    reverse_mode: bool,
+    output_fmt: str = "auto",
+):
+    output_name = file_handler.random_name() + _select_join_ext(input_imgs, output_fmt)
+    execute_this = make_prefix_convert(magick_dir)
+    input_imgs.sort(key=lambda x: x.path.name)
+    if reverse_mode:
+        input_imgs.reverse()
+    execute_this += list(map(lambda x: str(x.path), input_imgs))
+    execute_this += ["-quality", f"{quality:.2f}%", "+append", f"{out_dir / output_name}"]
+    try:
+        with span("magick", output=output_name):
+            sp.run(execute_this, check=True, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+    except sp.CalledProcessError as e:
+        console.error(f"Error: {e.output.decode('utf-8')}")
+        raise e
+    return output_name
+
+
+def execute_spreads_split(
+    magick_dir: str,
+    quality: float,
+    input_img: _ExportedImage,
+    out_dir: Path,
+    output_fmt: str = "auto",
+    split_offset: Optional[int] = None,
+):
+    output_name = file_handler.random_name() + _select_split_ext(input_img, output_fmt)
+    execute_this = make_prefix_convert(magick_dir)
+    if split_offset is None:
+        execute_this += ["-crop", "50%x100%", f"{input_img.path}"]
+        execute_this += ["-quality", f"{quality:.2f}%", f"{out_dir / output_name}"]
+    else:
+        # Write both halves with the same -0/-1 suffix that the tiled crop produces
+        output_fn, output_ext = path.splitext(output_name)
+        execute_this += [f"{input_img.path}", "(", "+clone", "-crop", f"{split_offset}x+0+0", "+repage"]
+        execute_this += ["-quality", f"{quality:.2f}%", "-write", f"{out_dir / (output_fn + '-0' + output_ext)}"]
+        execute_this += ["+delete", ")", "-crop", f"+{split_offset}+0", "+repage"]
+        execute_this += ["-quality", f"{quality:.2f}%", f"{out_dir / (output_fn + '-1' + output_ext)}"]
+    try:
+        with span("magick", output=output_name):
+            sp.run(execute_this, check=True, stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+    except sp.CalledProcessError as e:
+        console.error(f"Error: {e.output.decode('utf-8')}")
+        raise e
+    return output_name
+
+
+class _ExportedImages(TypedDict):
+    imgs: List[_ExportedImage]
+    pattern: List[int]
+
+
+@dataclass
+class _SplitSpreads:
+    img: _ExportedImage
+    a_part: int
+    b_part: int
+
+
+quality_option = click.option(
+    "-q",
+    "--quality",
+    "quality",
+    default=100.0,
+    show_default=True,
+    type=click.FloatRange(1.0, 100.0),
+    help="The quality of the output image",
+)
+reverse_direction = click.option(
+    "-r",
+    "--reverse",
+    "reverse",
+    is_flag=True,
+    default=False,
+    help="Reverse the order of the spreads (manga mode)",
+)
+format_output = click.option(
+    "-f",
+    "--format",
+    "image_fmt",
+    default="auto",
+    show_default=True,
+    type=click.Choice(["auto", "png", "jpg"]),
+    help="The format of the output image, auto will detect the format from the input images",
+)
+backend_option = click.option(
+    "-b",
+    "--backend",
+    "backend",
+    type=click.Choice(SpreadsBackend),
+    default=SpreadsBackend.pillow,
+    show_default=True,
+    help="The backend used to join or split the spreads",
+)
+jobs_option = click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of spreads to process in parallel with the pillow backend [default: CPU count]",
+)
+
+
+def _find_magick(magick_path: str) -> Optional[str]:
+    force_search = not _is_default_path(magick_path)
+    magick_exe = test_or_find_magick(magick_path, force_search)
+    if magick_exe is None:
+        console.error("Could not find the magick executable")
+        return None
+    console.info("Using magick executable: {}".format(magick_exe))
+    return magick_exe
+
+
+@click.group(name="spreads", help="Manage spreads from a directory of images")
+def spreads():
+    pass
+
+
+@spreads.command(name="join", help="Join multiple spreads into a single image", cls=NNCommandHandler)
+@options.path_or_archive(disable_archive=True)
+@quality_option
+@click.option(
+    "-s",
+    "--spreads",
+    "spreads_data",
+    required=True,
+    multiple=True,
+    help="The spread information, can be repeated and must contain something like: 1-2",
+    metavar="A-B",
+)
+@reverse_direction
+@format_output
+@backend_option
+@jobs_option
+@options.magick_path
+@options.rediscover_exec
+@time_program
+def spreads_join(
+    path_or_archive: Path,
+    quality: float,
+    spreads_data: List[str],
+    reverse: bool,
+    image_fmt: str,
+    backend: SpreadsBackend,
+    jobs: Optional[int],
+    magick_path: str,
+):
+    """
+    Join multiple spreads into a single image
+    """
+    magick_exe: Optional[str] = None
+    if backend == SpreadsBackend.magick:
+        magick_exe = _find_magick(magick_path)
+        if magick_exe is None:
+            return 1
+
+    if not path_or_archive.is_dir():
+        raise click.BadParameter(
+            f"{path_or_archive} is not a directory. Please provide a directory.",
+            param_hint="path_or_archive",
+        )
+
+    spreads_data = [x.strip() for x in spreads_data]
+    valid_spreads_data: Dict[str, List[int]] = {}
+    for idx, spread in enumerate(spreads_data):
+        matched_data = _SpreadsRe.match(spread)
+        if not matched_data:
+            console.error(f"Invalid spread data: {spread}")
+            return 1
+        matched_data = matched_data.group(0)
+        matched_data = matched_data.split("-")
+        matched_data = [int(x) for x in matched_data]
+        valid_spreads_data[f"spread_{idx}"] = matched_data
+
+    console.info("Collecting image for spreads...")
+    page_index: Dict[int, List[_ExportedImage]] = {}
+    with file_handler.MArchive(path_or_archive) as archive:
+        for image, _ in archive:
+            title_match = parse_page_filename(image.stem)
+
+            if title_match is None:
+                console.error("Unmatching file name: {}".format(image.filename))
+                return 1
+
+            a_part = title_match.group("a")
+            b_part = title_match.group("b")
+            prefix_text = title_match.group("any")
+            postfix_text = title_match.group("anyback")
+            if b_part:
+                continue
+            im_data = _ExportedImage(image.access(), prefix_text, postfix_text)
+            page_index.setdefault(int(a_part), []).append(im_data)
+
+    exported_imgs: Dict[str, _ExportedImages] = {}
+    for spd, pattern in valid_spreads_data.items():
+        spread_imgs: List[_ExportedImage] = []
+        for page in pattern:
+            spread_imgs.extend(page_index.get(page, []))
+        if not spread_imgs:
+            console.warning(f"No images found for spread {'-'.join(map(str, pattern))}, skipping!")
+            continue
+        exported_imgs[spd] = {"imgs": spread_imgs, "pattern": pattern}
+
+    def _final_join_path(imgs: _ExportedImages, extension: str) -> Path:
+        pattern = sorted(imgs["pattern"])
+        first_img = imgs["imgs"][0]
+        pre_t = first_img.prefix or ""
+        post_t = first_img.postfix or ""
+        return path_or_archive / f"{pre_t}p{pattern[0]:03d}-{pattern[-1]:03d}{post_t}{extension}"
+
+    total_match_spread = len(exported_imgs)
+    joined_spreads: List[str] = []
+    console.status(f"Joining spreads: 0/{total_match_spread}")
+    if magick_exe is not None:
+        for current, (spread, imgs) in enumerate(exported_imgs.items(), 1):
+            console.status(f"Joining spreads: {current}/{total_match_spread}")
+            temp_output = execute_spreads_join(magick_exe, quality, imgs["imgs"], path_or_archive, reverse, image_fmt)
+            final_path = _final_join_path(imgs, path.splitext(temp_output)[1])
+            (path_or_archive / temp_output).rename(final_path)
+            joined_spreads.append(spread)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures: Dict[str, Future] = {}
+            for spread, imgs in exported_imgs.items():
+                imgs["imgs"].sort(key=lambda x: x.path.name)
+                input_paths = [x.path for x in imgs["imgs"]]
+                if reverse:
+                    input_paths.reverse()
+                final_path = _final_join_path(imgs, _select_join_ext(imgs["imgs"], image_fmt))
+                futures[spread] = executor.submit(join_spread, input_paths, final_path, quality)
+            for current, (spread, future) in enumerate(futures.items(), 1):
+                try:
+                    future.result()
+                    joined_spreads.append(spread)
+                except Exception as exc:
+                    console.error(f"Failed to join spread {spread}: {exc}")
+                console.status(f"Joining spreads: {current}/{total_match_spread}")
+    console.stop_status(f"Joined {len(joined_spreads)} spreads")
+
+    BACKUP_DIR = path_or_archive / "backup"
+    BACKUP_DIR.mkdir(exist_ok=True)
+    console.info("Backing up old files to: {}".format(BACKUP_DIR))
+    for spread in joined_spreads:
+        for image in exported_imgs[spread]["imgs"]:
+            try:
+                mv(image.path, BACKUP_DIR / path.basename(image.path.name))
+            except FileNotFoundError:
+                pass
+
+    if len(joined_spreads) != total_match_spread:
+        return 1
+
+
+@spreads.command(name="split", help="Split a joined spreads into two images", cls=NNCommandHandler)
+@options.path_or_archive(disable_archive=True)
+@quality_option
+@reverse_direction
+@format_output
+@backend_option
+@jobs_option
+@click.option(
+    "-gw",
+    "--gutter-window",
+    "gutter_window",
+    default=0.05,
+    show_default=True,
+    type=click.FloatRange(0.0, 0.5),
+    help="Fraction of the width searched on each side of the center for the gutter, 0 to always split at the center",
+)
+@click.option(
+    "--report",
+    "report_file",
+    type=click.File("w", encoding="utf-8"),
+    default=None,
+    help="Write the split offset of each spread as JSON to the file (use - for stdout)",
+)
+@options.magick_path
+@options.rediscover_exec
+@time_program
+def spreads_split(
+    path_or_archive: Path,
+    quality: float,
+    reverse: bool,
+    image_fmt: str,
+    backend: SpreadsBackend,
+    jobs: Optional[int],
+    gutter_window: float,
+    report_file: Optional[TextIO],
+    magick_path: str,
+):
+    """
+    Split a joined spreads into two images
+    """
+    magick_exe: Optional[str] = None
+    if backend == SpreadsBackend.magick:
+        magick_exe = _find_magick(magick_path)
+        if magick_exe is None:
+            return 1
+
+    if not path_or_archive.is_dir():
+        raise click.BadParameter(
+            f"{path_or_archive} is not a directory. Please provide a directory.",
+            param_hint="path_or_archive",
+        )
+
+    image_list: List[_SplitSpreads] = []
+    console.info("Collecting image for spreads...")
+    with file_handler.MArchive(path_or_archive) as archive:
+        for image, _ in archive:
+            title_match = parse_page_filename(image.stem)
+
+            if title_match is None:
+                console.warning("Unmatching file name: {}".format(image.filename))
+                continue
+
+            a_part = title_match.group("a")
+            b_part = title_match.group("b")
+            prefix_text = title_match.group("any")
+            postfix_text = title_match.group("anyback")
+            if not b_part:
+                continue
+            a_part = int(a_part)
+            b_part = int(b_part)
+            im_data = _ExportedImage(image.access(), prefix_text, postfix_text)
+            split_spread_data = _SplitSpreads(img=im_data, a_part=a_part, b_part=b_part)
+            image_list.append(split_spread_data)
+    console.info(f"Found {len(image_list)} spreads to split")
+
+    def _final_split_paths(split_spread_data: _SplitSpreads, extension: str) -> Tuple[Path, Path]:
+        pre_t = split_spread_data.img.prefix or ""
+        post_t = split_spread_data.img.postfix or ""
+        first_val = split_spread_data.a_part if not reverse else split_spread_data.b_part
+        second_val = split_spread_data.b_part if not reverse else split_spread_data.a_part
+        final_a = path_or_archive / f"{pre_t}p{first_val:03d}{post_t}{extension}"
+        final_b = path_or_archive / f"{pre_t}p{second_val:03d}{post_t}{extension}"
+        return final_a, final_b
+
+    splitted_spreads: List[_SplitSpreads] = []
+    split_offsets: Dict[str, SplitOffset] = {}
+    console.status(f"Splitting spreads: 0/{len(image_list)}")
+    if magick_exe is not None:
+        for idx, split_spread_data in enumerate(image_list):
+            console.status(f"Splitting spreads: {idx + 1}/{len(image_list)}")
+            split_offset = None
+            if gutter_window > 0:
+                split_result = find_gutter_offset(split_spread_data.img.path, gutter_window)
+                split_offsets[split_spread_data.img.path.name] = split_result
+                split_offset = split_result.offset
+            output_name = execute_spreads_split(
+                magick_exe,
+                quality,
+                split_spread_data.img,
+                path_or_archive,
+                image_fmt,
+                split_offset,
+            )
+
+            output_fn, output_fmt = path.splitext(output_name)
+            first_img = output_fn + "-0" + output_fmt
+            second_img = output_fn + "-1" + output_fmt
+            final_a, final_b = _final_split_paths(split_spread_data, output_fmt)
+            (path_or_archive / first_img).rename(final_a)
+            (path_or_archive / second_img).rename(final_b)
+            splitted_spreads.append(split_spread_data)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures: List[Tuple[_SplitSpreads, Future]] = []
+            for split_spread_data in image_list:
+                extension = _select_split_ext(split_spread_data.img, image_fmt)
+                final_paths = _final_split_paths(split_spread_data, extension)
+                future = executor.submit(split_spread, split_spread_data.img.path, final_paths, quality, gutter_window)
+                futures.append((split_spread_data, future))
+            for idx, (split_spread_data, future) in enumerate(futures):
+                try:
+                    split_offsets[split_spread_data.img.path.name] = future.result()
+                    splitted_spreads.append(split_spread_data)
+                except Exception as exc:
+                    console.error(f"Failed to split {split_spread_data.img.path.name}: {exc}")
+                console.status(f"Splitting spreads: {idx + 1}/{len(image_list)}")
+    console.stop_status(f"Splitted {len(splitted_spreads)} spreads")
+
+    split_report = []
+    for split_spread_data in splitted_spreads:
+        image_name = split_spread_data.img.path.name
+        split_result = split_offsets.get(image_name)
+        if split_result is None:
+            continue
+        center_delta = split_result.center_delta
+        if center_delta != 0:
+            console.info(f"  {image_name}: split at {split_result.offset}px ({center_delta:+d}px from center)")
+        split_report.append(
+            {
+                "image": image_name,
+                "width": split_result.width,
+                "offset": split_result.offset,
+                "center_delta": center_delta,
+            }
+        )
+    if report_file is not None:
+        json.dump(split_report, report_file, indent=4, ensure_ascii=False)
+        report_file.write("\n")
+        report_file.flush()
+
+    BACKUP_DIR = path_or_archive / "backup"
+    BACKUP_DIR.mkdir(exist_ok=True)
+    for image in splitted_spreads:
+        try:
+            mv(image.img.path, BACKUP_DIR / path.basename(image.img.path.name))
+        except FileNotFoundError:
+            pass
+
+    if len(splitted_spreads) != len(image_list):
+        return 1
+
+
+@spreads.command(name="detect", help="Detect possible spreads from consecutive pages", cls=NNCommandHandler)
+@options.path_or_archive(disable_archive=True)
+@reverse_direction
+@click.option(
+    "-t",
+    "--threshold",
+    "threshold",
+    default=0.5,
+    show_default=True,
+    type=click.FloatRange(0.0, 1.0),
+    help="Minimum score for a pair of pages to be considered a spread",
+)
+@click.option(
+    "--apply",
+    "apply_spreads",
+    is_flag=True,
+    default=False,
+    help="Join the detected spreads right away",
+)
+@quality_option
+@format_output
+@backend_option
+@jobs_option
+@options.magick_path
+@options.rediscover_exec
+@click.pass_context
+@time_program
+def spreads_detect(
+    ctx: click.Context,
+    path_or_archive: Path,
+    reverse: bool,
+    threshold: float,
+    apply_spreads: bool,
+    quality: float,
+    image_fmt: str,
+    backend: SpreadsBackend,
+    jobs: Optional[int],
+    magick_path: str,
+):
+    """
+    Detect possible spreads from consecutive pages
+    """
+    if not path_or_archive.is_dir():
+        raise click.BadParameter(
+            f"{path_or_archive} is not a directory. Please provide a directory.",
+            param_hint="path_or_archive",
+        )
+
+    pages: Dict[int, Path] = {}
+    duplicate_pages: Set[int] = set()
+    console.info("Collecting images...")
+    with file_handler.MArchive(path_or_archive) as archive:
+        for image, _ in archive:
+            title_match = parse_page_filename(image.stem)
+            if title_match is None:
+                console.warning("Unmatching file name: {}".format(image.filename))
+                continue
+            if title_match.group("b"):
+                continue
+            page_number = int(title_match.group("a"))
+            if page_number in pages:
+                console.warning(f"Page {page_number} is used by more than one image ({image.filename}), skipping it")
+                duplicate_pages.add(page_number)
+                continue
+            pages[page_number] = image.access()
+    # Can't tell which image is the actual page, so they are never part of a spread
+    for page_number in duplicate_pages:
+        pages.pop(page_number)
+
+    console.status(f"Detecting spreads from {len(pages)} pages...")
+    candidates = detect_spreads(pages, reverse, threshold, jobs)
+    console.stop_status(f"Found {len(candidates)} possible spreads")
+    for candidate in candidates:
+        console.info(f"  -s {candidate.first}-{candidate.second}  (score: {candidate.score:.3f})")
+
+    if apply_spreads and candidates:
+        console.enter()
+        return ctx.invoke(
+            spreads_join,
+            path_or_archive=path_or_archive,
+            quality=quality,
+            spreads_data=[f"{x.first}-{x.second}" for x in candidates],
+            reverse=reverse,
+            image_fmt=image_fmt,
+            backend=backend,
+            jobs=jobs,
+            magick_path=magick_path,
+        )
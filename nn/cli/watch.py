@@ -0,0 +1,319 @@
+import shlex
+import shutil
+import signal
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import click
+from rich.markup import escape
+
+from .. import term
+from ..watcher import InboxWatcher
+from .base import NNCommandHandler
+
+console = term.get_console()
+WORK_DIR_NAME = ".nn-work"
+WATCH_LOG_NAME = "nn-watch.log"
+# Interactive or long-lived commands, they can't be a step of the pipeline
+_FORBIDDEN_STEPS = ("config", "serve", "watch")
+_PLACEHOLDERS = ("input", "name", "stem", "workdir")
+
+
+@dataclass
+class WatchJob:
+    name: str
+    workdir: Path
+    steps: List[List[str]]
+
+    @property
+    def input(self) -> Path:
+        return self.workdir / self.name
+
+
+@dataclass
+class WatchJobResult:
+    success: bool
+    message: str
+    elapsed: float
+
+
+def _entry_stem(name: str) -> str:
+    stem = Path(name).stem
+    return stem or name
+
+
+def _unique_path(target: Path) -> Path:
+    if not target.exists():
+        return target
+    counter = 1
+    while True:
+        candidate = target.with_name(f"{target.name} ({counter})")
+        if not candidate.exists():
+            return candidate
+        counter += 1
+
+
+def _parse_steps(ctx: click.Context, param: click.Parameter, steps: Tuple[str, ...]) -> List[List[str]]:
+    from ..cmd import LAZY_COMMANDS
+
+    parsed: List[List[str]] = []
+    dummy = {key: key for key in _PLACEHOLDERS}
+    for step in steps:
+        try:
+            argv = shlex.split(step)
+        except ValueError as exc:
+            raise click.BadParameter(f"{step!r}: {exc}", param_hint="--step")
+        if not argv:
+            raise click.BadParameter("Empty step", param_hint="--step")
+        if argv[0] not in LAZY_COMMANDS or argv[0] in _FORBIDDEN_STEPS:
+            raise click.BadParameter(f"{step!r}: {argv[0]} is not a command that can be used", param_hint="--step")
+        for arg in argv:
+            try:
+                arg.format(**dummy)
+            except (KeyError, IndexError, ValueError) as exc:
+                available = ", ".join("{" + key + "}" for key in _PLACEHOLDERS)
+                raise click.BadParameter(
+                    f"{step!r}: invalid placeholder {exc} (available: {available})", param_hint="--step"
+                )
+        parsed.append(argv)
+    return parsed
+
+
+def _ignore_interrupt():
+    # Ctrl+C and SIGTERM are handled by the main process, which let the running jobs finish.
+    # The workers would otherwise inherit the SIGTERM handler that raise KeyboardInterrupt.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+def _run_watch_job(job: WatchJob) -> WatchJobResult:
+    from ..cmd import main as nn_main
+
+    placeholders = {
+        "input": str(job.input),
+        "name": job.name,
+        "stem": _entry_stem(job.name),
+        "workdir": str(job.workdir),
+    }
+    start = time.time()
+    with (job.workdir / WATCH_LOG_NAME).open("a", encoding="utf-8") as log_fp:
+        previous_file = console.console.file
+        console.console.file = log_fp
+        try:
+            for index, step in enumerate(job.steps, 1):
+                argv = [arg.format(**placeholders) for arg in step]
+                command_line = " ".join(shlex.quote(arg) for arg in argv)
+                console.info(escape(f"Step {index}/{len(job.steps)}: nn {command_line}"))
+                try:
+                    result = nn_main.main(args=argv, prog_name="nn", standalone_mode=False)
+                except click.exceptions.Exit as exc:
+                    result = exc.exit_code
+                except click.ClickException as exc:
+                    console.error(escape(exc.format_message()))
+                    result = exc.exit_code
+                except Exception as exc:
+                    console.error(escape(f"Step {index} crashed: {exc}"))
+                    log_fp.write(traceback.format_exc())
+                    return WatchJobResult(False, f"step {index} ({step[0]}) crashed: {exc}", time.time() - start)
+                if isinstance(result, int) and result > 0:
+                    console.error(f"Step {index} failed with exit code {result}")
+                    return WatchJobResult(False, f"step {index} ({step[0]}) failed", time.time() - start)
+        finally:
+            log_fp.flush()
+            console.console.file = previous_file
+    return WatchJobResult(True, f"{len(job.steps)} steps done", time.time() - start)
+
+
+def _claim_entry(entry: Path, work_root: Path, steps: List[List[str]]) -> Optional[WatchJob]:
+    """Move the entry out of the inbox so it is not picked up again, the move is atomic on the same drive."""
+    workdir = _unique_path(work_root / _entry_stem(entry.name))
+    workdir.mkdir(parents=True)
+    try:
+        entry.rename(workdir / entry.name)
+    except OSError as exc:
+        # Still opened by another program (Windows), it will be picked up again once it settles
+        console.warning(escape(f"Could not take {entry.name}, retrying later: {exc}"))
+        workdir.rmdir()
+        return None
+    return WatchJob(entry.name, workdir, steps)
+
+
+def _move_job(job: WatchJob, target_root: Path, note: Optional[str] = None) -> Path:
+    if note is not None:
+        with (job.workdir / WATCH_LOG_NAME).open("a", encoding="utf-8") as log_fp:
+            log_fp.write(f"{note}\n")
+    target_root.mkdir(parents=True, exist_ok=True)
+    target = _unique_path(target_root / job.workdir.name)
+    shutil.move(str(job.workdir), str(target))
+    return target
+
+
+def _finish_job(job: WatchJob, future: Future, outbox: Path, quarantine: Path):
+    try:
+        result: WatchJobResult = future.result()
+    except BrokenProcessPool as exc:
+        result = WatchJobResult(False, f"the worker died: {exc}", 0.0)
+    except Exception as exc:
+        result = WatchJobResult(False, f"the worker failed: {exc}", 0.0)
+
+    if result.success:
+        target = _move_job(job, outbox)
+        console.info(escape(f"Processed {job.name} in {result.elapsed:.2f}s: {target}"))
+    else:
+        target = _move_job(job, quarantine, f"Failed: {result.message}")
+        console.error(escape(f"Failed to process {job.name}, {result.message}, moved to {target}"))
+
+
+def _recover_interrupted(work_root: Path, quarantine: Path):
+    if not work_root.is_dir():
+        return
+    for workdir in sorted(work_root.iterdir()):
+        if not workdir.is_dir():
+            continue
+        job = WatchJob(workdir.name, workdir, [])
+        target = _move_job(job, quarantine, "Failed: interrupted, nn watch was stopped while processing it")
+        console.warning(escape(f"Moved the interrupted job {workdir.name} to {target}"))
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _is_inside(inbox: Path, folder: Path) -> bool:
+    return folder == inbox or inbox in folder.parents
+
+
+@click.command(
+    name="watch",
+    help="Watch a folder and run a pipeline of nn commands on every release dropped in it",
+    cls=NNCommandHandler,
+)
+@click.argument(
+    "inbox",
+    metavar="INBOX_FOLDER",
+    type=click.Path(exists=True, file_okay=False, resolve_path=True, path_type=Path),
+)
+@click.option(
+    "-s",
+    "--step",
+    "steps",
+    multiple=True,
+    required=True,
+    callback=_parse_steps,
+    help="An nn command to run on each release, in order (e.g. -s 'autosplit {input} -t Title' -s 'pack {workdir}')."
+    " Placeholders: {input}, {name}, {stem} and {workdir}",
+)
+@click.option(
+    "-o",
+    "--outbox",
+    "outbox",
+    type=click.Path(file_okay=False, resolve_path=True, path_type=Path),
+    default=None,
+    help="Where the processed releases are moved, default to `outbox` next to the inbox",
+)
+@click.option(
+    "-q",
+    "--quarantine",
+    "quarantine",
+    type=click.Path(file_okay=False, resolve_path=True, path_type=Path),
+    default=None,
+    help="Where the failed releases are moved with their log, default to `quarantine` next to the inbox",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="How many releases are processed at the same time",
+)
+@click.option(
+    "--settle",
+    "settle_time",
+    type=click.FloatRange(min=0),
+    default=5.0,
+    show_default=True,
+    help="Seconds without any change before a release is considered complete",
+)
+@click.option(
+    "--poll-interval",
+    "poll_interval",
+    type=click.FloatRange(min=0.1),
+    default=1.0,
+    show_default=True,
+    help="Seconds between each check when polling or when waiting for a release to settle",
+)
+@click.option(
+    "--poll",
+    "force_poll",
+    is_flag=True,
+    default=False,
+    help="Poll the inbox instead of using inotify (e.g. for network shares)",
+)
+def watch(
+    inbox: Path,
+    steps: List[List[str]],
+    outbox: Optional[Path],
+    quarantine: Optional[Path],
+    jobs: int,
+    settle_time: float,
+    poll_interval: float,
+    force_poll: bool,
+):
+    outbox = outbox or inbox.parent / "outbox"
+    quarantine = quarantine or inbox.parent / "quarantine"
+    if _is_inside(inbox, outbox) or _is_inside(inbox, quarantine):
+        console.error("The outbox and the quarantine can't be inside the inbox!")
+        return 1
+    work_root = inbox / WORK_DIR_NAME
+
+    _recover_interrupted(work_root, quarantine)
+    try:
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+    except ValueError:
+        # Not in the main thread
+        pass
+
+    running: Dict[Future, WatchJob] = {}
+    executor = ProcessPoolExecutor(max_workers=jobs, initializer=_ignore_interrupt)
+    try:
+        with InboxWatcher(inbox, settle_time, poll_interval, force_poll) as watcher:
+            console.info(escape(f"Watching {inbox} ({watcher.mode}), {len(steps)} steps, {jobs} jobs"))
+            console.info(escape(f"Outbox: {outbox}"))
+            console.info(escape(f"Quarantine: {quarantine}"))
+            while True:
+                settled = watcher.poll(busy=bool(running))
+                pool_broken = False
+                for future in [future for future in running if future.done()]:
+                    _finish_job(running.pop(future), future, outbox, quarantine)
+                    pool_broken = pool_broken or isinstance(future.exception(), BrokenProcessPool)
+                if pool_broken:
+                    # A worker was killed (e.g. out of memory), the pool can't be used anymore
+                    executor.shutdown(wait=False)
+                    executor = ProcessPoolExecutor(max_workers=jobs, initializer=_ignore_interrupt)
+
+                for entry in settled:
+                    if len(running) >= jobs:
+                        break
+                    watcher.forget(entry.name)
+                    job = _claim_entry(entry, work_root, steps)
+                    if job is None:
+                        continue
+                    console.info(escape(f"Processing {job.name}"))
+                    running[executor.submit(_run_watch_job, job)] = job
+    except KeyboardInterrupt:
+        if running:
+            console.warning(f"Stopping, waiting for {len(running)} running job(s) to finish...")
+    except FileNotFoundError as exc:
+        console.error(f"Stopping, {exc}")
+    finally:
+        executor.shutdown(wait=True)
+        for future, job in running.items():
+            _finish_job(job, future, outbox, quarantine)
+    console.info("Stopped watching")
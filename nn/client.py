@@ -0,0 +1,87 @@
+"""
+Thin client of ``nn serve``, used by ``nn --client <command>``.
+
+This module is imported before anything else when `nn` starts, keep it to the standard library.
+Each connection runs one job, the messages are JSON, one per line:
+
+- client: ``{"version": 1, "argv": [...], "cwd": "...", "terminal": bool, "width": int}``
+- server: ``{"output": "..."}`` for everything the command prints, then ``{"exit": code}``
+"""
+
+from __future__ import annotations
+
+import getpass
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+__all__ = (
+    "PROTOCOL_VERSION",
+    "SOCKET_ENV",
+    "default_socket_path",
+    "encode_message",
+    "run_client",
+)
+
+PROTOCOL_VERSION = 1
+SOCKET_ENV = "NN_SOCKET"
+
+
+def default_socket_path() -> Path:
+    """``$NN_SOCKET``, or ``nn.sock`` in ``$XDG_RUNTIME_DIR``, or a per user socket in the temp folder."""
+    socket_env = os.environ.get(SOCKET_ENV)
+    if socket_env:
+        return Path(socket_env)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return Path(runtime_dir) / "nn.sock"
+    return Path(tempfile.gettempdir()) / f"nn-{getpass.getuser()}.sock"
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+def _connect(socket_path: Path) -> Optional[socket.socket]:
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path))
+    except OSError:
+        # Not running, or a stale socket file
+        client.close()
+        return None
+    return client
+
+
+def run_client(argv: List[str], socket_path: Optional[Path] = None) -> Optional[int]:
+    """Run the command in the server and print its output, return the exit code or None if there is no server."""
+    client = _connect(socket_path or default_socket_path())
+    if client is None:
+        return None
+
+    terminal = sys.stdout.isatty()
+    request = {
+        "version": PROTOCOL_VERSION,
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "terminal": terminal,
+        "width": shutil.get_terminal_size().columns if terminal else None,
+    }
+    with client, client.makefile("rb") as server_fp:
+        client.sendall(encode_message(request))
+        for line in server_fp:
+            message = json.loads(line)
+            if "output" in message:
+                sys.stdout.write(message["output"])
+                sys.stdout.flush()
+            elif "exit" in message:
+                return int(message["exit"])
+    sys.stderr.write("nn: the server closed the connection before the command finished\n")
+    return 1
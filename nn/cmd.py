@@ -1,69 +1,96 @@
-from __future__ import annotations
-
-from pathlib import Path
-
-import click
-
-from .cli.archive import pack_releases, pack_releases_comment_archive, pack_releases_epub_mode
-from .cli.auto_split import auto_split
-from .cli.config import cli_config
-from .cli.image_optimizer import image_optimizer
-from .cli.image_tagging import image_tagging
-from .cli.manual_split import manual_split
-from .cli.merge_chapters import merge_chapters
-from .cli.releases import prepare_releases, prepare_releases_chapter
-from .cli.spreads_manager import spreads
-from .constants import __author__, __name__, __version__
-from .term import get_console
-
-console = get_console()
-
-
-CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
-WORKING_DIR = Path.cwd().absolute()
-
-
-@click.group(context_settings=CONTEXT_SETTINGS)
-@click.version_option(
-    __version__,
-    "--version",
-    "-V",
-    prog_name=__name__,
-    message="%(prog)s v%(version)s - Created by {}".format(__author__),
-)
-@click.option(
-    "-v",
-    "--verbose",
-    "verbose",
-    is_flag=True,
-    required=False,
-    help="Enable debug/verbose mode",
-    default=False,
-)
-@click.pass_context
-def main(ctx: click.Context, verbose: bool):
-    
-    ctx.ensure_object(dict)
-    ctx.obj["VERBOSE_MODE"] = verbose
-    if verbose:
-        console.enable_debug()
-    else:
-        console.disable_debug()
-
-
-main.add_command(auto_split)
-main.add_command(cli_config)
-main.add_command(manual_split)
-main.add_command(merge_chapters)
-main.add_command(pack_releases)
-main.add_command(pack_releases_epub_mode)
-main.add_command(pack_releases_comment_archive)
-main.add_command(prepare_releases)
-main.add_command(prepare_releases_chapter)
-main.add_command(spreads)
-main.add_command(image_tagging)
-main.add_command(image_optimizer)
-
-
-if __name__ == "__main__":
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from .cli.base import LazyGroup
+from .constants import __author__, __name__, __version__
+from .term import get_console
+from .trace import enable_tracing, write_trace
+
+console = get_console()
+
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+WORKING_DIR = Path.cwd().absolute()
+# The command module is only imported when the command is used, this keep the startup fast.
+LAZY_COMMANDS = {
+    "autosplit": "nn.cli.auto_split:auto_split",
+    "config": "nn.cli.config:cli_config",
+    "manualsplit": "nn.cli.manual_split:manual_split",
+    "merge": "nn.cli.merge_chapters:merge_chapters",
+    "pack": "nn.cli.archive:pack_releases",
+    "packepub": "nn.cli.archive:pack_releases_epub_mode",
+    "packcomment": "nn.cli.archive:pack_releases_comment_archive",
+    "releases": "nn.cli.releases:prepare_releases",
+    "releasesch": "nn.cli.releases:prepare_releases_chapter",
+    "serve": "nn.cli.serve:serve",
+    "spreads": "nn.cli.spreads_manager:spreads",
+    "tag": "nn.cli.image_tagging:image_tagging",
+    "optimize": "nn.cli.image_optimizer:image_optimizer",
+    "watch": "nn.cli.watch:watch",
+}
+
+
+def _client_not_first(ctx: click.Context, param: click.Parameter, value: bool):
+    # `nn --client` is handled by the launcher, before the CLI is imported
+    if value:
+        raise click.UsageError("--client must be the first argument, e.g. `nn --client pack ...`")
+
+
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS, context_settings=CONTEXT_SETTINGS)
+@click.version_option(
+    __version__,
+    "--version",
+    "-V",
+    prog_name=__name__,
+    message="%(prog)s v%(version)s - Created by {}".format(__author__),
+)
+@click.option(
+    "-v",
+    "--verbose",
+    "verbose",
+    is_flag=True,
+    required=False,
+    help="Enable debug/verbose mode",
+    default=False,
+)
+@click.option(
+    "--trace",
+    "trace_file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    default=None,
+    help="Write the timing of each phase to this file (Chrome/Perfetto trace format)",
+)
+@click.option(
+    "--client",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=_client_not_first,
+    help="Run the command in `nn serve` (must be the first argument, e.g. `nn --client pack ...`)",
+)
+@click.pass_context
+def main(ctx: click.Context, verbose: bool, trace_file: Optional[Path]):
+    
+    ctx.ensure_object(dict)
+    ctx.obj["VERBOSE_MODE"] = verbose
+    if verbose:
+        console.enable_debug()
+    else:
+        console.disable_debug()
+
+    if trace_file is not None:
+        enable_tracing()
+
+        def _write_trace():
+            span_count = write_trace(trace_file)
+            console.info(f"Wrote {span_count} spans to {trace_file}")
+
+        ctx.call_on_close(_write_trace)
+
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,15 +1,19 @@
 import re
 import subprocess as sp
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, List, Match, Optional, Pattern, Tuple, Union, overload
+from typing import Dict, Iterator, List, Match, Optional, Pattern, Sequence, Tuple, Union, overload
 
-from . import config, term, utils
-from .constants import TARGET_FORMAT, TARGET_FORMAT_ALT, TARGET_TITLE, MPublication
+from . import config, exiftool, term, utils
+from .cli.constants import TARGET_FORMAT, TARGET_FORMAT_ALT, TARGET_TITLE, MPublication
+from .trace import span
 
 __all__ = (
     "BRACKET_MAPPINGS",
     "PseudoChapterMatch",
     "ChapterRange",
+    "ChapterRangeIndex",
+    "ChapterRangeOverlapError",
     "RegexCollection",
     "check_cbz_exist",
     "actual_or_fallback",
@@ -21,6 +25,7 @@ __all__ = (
     "format_archive_filename",
     "format_volume_text",
     "format_daiz_like_filename",
+    "ReleaseNamingPlan",
 )
 
 
@@ -55,8 +60,10 @@ class PseudoChapterMatch:
         return self.get(key)
 
 def format_daiz_like_numbering(
-    number: Union[int, float], digit: int = 3, use_minus: bool = True, separator: str = conf.defaults.ch_special_tag
+    number: Union[int, float], digit: int = 3, use_minus: bool = True, separator: Optional[str] = None
 ):
+    if separator is None:
+        separator = conf.defaults.ch_special_tag
     if isinstance(number, int):
         return f"{int(number):0{digit}d}"
     base, floating = str(number).split(".")
@@ -67,7 +74,13 @@ def format_daiz_like_numbering(
     return f"{int(base):0{digit}d}{separator}{floating}"
 
 class ChapterRange:
-    def __init__(self, number: Union[int, float], name: Optional[str] = None, range: List[int] = list(), is_single: bool = False):
+    def __init__(
+        self,
+        number: Union[int, float],
+        name: Optional[str] = None,
+        range: Sequence[int] = range(0),
+        is_single: bool = False,
+    ):
         self.number = number
         self.name = name
         self.range = range
@@ -101,6 +114,78 @@ class ChapterRange:
         _, f = str(self.number).split(".")
         return int(f)
 
+    @property
+    def start(self) -> Optional[int]:
+        if len(self.range) < 1:
+            return None
+        return self.range[0]
+
+    @property
+    def end(self) -> Optional[int]:
+        """The last page of this chapter, ``None`` if the chapter is open-ended."""
+        if self.is_single or len(self.range) < 1:
+            return None
+        return self.range[-1]
+
+
+class ChapterRangeOverlapError(ValueError):
+    def __init__(self, first: ChapterRange, second: ChapterRange) -> None:
+        self.first = first
+        self.second = second
+        super().__init__(f"Page range of {first!r} overlaps with {second!r}")
+
+
+class ChapterRangeIndex:
+    """
+    Sorted interval index of chapter ranges, used to map a page number to a chapter.
+
+    A single (open-ended) chapter range covers every page until the next chapter starts.
+    Overlapping ranges are rejected when the index is built.
+    """
+
+    def __init__(self, chapters: Optional[List[ChapterRange]] = None):
+        self._chapters: List[ChapterRange] = []
+        self._starts: List[int] = []
+        self._ends: List[Optional[int]] = []
+        for chapter in chapters or []:
+            self.add(chapter)
+
+    def __iter__(self) -> Iterator[ChapterRange]:
+        return iter(self._chapters)
+
+    def __len__(self):
+        return len(self._chapters)
+
+    def __repr__(self):
+        return f"<ChapterRangeIndex {self._chapters!r}>"
+
+    def add(self, chapter: ChapterRange):
+        start = chapter.start
+        if start is None:
+            raise ValueError(f"{chapter!r} does not have any page range")
+        end = chapter.end
+
+        idx = bisect_right(self._starts, start)
+        if idx > 0:
+            prev_start, prev_end = self._starts[idx - 1], self._ends[idx - 1]
+            if prev_start == start or (prev_end is not None and prev_end >= start):
+                raise ChapterRangeOverlapError(self._chapters[idx - 1], chapter)
+        if idx < len(self._starts) and end is not None and end >= self._starts[idx]:
+            raise ChapterRangeOverlapError(chapter, self._chapters[idx])
+
+        self._starts.insert(idx, start)
+        self._ends.insert(idx, end)
+        self._chapters.insert(idx, chapter)
+
+    def find(self, page: int) -> Optional[ChapterRange]:
+        idx = bisect_right(self._starts, page) - 1
+        if idx < 0:
+            return None
+        end = self._ends[idx]
+        if end is not None and page > end:
+            return None
+        return self._chapters[idx]
+
 
 def check_cbz_exist(base_path: Path, filename: str):
     full_path = base_path / f"{filename}.cbz"
@@ -187,33 +272,33 @@ def int_or_float(value: str) -> Optional[Union[int, float]]:
     return safe_int(value)
 
 
-def parse_ch_ranges(data: str) -> Tuple[List[int], bool]:
+def parse_ch_ranges(data: str) -> Tuple[range, bool]:
     split_range = data.split("-")
     if len(split_range) < 2:
-        return [int(data)], True
+        return range(int(data), int(data) + 1), True
 
     first, second = split_range
-    return list(range(int(first), int(second) + 1)), False
+    return range(int(first), int(second) + 1), False
 
 
 def validate_ch_ranges(current: str):
     split_range = current.strip().split("-")
     if len(split_range) < 2:
         return safe_int(current) is not None
-
-    first, second = split_range
-    if not isinstance(second, str):
+    if len(split_range) != 2:
         return False
 
+    first, second = split_range
     first = safe_int(first)
     second = safe_int(second)
     if first is None or second is None:
         return False
-    return True
+    # A reversed range would be empty
+    return first <= second
 
 
-def inquire_chapter_ranges(initial_prompt: str, continue_prompt: str, ask_title: bool = False) -> List[ChapterRange]:
-    chapter_ranges: List[ChapterRange] = []
+def inquire_chapter_ranges(initial_prompt: str, continue_prompt: str, ask_title: bool = False) -> ChapterRangeIndex:
+    chapter_ranges = ChapterRangeIndex()
     while True:
         console.info(initial_prompt)
 
@@ -227,7 +312,12 @@ def inquire_chapter_ranges(initial_prompt: str, continue_prompt: str, ask_title:
         if ask_title:
             ch_title = console.inquire("Chapter title", lambda y: len(y.strip()) > 0)
         simple_range = ChapterRange(ch_number, ch_title, actual_ranges, is_single)
-        chapter_ranges.append(simple_range)
+        try:
+            chapter_ranges.add(simple_range)
+        except ValueError as exc:
+            # Overlapping or empty page range
+            console.error(f"{exc}, please input the chapter again!")
+            continue
 
         do_more = console.confirm(continue_prompt)
         if not do_more:
@@ -236,6 +326,19 @@ def inquire_chapter_ranges(initial_prompt: str, continue_prompt: str, ask_title:
     return chapter_ranges
 
 
+def _run_exiftool(command: List[str]):
+    # Reuse the running exiftool of `nn serve` when there is one
+    session = exiftool.get_session(command[0])
+    if session is not None:
+        try:
+            session.execute(command[1:])
+            return
+        except exiftool.ExifToolError as exc:
+            console.warning(f"exiftool session failed, running it directly: {exc}")
+    proc = sp.Popen(command, stdout=sp.PIPE, stderr=sp.PIPE)
+    proc.wait()
+
+
 def inject_metadata(exiftool_dir: str, current_directory: Path, image_title: str, image_email: str):
     resolve_dir = current_directory.resolve()
     any_jpg = len(list(resolve_dir.glob("*.jpg"))) > 0
@@ -262,32 +365,33 @@ def inject_metadata(exiftool_dir: str, current_directory: Path, image_title: str
         full_dir = current_directory.resolve() / "*.jpg"
         base_cmd.append(str(full_dir))
         console.info("Injecting metadata into JP(e)G files...")
-        proc = sp.Popen(base_cmd, stdout=sp.PIPE, stderr=sp.PIPE)
-        proc.wait()
+        with span("exiftool", files="jpg"):
+            _run_exiftool(base_cmd)
         base_cmd.pop()
     if any_tiff:
         full_dir = current_directory.resolve() / "*.tiff"
         base_cmd.append(str(full_dir))
         console.info("Injecting metadata into TIFF files...")
-        proc = sp.Popen(base_cmd, stdout=sp.PIPE, stderr=sp.PIPE)
-        proc.wait()
+        with span("exiftool", files="tiff"):
+            _run_exiftool(base_cmd)
 
     encoded_data = f"{image_title} ({image_email})".encode("ascii")
     if any_png and conf.experimentals.png_tag:
         console.warning("PNG files will use experimental metadata injection, please report any issues")
-        console.status("Injecting metadata into PNG files...")
-        for idx, png_img in enumerate(png_files, 1):
-            console.status(f"Injecting metadata into ({idx}/{len(png_files)})...")
-            with png_img.open("ab") as af:
-                # Write pad data
-                af.write(b"\x00" * 4)
-                af.write(encoded_data)
-                af.write(b"\x00" * 4)
-        console.stop_status("Injected metadata into PNG files")
+        with console.progress("Injecting metadata into PNG files", total=len(png_files), unit="images") as progress:
+            for png_img in png_files:
+                with png_img.open("ab") as af:
+                    # Write pad data
+                    af.write(b"\x00" * 4)
+                    af.write(encoded_data)
+                    af.write(b"\x00" * 4)
+                progress.advance()
+            progress.stop("Injected metadata into PNG files")
 
 def _run_pingo_and_verify(pingo_cmd: List[str]):
-    proc = sp.Popen(pingo_cmd, stdout=sp.PIPE, stderr=sp.PIPE)
-    proc.wait()
+    with span("pingo", target=pingo_cmd[-1]):
+        proc = sp.Popen(pingo_cmd, stdout=sp.PIPE, stderr=sp.PIPE)
+        proc.wait()
 
     stdout = proc.stdout.read().decode("utf-8")
     stderr = proc.stderr.read().decode("utf-8")
@@ -379,7 +483,8 @@ def format_volume_text(
     m_volume: Optional[Union[int, float]] = None,
     m_chapter: Optional[Union[int, float]] = None,
 ) -> Optional[str]:
-    tag_sep = conf.defaults.ch_special_tag
+    defaults = conf.defaults
+    tag_sep = defaults.ch_special_tag
     volume_text: Optional[str] = None
     if m_chapter is not None:
         if isinstance(m_chapter, float):
@@ -391,32 +496,16 @@ def format_volume_text(
             volume_text = f"{int(base_float):03d}{tag_sep}{dec_float}"
         else:
             volume_text = f"{m_chapter:03d}"
-        if conf.defaults.ch_add_c_prefix:  # pragma: no cover
+        if defaults.ch_add_c_prefix:  # pragma: no cover
             volume_text = f"c{volume_text}"  # pragma: no cover
     if m_volume is not None:
         volume_text = f"v{format_daiz_like_numbering(m_volume, 2, False, '.')}"
     return volume_text
 
-def format_daiz_like_filename(
-    m_title: str,
-    m_publisher: str,
-    m_year: int,
-    chapter_info: ChapterRange,
-    page_number: str,
-    publication_type: MPublication,
-    rip_credit: str,
-    bracket_type: str,
-    m_volume: Optional[Union[int, float]] = None,
-    extra_metadata: Optional[str] = None,
-    image_quality: Optional[str] = None,  # {HQ}/{LQ} thing
-    rls_revision: Optional[int] = None,
-    chapter_extra_maps: Dict[int, List[ChapterRange]] = dict(),
-    fallback_volume_name: str = "OShot",
-):
-    pub_type = ""
-    if publication_type.image:
-        pub_type = f"[{publication_type.image}]"
 
+def _format_chapter_numbering(
+    chapter_info: ChapterRange, chapter_extra_maps: Dict[int, List[ChapterRange]]
+) -> Tuple[str, str]:
     chapter_num = f"{chapter_info.base:03d}"
 
     chapter_ex_data = ""
@@ -451,10 +540,13 @@ def format_daiz_like_filename(
             else:
                 chapter_ex_data = f" (c{chapter_num}.{chapter_info.floating})"
                 chapter_num += "x1"
+    return chapter_num, chapter_ex_data
 
-    act_vol = fallback_volume_name
-    if m_volume is not None:
-        act_vol = f"v{format_daiz_like_numbering(m_volume, 2, separator='x')}"
+
+def _format_extra_and_publication(publication_type: MPublication, extra_metadata: Optional[str]) -> Tuple[str, str]:
+    pub_type = ""
+    if publication_type.image:
+        pub_type = f"[{publication_type.image}]"
 
     extra_name = " "
     if extra_metadata is not None:
@@ -464,6 +556,41 @@ def format_daiz_like_filename(
         extra_name = ""
     elif pub_type and extra_name.strip():
         pub_type = f" {pub_type}"
+    return extra_name, pub_type
+
+
+def _format_image_postfix(image_quality: Optional[str], rls_revision: Optional[int]) -> str:
+    postfix = ""
+    if image_quality is not None:
+        postfix += " {" + image_quality + "}"
+    if rls_revision is not None and rls_revision > 1:
+        postfix += " {r%d}" % rls_revision
+    return postfix
+
+
+def format_daiz_like_filename(
+    m_title: str,
+    m_publisher: str,
+    m_year: int,
+    chapter_info: ChapterRange,
+    page_number: str,
+    publication_type: MPublication,
+    rip_credit: str,
+    bracket_type: str,
+    m_volume: Optional[Union[int, float]] = None,
+    extra_metadata: Optional[str] = None,
+    image_quality: Optional[str] = None,  # {HQ}/{LQ} thing
+    rls_revision: Optional[int] = None,
+    chapter_extra_maps: Dict[int, List[ChapterRange]] = dict(),
+    fallback_volume_name: str = "OShot",
+):
+    chapter_num, chapter_ex_data = _format_chapter_numbering(chapter_info, chapter_extra_maps)
+
+    act_vol = fallback_volume_name
+    if m_volume is not None:
+        act_vol = f"v{format_daiz_like_numbering(m_volume, 2, separator='x')}"
+
+    extra_name, pub_type = _format_extra_and_publication(publication_type, extra_metadata)
 
     image_filename = TARGET_FORMAT_ALT.format(
         mt=m_title,
@@ -490,11 +617,7 @@ def format_daiz_like_filename(
             c=rip_credit,
         )
 
-    if image_quality is not None:
-        image_filename += " {" + image_quality + "}"
-
-    if rls_revision is not None and rls_revision > 1:
-        image_filename += " {r%d}" % rls_revision
+    image_filename += _format_image_postfix(image_quality, rls_revision)
 
     return image_filename, format_archive_filename(
         m_title=m_title,
@@ -506,6 +629,127 @@ def format_daiz_like_filename(
         rls_revision=rls_revision,
     )
 
+
+# (chapter number, volume, extra metadata)
+_PageTemplateKey = Tuple[Union[int, float], Optional[Union[int, float]], Optional[str]]
+
+
+class ReleaseNamingPlan:
+    """
+    Precomputed naming for a whole release.
+
+    Produce the same result as :func:`format_daiz_like_filename`, but the chapter numbering,
+    publication type and archive name are only computed once per chapter/volume instead of
+    for every page.
+    """
+
+    def __init__(
+        self,
+        m_title: str,
+        m_publisher: str,
+        m_year: int,
+        chapters: List[ChapterRange],
+        publication_type: MPublication,
+        rip_credit: str,
+        bracket_type: str,
+        image_quality: Optional[str] = None,
+        rls_revision: Optional[int] = None,
+        fallback_volume_name: str = "OShot",
+    ):
+        self.m_title = m_title
+        self.m_publisher = m_publisher or "Unknown Publisher"
+        self.m_year = m_year
+        self.publication_type = publication_type
+        self.rip_credit = rip_credit
+        self.bracket_type = bracket_type
+        self.rls_revision = rls_revision
+        self.fallback_volume_name = fallback_volume_name
+
+        chapter_extra_maps: Dict[int, List[ChapterRange]] = {}
+        for chapter in sorted(chapters, key=lambda x: x.number):
+            chapter_extra_maps.setdefault(chapter.base, []).append(chapter)
+
+        self._image_postfix = _format_image_postfix(image_quality, rls_revision)
+        self._numbering: Dict[Union[int, float], Tuple[str, str]] = {}
+        for chapter in chapters:
+            self._numbering[chapter.number] = _format_chapter_numbering(chapter, chapter_extra_maps)
+
+        # Image filename before and after the page number
+        self._page_templates: Dict[_PageTemplateKey, Tuple[str, str]] = {}
+        self._archives: Dict[Tuple[Union[int, float], Optional[Union[int, float]]], str] = {}
+
+    def _page_template(
+        self, chapter_info: ChapterRange, m_volume: Optional[Union[int, float]], extra_metadata: Optional[str]
+    ) -> Tuple[str, str]:
+        """The image filename before and after the page number, rendered from the same format as the old path."""
+        key = (chapter_info.number, m_volume, extra_metadata)
+        template = self._page_templates.get(key)
+        if template is None:
+            chapter_num, chapter_ex_data = self._numbering[chapter_info.number]
+            act_vol = self.fallback_volume_name
+            if m_volume is not None:
+                act_vol = f"v{format_daiz_like_numbering(m_volume, 2, separator='x')}"
+            extra_name, pub_type = _format_extra_and_publication(self.publication_type, extra_metadata)
+            fields = dict(
+                mt=self.m_title,
+                ch=chapter_num,
+                chex=chapter_ex_data,
+                vol=act_vol,
+                ex=extra_name,
+                pt=pub_type,
+                pb=self.m_publisher,
+                c=self.rip_credit,
+                t=chapter_info.name,
+            )
+            image_format = TARGET_FORMAT if chapter_info.name is not None else TARGET_FORMAT_ALT
+            prefix_format, suffix_format = image_format.split("{pg}", 1)
+            template = (
+                prefix_format.format(**fields),
+                suffix_format.format(**fields) + self._image_postfix,
+            )
+            self._page_templates[key] = template
+        return template
+
+    def archive_name(self, chapter_info: ChapterRange, m_volume: Optional[Union[int, float]] = None) -> str:
+        key = (chapter_info.number, m_volume)
+        archive_filename = self._archives.get(key)
+        if archive_filename is None:
+            archive_filename = format_archive_filename(
+                m_title=self.m_title,
+                m_year=self.m_year,
+                publication_type=self.publication_type,
+                rip_credit=self.rip_credit,
+                bracket_type=self.bracket_type,
+                m_volume_text=format_volume_text(m_volume, chapter_info.number),
+                rls_revision=self.rls_revision,
+            )
+            self._archives[key] = archive_filename
+        return archive_filename
+
+    def image_name(
+        self,
+        chapter_info: ChapterRange,
+        page_number: str,
+        m_volume: Optional[Union[int, float]] = None,
+        extra_metadata: Optional[str] = None,
+    ) -> str:
+        prefix, suffix = self._page_template(chapter_info, m_volume, extra_metadata)
+        return prefix + page_number + suffix
+
+    def render(
+        self,
+        chapter_info: ChapterRange,
+        page_number: str,
+        m_volume: Optional[Union[int, float]] = None,
+        extra_metadata: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """Return the image filename and archive filename, same as :func:`format_daiz_like_filename`."""
+        return (
+            self.image_name(chapter_info, page_number, m_volume, extra_metadata),
+            self.archive_name(chapter_info, m_volume),
+        )
+
+
 _PublicationRegexMatch = [
     "dig",
     "web",
@@ -1,8 +1,8 @@
-__name__ = "nn"
-__author__ = "bob"
-__author_email__ = "lol@bob.com"
-__version__ = "1.0.0"
-__license__ = "MIT"
-__copyright__ = "Copyright (c) 2023 bob"
-
+__name__ = "nn"
+__author__ = "bob"
+__author_email__ = "lol@bob.com"
+__version__ = "1.0.0"
+__license__ = "MIT"
+__copyright__ = "Copyright (c) 2023 bob"
+
 __all__ = ("__name__", "__author__", "__version__", "__license__", "__copyright__")
\ No newline at end of file
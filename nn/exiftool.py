@@ -0,0 +1,116 @@
+"""
+Long-running exiftool process (``-stay_open``), so each call does not pay for the Perl startup.
+
+Only enabled by ``nn serve``, where the same process tags release after release.
+"""
+
+from __future__ import annotations
+
+import subprocess as sp
+import threading
+from typing import Dict, List, Optional
+
+__all__ = (
+    "ExifToolError",
+    "ExifToolSession",
+    "enable_sessions",
+    "get_session",
+    "close_sessions",
+)
+
+_sessions: Dict[str, "ExifToolSession"] = {}
+_sessions_enabled = False
+
+
+class ExifToolError(RuntimeError):
+    pass
+
+
+class ExifToolSession:
+    """
+    Send the arguments to ``exiftool -stay_open True -@ -`` and wait for its ``{readyN}`` marker.
+
+    The error output is merged into the standard output, and returned with it.
+    """
+
+    def __init__(self, exiftool_exe: str):
+        self.exiftool_exe = exiftool_exe
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._proc = sp.Popen(
+            [exiftool_exe, "-stay_open", "True", "-@", "-"],
+            stdin=sp.PIPE,
+            stdout=sp.PIPE,
+            stderr=sp.STDOUT,
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def execute(self, arguments: List[str]) -> str:
+        for argument in arguments:
+            if "\n" in argument or "\r" in argument:
+                # One argument per line in the argument file
+                raise ValueError(f"exiftool argument can't contain a new line: {argument!r}")
+
+        with self._lock:
+            self._counter += 1
+            marker = f"{{ready{self._counter}}}"
+            payload = "\n".join([*arguments, f"-execute{self._counter}"]) + "\n"
+            try:
+                self._proc.stdin.write(payload.encode("utf-8"))
+                self._proc.stdin.flush()
+            except OSError as exc:
+                raise ExifToolError(f"exiftool is not running anymore: {exc}")
+
+            output: List[str] = []
+            while True:
+                line = self._proc.stdout.readline()
+                if not line:
+                    raise ExifToolError("exiftool exited before finishing the command")
+                text = line.decode("utf-8", "replace").rstrip("\r\n")
+                if text == marker:
+                    break
+                output.append(text)
+        return "\n".join(output)
+
+    def close(self):
+        if self.alive:
+            try:
+                self._proc.stdin.write(b"-stay_open\nFalse\n")
+                self._proc.stdin.flush()
+                self._proc.wait(timeout=5)
+            except (OSError, sp.TimeoutExpired):
+                self._proc.kill()
+                self._proc.wait()
+
+
+def enable_sessions():
+    """Keep one exiftool process per executable alive, until :func:`close_sessions`"""
+    global _sessions_enabled
+
+    _sessions_enabled = True
+
+
+def get_session(exiftool_exe: str) -> Optional[ExifToolSession]:
+    """Return the running session of the executable, None when sessions are disabled or it can't be started."""
+    if not _sessions_enabled:
+        return None
+    session = _sessions.get(exiftool_exe)
+    if session is None or not session.alive:
+        try:
+            session = ExifToolSession(exiftool_exe)
+        except OSError:
+            return None
+        _sessions[exiftool_exe] = session
+    return session
+
+
+def close_sessions():
+    global _sessions_enabled
+
+    _sessions_enabled = False
+    for session in _sessions.values():
+        session.close()
+    _sessions.clear()
@@ -1,388 +1,480 @@
-import random
-import tarfile
-import tempfile
-import zipfile
-from copy import deepcopy
-from enum import Enum
-from mimetypes import types_map
-from os import path
-from pathlib import Path
-from string import ascii_letters, digits
-from typing import Generator, List, Optional, Tuple, Union
-
-import ftfy
-import py7zr
-from unrar.cffi import rarfile
-
-from .utils import decode_or, encode_or
-
-__all__ = (
-    "YieldType",
-    "MArchive",
-    "collect_image_from_cbz",
-    "collect_image_from_rar",
-    "collect_image_from_7z",
-    "collect_image_from_tar",
-    "collect_image_from_folder",
-    "is_cbz",
-    "is_rar",
-    "is_7zarchive",
-    "is_tararchive",
-    "is_archive",
-    "collect_image",
-    "collect_image_archive",
-    "collect_all_comics",
-    "create_temp_dir",
-    "remove_folder_and_contents",
-    "random_name",
-)
-extended_types_map = deepcopy(types_map)
-extended_types_map[".avif"] = "image/avif"
-extended_types_map[".webp"] = "image/webp"
-extended_types_map[".heic"] = "image/heic"
-extended_types_map[".heif"] = "image/heif"
-extended_types_map[".jxl"] = "image/jxl"
-extended_types_map[".jp2"] = "image/jp2"
-
-
-class YieldType(Enum):
-    CBZ = 1
-    FOLDER = 2
-    RAR = 3
-    SEVENZIP = 4
-    TAR = 5  # Gzip, LZMA, XZ, BZ2
-
-
-class UnknownArchiveType(Exception):
-    def __init__(self, file: Path) -> None:
-        self.file = file
-        super().__init__(f"An unknown archive format found: {file}")
-
-
-class WrappedRarFile(rarfile.RarFile):
-    def __init__(self, filename):
-        super().__init__(filename)
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        pass
-
-
-def is_image(file_name: str) -> bool:
-    return extended_types_map.get(path.splitext(file_name)[-1], "").startswith("image/")
-
-
-def collect_image_from_cbz(cbz_file: zipfile.ZipFile):
-    all_contents = cbz_file.filelist.copy()
-    valid_images = [x for x in all_contents if not x.is_dir() and is_image(x.filename)]
-    valid_images.sort(key=lambda x: path.basename(x.filename))
-    total_count = len(valid_images)
-    for content in valid_images:
-        yield content, cbz_file, total_count, YieldType.CBZ
-
-
-def collect_image_from_rar(rar_file: rarfile.RarFile):
-    all_contents: List[rarfile.RarInfo] = rar_file.infolist()
-    valid_images = [x for x in all_contents if not x.is_dir() and is_image(x.filename)]
-    valid_images.sort(key=lambda x: path.basename(x.filename))
-    total_count = len(valid_images)
-    for content in valid_images:
-        yield content, rar_file, total_count, YieldType.RAR
-
-
-def collect_image_from_7z(sevenzip_file: py7zr.SevenZipFile):
-    all_contents = sevenzip_file.list()
-    valid_images = [x for x in all_contents if not x.is_directory and is_image(x.filename)]
-    valid_images.sort(key=lambda x: path.basename(x.filename))
-    total_count = len(valid_images)
-    for content in valid_images:
-        yield content, sevenzip_file, total_count, YieldType.SEVENZIP
-
-
-def collect_image_from_tar(tararchive_file: tarfile.TarFile):
-    all_contents = tararchive_file.getmembers()
-    valid_images = [x for x in all_contents if not x.isdir() and is_image(x.name)]
-    valid_images.sort(key=lambda x: path.basename(x.name))
-    total_count = len(valid_images)
-    for content in valid_images:
-        yield content, tararchive_file, total_count, YieldType.CBZ
-
-
-def collect_image_from_folder(folder_path: Path):
-    all_contents = list(folder_path.glob("*"))
-    valid_images = [x for x in all_contents if is_image(x.name)]
-    valid_images.sort(key=lambda x: path.basename(x.name))
-    total_count = len(valid_images)
-    for file in valid_images:
-        yield file, folder_path, total_count, YieldType.FOLDER
-
-
-def is_cbz(file: Path):
-    if not file.is_file():
-        return False
-    return zipfile.is_zipfile(file)
-
-
-def is_rar(file: Path):
-    if not file.is_file():
-        return False
-    return rarfile.is_rarfile(str(file))
-
-
-def is_7zarchive(file: Path):
-    if not file.is_file():
-        return False
-    return py7zr.is_7zfile(file)
-
-
-def is_tararchive(file: Path):
-    if not file.is_file():
-        return False
-    return tarfile.is_tarfile(str(file))
-
-
-def is_archive(file: Path):
-    return is_cbz(file) or is_rar(file) or is_7zarchive(file) or is_tararchive(file)
-
-
-def collect_image_archive(file: Path):
-    if not file.is_file():
-        return
-
-    if is_cbz(file):
-        with zipfile.ZipFile(str(file)) as cbz_file:
-            yield from collect_image_from_cbz(cbz_file)
-    elif is_rar(file):
-        with WrappedRarFile(str(file)) as rar_file:
-            yield from collect_image_from_rar(rar_file)
-    elif is_7zarchive(file):
-        with py7zr.SevenZipFile(str(file)) as archive:
-            yield from collect_image_from_7z(archive)
-    elif is_tararchive(file):
-        with tarfile.open(str(file)) as tararchive_file:
-            yield from collect_image_from_tar(tararchive_file)
-    else:
-        raise UnknownArchiveType(file)
-
-
-def collect_image(path_or_archive: Path):
-    if path_or_archive.is_file():
-        yield from collect_image_archive(path_or_archive)
-    else:
-        yield from collect_image_from_folder(path_or_archive)
-
-
-def collect_all_comics(folder: Path):
-    for file in folder.glob("*.cb[z|r|7]"):
-        if is_archive(file):
-            yield file
-
-
-AccessorType = Union[zipfile.ZipFile, rarfile.RarFile, py7zr.SevenZipFile, tarfile.TarFile, Path]
-AccessorFile = Union[zipfile.ZipInfo, py7zr.FileInfo, rarfile.RarInfo, tarfile.TarInfo, str, bytes]
-AccessorImage = Union[zipfile.ZipInfo, py7zr.FileInfo, rarfile.RarInfo, tarfile.TarInfo, Path]
-
-
-class MImage:
-    """
-    Wrapper for image path, archive, or something like that.
-    """
-
-    def __init__(self, file: AccessorImage):
-        self.__accessor = file
-
-    @property
-    def name(self) -> str:
-        if isinstance(self.__accessor, zipfile.ZipInfo):
-            return path.basename(self.__accessor.filename)
-        elif isinstance(self.__accessor, py7zr.FileInfo):
-            return path.basename(self.__accessor.filename)
-        elif isinstance(self.__accessor, rarfile.RarInfo):
-            return path.basename(self.__accessor.filename)
-        elif isinstance(self.__accessor, tarfile.TarInfo):
-            return path.basename(self.__accessor.name)
-        elif isinstance(self.__accessor, Path):
-            return self.__accessor.name
-        else:
-            raise TypeError(f"Unknown type: {type(self.__accessor)}")
-
-    def __str__(self):
-        return self.filename
-
-    @property
-    def filename(self):
-        """Shortcut for the image filename."""
-        try:
-            return ftfy.fix_encoding(self.name)
-        except Exception:
-            # In a absurd case that it fails miserably, just return the original name.
-            return self.name
-
-    @property
-    def stem(self):
-        """Return the final component of the image filename without the extension."""
-        if isinstance(self.__accessor, Path):
-            return self.__accessor.stem
-        return path.splitext(self.filename)[0]
-
-    @property
-    def suffix(self):
-        """Return the extension of the image filename.
-        Include the leading dot.
-        """
-        if isinstance(self.__accessor, Path):
-            return self.__accessor.suffix
-        extension = path.splitext(self.filename)[-1]
-        return extension if extension.startswith(".") else f".{extension}"
-
-    def access(self):
-        """Return the accessor or internal file object."""
-        return self.__accessor
-
-    def is_archive(self):
-        """Return True if the image is an archive."""
-        return not isinstance(self.__accessor, Path)
-
-
-class MArchive:
-    """
-    Wrapper for multiple archive format and folder.
-    Allow simple access to some property, and access to read
-    one of the file in the archive or folder.
-    """
-
-    def __init__(self, file_or_folder: Path):
-        self.__accessor: AccessorType = None
-        self.__path = file_or_folder
-
-    def __check_open(self):
-        if self.__accessor is None:
-            self.open()
-
-    def open(self):
-        if self.__accessor is not None:
-            return self.__accessor
-        if self.__path.is_file():
-            if is_cbz(self.__path):
-                self.__accessor = zipfile.ZipFile(str(self.__path))
-            elif is_rar(self.__path):
-                self.__accessor = rarfile.RarFile(str(self.__path))
-            elif is_7zarchive(self.__path):
-                self.__accessor = py7zr.SevenZipFile(str(self.__path))
-            elif is_tararchive(self.__path):
-                self.__accessor = tarfile.open(str(self.__path))
-            else:
-                raise UnknownArchiveType(self.__path)
-        else:
-            self.__accessor = self.__path
-        return self.__accessor
-
-    def close(self):
-        if self.__accessor is not None:
-            if isinstance(self.__accessor, (zipfile.ZipFile, py7zr.SevenZipFile, tarfile.TarFile)):
-                self.__accessor.close()
-            self.__accessor = None
-
-    def __enter__(self):
-        self.open()
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
-
-    def read(self, file: Union[AccessorFile, MImage]) -> bytes:
-        """Read a specific file from the archive or folder.
-        Return the bytes data.
-        """
-        if isinstance(file, MImage):
-            return self.__actual_read(file.access())
-        return self.__actual_read(file)
-
-    def __actual_read(self, file: AccessorFile) -> bytes:
-        self.__check_open()
-        if isinstance(file, py7zr.FileInfo) and isinstance(self.__accessor, py7zr.SevenZipFile):
-            file_data = self.__accessor.read([file.filename])
-            self.__accessor.reset()
-            return list(file_data.values())[0].read()
-        elif isinstance(file, tarfile.TarInfo) and isinstance(self.__accessor, tarfile.TarFile):
-            file_data = self.__accessor.extractfile(file)
-            file_data.seek(0)
-            return file_data.read()
-        elif isinstance(file, Path):
-            return file.read_bytes()
-        elif isinstance(self.__accessor, Path) and isinstance(file, (str, bytes)):
-            if isinstance(file, bytes):
-                file = file.decode()
-            actual_path = self.__accessor / file
-            return actual_path.read_bytes()
-        return self.__accessor.read(file)
-
-    def contents(self):
-        """
-        Get all the contents in the files in the archive or folder.
-        """
-        self.__check_open()
-        if isinstance(self.__accessor, Path):
-            return list(self.__accessor.glob("*"))
-        elif isinstance(self.__accessor, zipfile.ZipFile):
-            return self.__accessor.filelist
-        elif isinstance(self.__accessor, rarfile.RarFile):
-            return self.__accessor.infolist()
-        elif isinstance(self.__accessor, py7zr.SevenZipFile):
-            return self.__accessor.list()
-        elif isinstance(self.__accessor, tarfile.TarFile):
-            return self.__accessor.getmembers()
-
-    def __iter__(self) -> Generator[Tuple[MImage, int], None, None]:
-        self.__check_open()
-        if isinstance(self.__accessor, Path):
-            for file, _, count, _ in collect_image_from_folder(self.__path):
-                yield MImage(file), count
-        elif isinstance(self.__accessor, zipfile.ZipFile):
-            for file, _, count, _ in collect_image_from_cbz(self.__accessor):
-                yield MImage(file), count
-        elif isinstance(self.__accessor, rarfile.RarFile):
-            for file, _, count, _ in collect_image_from_rar(self.__accessor):
-                yield MImage(file), count
-        elif isinstance(self.__accessor, py7zr.SevenZipFile):
-            for file, _, count, _ in collect_image_from_7z(self.__accessor):
-                yield MImage(file), count
-        elif isinstance(self.__accessor, tarfile.TarFile):
-            for file, _, count, _ in collect_image_from_tar(self.__accessor):
-                yield MImage(file), count
-        else:
-            raise NotImplementedError("Not implemented for this archive type")
-
-    @property
-    def comment(self) -> Optional[str]:
-        self.__check_open()
-        if isinstance(self.__accessor, (zipfile.ZipFile, rarfile.RarFile)):
-            return decode_or(self.__accessor.comment)
-        return None
-
-    @comment.setter
-    def comment(self, new_comment: Optional[Union[str, bytes]]):
-        self.__check_open()
-        if isinstance(self.__accessor, (zipfile.ZipFile, rarfile.RarFile)):
-            self.__accessor.comment = encode_or(new_comment) or b""
-
-
-def create_temp_dir() -> Path:
-    return Path(tempfile.mkdtemp())
-
-
-def remove_folder_and_contents(folder: Path):
-    if not folder.exists() or not folder.is_dir():
-        return
-    for folder in folder.iterdir():
-        if folder.is_dir():
-            remove_folder_and_contents(folder)
-        else:
-            folder.unlink(missing_ok=True)
-    folder.rmdir()
-
-
-def random_name(length: int = 8):
-    return "".join(random.choices(ascii_letters + digits, k=length))
\ No newline at end of file
+from __future__ import annotations
+
+import os
+import random
+import struct
+import tarfile
+import tempfile
+import zipfile
+from contextlib import nullcontext
+from copy import deepcopy
+from enum import Enum
+from mimetypes import types_map
+from os import path
+from pathlib import Path
+from string import ascii_letters, digits
+from typing import TYPE_CHECKING, Generator, List, Optional, Tuple, Union
+
+from .trace import span
+from .utils import decode_or, encode_or, lazy_import
+
+if TYPE_CHECKING:
+    import ftfy
+    import py7zr
+    from unrar.cffi import rarfile
+else:
+    # Only loaded when an archive or filename actually needs them
+    ftfy = lazy_import("ftfy")
+    py7zr = lazy_import("py7zr")
+    rarfile = lazy_import("unrar.cffi.rarfile")
+
+__all__ = (
+    "YieldType",
+    "MArchive",
+    "collect_image_from_cbz",
+    "collect_image_from_rar",
+    "collect_image_from_7z",
+    "collect_image_from_tar",
+    "collect_image_from_folder",
+    "is_cbz",
+    "is_rar",
+    "is_7zarchive",
+    "is_tararchive",
+    "is_archive",
+    "collect_image",
+    "collect_image_archive",
+    "collect_all_comics",
+    "create_temp_dir",
+    "remove_folder_and_contents",
+    "random_name",
+    "patch_zip_comment",
+)
+extended_types_map = deepcopy(types_map)
+extended_types_map[".avif"] = "image/avif"
+extended_types_map[".webp"] = "image/webp"
+extended_types_map[".heic"] = "image/heic"
+extended_types_map[".heif"] = "image/heif"
+extended_types_map[".jxl"] = "image/jxl"
+extended_types_map[".jp2"] = "image/jp2"
+
+
+class YieldType(Enum):
+    CBZ = 1
+    FOLDER = 2
+    RAR = 3
+    SEVENZIP = 4
+    TAR = 5  # Gzip, LZMA, XZ, BZ2
+
+
+class UnknownArchiveType(Exception):
+    def __init__(self, file: Path) -> None:
+        self.file = file
+        super().__init__(f"An unknown archive format found: {file}")
+
+
+def is_image(file_name: str) -> bool:
+    return extended_types_map.get(path.splitext(file_name)[-1], "").startswith("image/")
+
+
+def collect_image_from_cbz(cbz_file: zipfile.ZipFile):
+    with span("list"):
+        all_contents = cbz_file.filelist.copy()
+        valid_images = [x for x in all_contents if not x.is_dir() and is_image(x.filename)]
+        valid_images.sort(key=lambda x: path.basename(x.filename))
+    total_count = len(valid_images)
+    for content in valid_images:
+        yield content, cbz_file, total_count, YieldType.CBZ
+
+
+def collect_image_from_rar(rar_file: rarfile.RarFile):
+    with span("list"):
+        all_contents: List[rarfile.RarInfo] = rar_file.infolist()
+        valid_images = [x for x in all_contents if not x.is_dir() and is_image(x.filename)]
+        valid_images.sort(key=lambda x: path.basename(x.filename))
+    total_count = len(valid_images)
+    for content in valid_images:
+        yield content, rar_file, total_count, YieldType.RAR
+
+
+def collect_image_from_7z(sevenzip_file: py7zr.SevenZipFile):
+    with span("list"):
+        all_contents = sevenzip_file.list()
+        valid_images = [x for x in all_contents if not x.is_directory and is_image(x.filename)]
+        valid_images.sort(key=lambda x: path.basename(x.filename))
+    total_count = len(valid_images)
+    for content in valid_images:
+        yield content, sevenzip_file, total_count, YieldType.SEVENZIP
+
+
+def collect_image_from_tar(tararchive_file: tarfile.TarFile):
+    with span("list"):
+        all_contents = tararchive_file.getmembers()
+        valid_images = [x for x in all_contents if not x.isdir() and is_image(x.name)]
+        valid_images.sort(key=lambda x: path.basename(x.name))
+    total_count = len(valid_images)
+    for content in valid_images:
+        yield content, tararchive_file, total_count, YieldType.CBZ
+
+
+def collect_image_from_folder(folder_path: Path):
+    with span("list"):
+        all_contents = list(folder_path.glob("*"))
+        valid_images = [x for x in all_contents if is_image(x.name)]
+        valid_images.sort(key=lambda x: path.basename(x.name))
+    total_count = len(valid_images)
+    for file in valid_images:
+        yield file, folder_path, total_count, YieldType.FOLDER
+
+
+def is_cbz(file: Path):
+    if not file.is_file():
+        return False
+    return zipfile.is_zipfile(file)
+
+
+def is_rar(file: Path):
+    if not file.is_file():
+        return False
+    return rarfile.is_rarfile(str(file))
+
+
+def is_7zarchive(file: Path):
+    if not file.is_file():
+        return False
+    return py7zr.is_7zfile(file)
+
+
+def is_tararchive(file: Path):
+    if not file.is_file():
+        return False
+    return tarfile.is_tarfile(str(file))
+
+
+def is_archive(file: Path):
+    return is_cbz(file) or is_rar(file) or is_7zarchive(file) or is_tararchive(file)
+
+
+def collect_image_archive(file: Path):
+    if not file.is_file():
+        return
+
+    if is_cbz(file):
+        with zipfile.ZipFile(str(file)) as cbz_file:
+            yield from collect_image_from_cbz(cbz_file)
+    elif is_rar(file):
+        # RarFile does not support the context manager
+        with nullcontext(rarfile.RarFile(str(file))) as rar_file:
+            yield from collect_image_from_rar(rar_file)
+    elif is_7zarchive(file):
+        with py7zr.SevenZipFile(str(file)) as archive:
+            yield from collect_image_from_7z(archive)
+    elif is_tararchive(file):
+        with tarfile.open(str(file)) as tararchive_file:
+            yield from collect_image_from_tar(tararchive_file)
+    else:
+        raise UnknownArchiveType(file)
+
+
+def collect_image(path_or_archive: Path):
+    if path_or_archive.is_file():
+        yield from collect_image_archive(path_or_archive)
+    else:
+        yield from collect_image_from_folder(path_or_archive)
+
+
+def collect_all_comics(folder: Path):
+    for file in folder.glob("*.cb[z|r|7]"):
+        if is_archive(file):
+            yield file
+
+
+if TYPE_CHECKING:
+    AccessorType = Union[zipfile.ZipFile, rarfile.RarFile, py7zr.SevenZipFile, tarfile.TarFile, Path]
+    AccessorFile = Union[zipfile.ZipInfo, py7zr.FileInfo, rarfile.RarInfo, tarfile.TarInfo, str, bytes]
+    AccessorImage = Union[zipfile.ZipInfo, py7zr.FileInfo, rarfile.RarInfo, tarfile.TarInfo, Path]
+
+
+class MImage:
+    """
+    Wrapper for image path, archive, or something like that.
+    """
+
+    def __init__(self, file: AccessorImage):
+        self.__accessor = file
+
+    @property
+    def name(self) -> str:
+        if isinstance(self.__accessor, zipfile.ZipInfo):
+            return path.basename(self.__accessor.filename)
+        elif isinstance(self.__accessor, py7zr.FileInfo):
+            return path.basename(self.__accessor.filename)
+        elif isinstance(self.__accessor, rarfile.RarInfo):
+            return path.basename(self.__accessor.filename)
+        elif isinstance(self.__accessor, tarfile.TarInfo):
+            return path.basename(self.__accessor.name)
+        elif isinstance(self.__accessor, Path):
+            return self.__accessor.name
+        else:
+            raise TypeError(f"Unknown type: {type(self.__accessor)}")
+
+    def __str__(self):
+        return self.filename
+
+    @property
+    def filename(self):
+        """Shortcut for the image filename."""
+        try:
+            return ftfy.fix_encoding(self.name)
+        except Exception:
+            # In a absurd case that it fails miserably, just return the original name.
+            return self.name
+
+    @property
+    def stem(self):
+        """Return the final component of the image filename without the extension."""
+        if isinstance(self.__accessor, Path):
+            return self.__accessor.stem
+        return path.splitext(self.filename)[0]
+
+    @property
+    def suffix(self):
+        """Return the extension of the image filename.
+        Include the leading dot.
+        """
+        if isinstance(self.__accessor, Path):
+            return self.__accessor.suffix
+        extension = path.splitext(self.filename)[-1]
+        return extension if extension.startswith(".") else f".{extension}"
+
+    @property
+    def size(self) -> int:
+        """Return the uncompressed size of the image, read from the archive listing."""
+        if isinstance(self.__accessor, (zipfile.ZipInfo, rarfile.RarInfo)):
+            return self.__accessor.file_size
+        elif isinstance(self.__accessor, py7zr.FileInfo):
+            return self.__accessor.uncompressed
+        elif isinstance(self.__accessor, tarfile.TarInfo):
+            return self.__accessor.size
+        elif isinstance(self.__accessor, Path):
+            return self.__accessor.stat().st_size
+        else:
+            raise TypeError(f"Unknown type: {type(self.__accessor)}")
+
+    def access(self):
+        """Return the accessor or internal file object."""
+        return self.__accessor
+
+    def is_archive(self):
+        """Return True if the image is an archive."""
+        return not isinstance(self.__accessor, Path)
+
+
+class MArchive:
+    """
+    Wrapper for multiple archive format and folder.
+    Allow simple access to some property, and access to read
+    one of the file in the archive or folder.
+    """
+
+    def __init__(self, file_or_folder: Path):
+        self.__accessor: AccessorType = None
+        self.__path = file_or_folder
+
+    def __check_open(self):
+        if self.__accessor is None:
+            self.open()
+
+    def open(self):
+        if self.__accessor is not None:
+            return self.__accessor
+        with span("open", path=self.__path.name):
+            self.__accessor = self.__open_accessor()
+        return self.__accessor
+
+    def __open_accessor(self) -> AccessorType:
+        if self.__path.is_file():
+            if is_cbz(self.__path):
+                return zipfile.ZipFile(str(self.__path))
+            elif is_rar(self.__path):
+                return rarfile.RarFile(str(self.__path))
+            elif is_7zarchive(self.__path):
+                return py7zr.SevenZipFile(str(self.__path))
+            elif is_tararchive(self.__path):
+                return tarfile.open(str(self.__path))
+            else:
+                raise UnknownArchiveType(self.__path)
+        return self.__path
+
+    def close(self):
+        if self.__accessor is not None:
+            if isinstance(self.__accessor, (zipfile.ZipFile, py7zr.SevenZipFile, tarfile.TarFile)):
+                self.__accessor.close()
+            self.__accessor = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def read(self, file: Union[AccessorFile, MImage]) -> bytes:
+        """Read a specific file from the archive or folder.
+        Return the bytes data.
+        """
+        with span("read"):
+            if isinstance(file, MImage):
+                return self.__actual_read(file.access())
+            return self.__actual_read(file)
+
+    def __actual_read(self, file: AccessorFile) -> bytes:
+        self.__check_open()
+        if isinstance(file, py7zr.FileInfo) and isinstance(self.__accessor, py7zr.SevenZipFile):
+            file_data = self.__accessor.read([file.filename])
+            self.__accessor.reset()
+            return list(file_data.values())[0].read()
+        elif isinstance(file, tarfile.TarInfo) and isinstance(self.__accessor, tarfile.TarFile):
+            file_data = self.__accessor.extractfile(file)
+            file_data.seek(0)
+            return file_data.read()
+        elif isinstance(file, Path):
+            return file.read_bytes()
+        elif isinstance(self.__accessor, Path) and isinstance(file, (str, bytes)):
+            if isinstance(file, bytes):
+                file = file.decode()
+            actual_path = self.__accessor / file
+            return actual_path.read_bytes()
+        return self.__accessor.read(file)
+
+    def contents(self):
+        """
+        Get all the contents in the files in the archive or folder.
+        """
+        self.__check_open()
+        if isinstance(self.__accessor, Path):
+            return list(self.__accessor.glob("*"))
+        elif isinstance(self.__accessor, zipfile.ZipFile):
+            return self.__accessor.filelist
+        elif isinstance(self.__accessor, rarfile.RarFile):
+            return self.__accessor.infolist()
+        elif isinstance(self.__accessor, py7zr.SevenZipFile):
+            return self.__accessor.list()
+        elif isinstance(self.__accessor, tarfile.TarFile):
+            return self.__accessor.getmembers()
+
+    def __iter__(self) -> Generator[Tuple[MImage, int], None, None]:
+        self.__check_open()
+        if isinstance(self.__accessor, Path):
+            for file, _, count, _ in collect_image_from_folder(self.__path):
+                yield MImage(file), count
+        elif isinstance(self.__accessor, zipfile.ZipFile):
+            for file, _, count, _ in collect_image_from_cbz(self.__accessor):
+                yield MImage(file), count
+        elif isinstance(self.__accessor, rarfile.RarFile):
+            for file, _, count, _ in collect_image_from_rar(self.__accessor):
+                yield MImage(file), count
+        elif isinstance(self.__accessor, py7zr.SevenZipFile):
+            for file, _, count, _ in collect_image_from_7z(self.__accessor):
+                yield MImage(file), count
+        elif isinstance(self.__accessor, tarfile.TarFile):
+            for file, _, count, _ in collect_image_from_tar(self.__accessor):
+                yield MImage(file), count
+        else:
+            raise NotImplementedError("Not implemented for this archive type")
+
+    @property
+    def comment(self) -> Optional[str]:
+        self.__check_open()
+        if isinstance(self.__accessor, (zipfile.ZipFile, rarfile.RarFile)):
+            return decode_or(self.__accessor.comment)
+        return None
+
+    @comment.setter
+    def comment(self, new_comment: Optional[Union[str, bytes]]):
+        self.__check_open()
+        if isinstance(self.__accessor, (zipfile.ZipFile, rarfile.RarFile)):
+            self.__accessor.comment = encode_or(new_comment) or b""
+
+
+_ZIP_EOCD_MAGIC = b"PK\x05\x06"
+_ZIP_EOCD = struct.Struct("<4s4H2LH")
+_ZIP_EOCD_SIZE = 22
+_ZIP_MAX_COMMENT = 0xFFFF
+_ZIP64_LOCATOR_MAGIC = b"PK\x06\x07"
+_ZIP64_LOCATOR_SIZE = 20
+
+
+def patch_zip_comment(file: Path, comment: Optional[Union[str, bytes]]) -> None:
+    """Replace the comment of a ZIP file in place.
+
+    Only the End Of Central Directory record at the end of the file is touched,
+    so this does not depend on the size of the archive. ZIP64 and truncated archives
+    are rejected before anything is written.
+    """
+    comment_data = encode_or(comment) or b""
+    if len(comment_data) > _ZIP_MAX_COMMENT:
+        raise ValueError(f"ZIP comment is too long ({len(comment_data)} > {_ZIP_MAX_COMMENT} bytes)")
+    if _ZIP_EOCD_MAGIC in comment_data:
+        # Most ZIP readers will mistake it as the start of the record
+        raise ValueError("ZIP comment cannot contain the End Of Central Directory signature")
+
+    with file.open("r+b") as fp:
+        file_size = fp.seek(0, os.SEEK_END)
+        tail_start = max(0, file_size - _ZIP_EOCD_SIZE - _ZIP_MAX_COMMENT)
+        fp.seek(tail_start)
+        tail_data = fp.read()
+
+        # The comment itself might contain the magic, so we walk backward until
+        # the comment length in the record matches the end of the file.
+        eocd_pos = tail_data.rfind(_ZIP_EOCD_MAGIC)
+        while eocd_pos >= 0:
+            if len(tail_data) - eocd_pos >= _ZIP_EOCD_SIZE:
+                (comment_len,) = struct.unpack_from("<H", tail_data, eocd_pos + 20)
+                if eocd_pos + _ZIP_EOCD_SIZE + comment_len == len(tail_data):
+                    break
+            eocd_pos = tail_data.rfind(_ZIP_EOCD_MAGIC, 0, eocd_pos)
+        if eocd_pos < 0:
+            raise zipfile.BadZipFile(f"Unable to find End Of Central Directory record in {file}")
+
+        _, disk, cd_disk, disk_entries, total_entries, cd_size, cd_offset, _ = _ZIP_EOCD.unpack_from(
+            tail_data, eocd_pos
+        )
+        locator_pos = tail_start + eocd_pos - _ZIP64_LOCATOR_SIZE
+        locator_magic = b""
+        if locator_pos >= 0:
+            fp.seek(locator_pos)
+            locator_magic = fp.read(len(_ZIP64_LOCATOR_MAGIC))
+        # The ZIP64 record before it also has to be kept in sync, which is not supported
+        if (
+            locator_magic == _ZIP64_LOCATOR_MAGIC
+            or 0xFFFF in (disk, cd_disk, disk_entries, total_entries)
+            or 0xFFFFFFFF in (cd_size, cd_offset)
+        ):
+            raise zipfile.LargeZipFile(f"ZIP64 archive is not supported: {file}")
+        if cd_offset + cd_size > tail_start + eocd_pos:
+            raise zipfile.BadZipFile(f"The Central Directory is outside of the file, truncated archive: {file}")
+
+        comment_pos = tail_start + eocd_pos + _ZIP_EOCD_SIZE
+        fp.seek(comment_pos - 2)
+        fp.write(struct.pack("<H", len(comment_data)))
+        fp.write(comment_data)
+        fp.truncate(comment_pos + len(comment_data))
+
+
+def create_temp_dir() -> Path:
+    return Path(tempfile.mkdtemp())
+
+
+def remove_folder_and_contents(folder: Path):
+    if not folder.exists() or not folder.is_dir():
+        return
+    for folder in folder.iterdir():
+        if folder.is_dir():
+            remove_folder_and_contents(folder)
+        else:
+            folder.unlink(missing_ok=True)
+    folder.rmdir()
+
+
+def random_name(length: int = 8):
+    return "".join(random.choices(ascii_letters + digits, k=length))
@@ -0,0 +1,37 @@
+"""
+Entry point of the `nn` script.
+
+``nn --client <command>`` is forwarded to ``nn serve`` before the CLI is even imported,
+everything else goes to the normal CLI.
+"""
+
+import sys
+
+__all__ = ("main",)
+
+
+def main():
+    argv = sys.argv[1:]
+    if argv[:1] != ["--client"]:
+        from .cmd import main as cli_main
+
+        cli_main()
+        return
+
+    from .client import default_socket_path, run_client
+
+    try:
+        exit_code = run_client(argv[1:])
+    except KeyboardInterrupt:
+        sys.exit(130)
+    if exit_code is None:
+        sys.stderr.write(f"nn: no server listening on {default_socket_path()}, running the command directly\n")
+        from .cmd import main as cli_main
+
+        cli_main(args=argv[1:], prog_name="nn")
+        return
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
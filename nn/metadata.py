@@ -0,0 +1,227 @@
+import struct
+import zlib
+from typing import List, NamedTuple, Optional, Tuple
+from xml.sax.saxutils import escape
+
+__all__ = (
+    "build_exif_data",
+    "build_xmp_packet",
+    "tag_image_data",
+)
+
+_JPEG_SOI = b"\xff\xd8"
+_JPEG_EXIF_HEADER = b"Exif\x00\x00"
+_JPEG_XMP_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+# EXIF tags in IFD0, the same one written by `nn tag` with exiftool
+_EXIF_IMAGE_DESCRIPTION = 0x010E
+_EXIF_ARTIST = 0x013B
+_EXIF_XP_TITLE = 0x9C9B
+_EXIF_XP_COMMENT = 0x9C9C
+_EXIF_XP_AUTHOR = 0x9C9D
+_EXIF_TYPE_BYTE = 1
+_EXIF_TYPE_ASCII = 2
+_EXIF_TYPE_LONG = 4
+# Size in bytes of one value of each TIFF type
+_EXIF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 13: 4}
+# Exif, GPS and Interoperability IFD, they are moved along with the tag pointing to them
+_EXIF_IFD_POINTERS = (0x8769, 0x8825, 0xA005)
+_EXIF_MAX_DEPTH = 2
+
+
+class _ExifEntry(NamedTuple):
+    tag: int
+    tag_type: int
+    count: int
+    value: bytes
+    sub_ifd: Optional[List["_ExifEntry"]] = None
+
+
+def _read_exif_ifd(tiff: bytes, offset: int, endian: str, depth: int = 0) -> List[_ExifEntry]:
+    (entry_count,) = struct.unpack_from(endian + "H", tiff, offset)
+    entries: List[_ExifEntry] = []
+    for idx in range(entry_count):
+        tag, tag_type, count, raw_value = struct.unpack_from(endian + "HHI4s", tiff, offset + 2 + idx * 12)
+        type_size = _EXIF_TYPE_SIZES.get(tag_type)
+        if type_size is None:
+            # Unknown type, the value can't be moved
+            continue
+        if tag in _EXIF_IFD_POINTERS:
+            if depth >= _EXIF_MAX_DEPTH:
+                continue
+            (sub_offset,) = struct.unpack(endian + "I", raw_value)
+            sub_ifd = _read_exif_ifd(tiff, sub_offset, endian, depth + 1)
+            entries.append(_ExifEntry(tag, _EXIF_TYPE_LONG, 1, b"", sub_ifd))
+            continue
+        size = type_size * count
+        if size <= 4:
+            value = raw_value[:size]
+        else:
+            (value_offset,) = struct.unpack(endian + "I", raw_value)
+            value = tiff[value_offset : value_offset + size]
+            if len(value) != size:
+                continue
+        entries.append(_ExifEntry(tag, tag_type, count, value))
+    return entries
+
+
+def _write_exif_ifd(entries: List[_ExifEntry], offset: int, endian: str) -> bytes:
+    """Write the IFD at the offset, followed by the values and sub IFD that does not fit in the entries."""
+    data_offset = offset + 2 + len(entries) * 12 + 4
+    ifd_data = struct.pack(endian + "H", len(entries))
+    value_data = b""
+    for entry in sorted(entries, key=lambda x: x.tag):
+        if entry.sub_ifd is not None:
+            value_offset = data_offset + len(value_data)
+            ifd_data += struct.pack(endian + "HHII", entry.tag, _EXIF_TYPE_LONG, 1, value_offset)
+            value_data += _write_exif_ifd(entry.sub_ifd, value_offset, endian)
+        elif len(entry.value) <= 4:
+            ifd_data += struct.pack(endian + "HHI", entry.tag, entry.tag_type, entry.count)
+            ifd_data += entry.value.ljust(4, b"\x00")
+            continue
+        else:
+            value_offset = data_offset + len(value_data)
+            ifd_data += struct.pack(endian + "HHII", entry.tag, entry.tag_type, entry.count, value_offset)
+            value_data += entry.value
+        if len(value_data) % 2:
+            # Offset must be word aligned
+            value_data += b"\x00"
+    ifd_data += struct.pack(endian + "I", 0)
+    return ifd_data + value_data
+
+
+def _read_exif(tiff: bytes) -> Tuple[str, List[_ExifEntry]]:
+    if tiff.startswith(b"II*\x00"):
+        endian = "<"
+    elif tiff.startswith(b"MM\x00*"):
+        endian = ">"
+    else:
+        raise ValueError("Not a TIFF structure")
+    (ifd_offset,) = struct.unpack_from(endian + "I", tiff, 4)
+    return endian, _read_exif_ifd(tiff, ifd_offset, endian)
+
+
+def build_exif_data(image_title: str, image_email: str, existing_exif: Optional[bytes] = None) -> bytes:
+    """Build a TIFF structure with the title and email in IFD0.
+
+    The tags of ``existing_exif`` (and its Exif/GPS IFD) are kept, e.g. the orientation,
+    only the thumbnail IFD is dropped.
+    """
+    endian = "<"
+    entries: List[_ExifEntry] = []
+    if existing_exif is not None:
+        try:
+            endian, entries = _read_exif(existing_exif)
+        except (ValueError, struct.error):
+            # Broken EXIF, replace it
+            endian, entries = "<", []
+
+    xp_title = image_title.encode("utf-16-le") + b"\x00\x00"
+    xp_email = image_email.encode("utf-16-le") + b"\x00\x00"
+    new_entries: List[Tuple[int, int, bytes]] = [
+        (_EXIF_IMAGE_DESCRIPTION, _EXIF_TYPE_ASCII, image_title.encode("utf-8") + b"\x00"),
+        (_EXIF_ARTIST, _EXIF_TYPE_ASCII, image_email.encode("utf-8") + b"\x00"),
+        (_EXIF_XP_TITLE, _EXIF_TYPE_BYTE, xp_title),
+        (_EXIF_XP_COMMENT, _EXIF_TYPE_BYTE, xp_email),
+        (_EXIF_XP_AUTHOR, _EXIF_TYPE_BYTE, xp_email),
+    ]
+    new_tags = {tag for tag, _, _ in new_entries}
+    entries = [entry for entry in entries if entry.tag not in new_tags]
+    entries.extend(_ExifEntry(tag, tag_type, len(value), value) for tag, tag_type, value in new_entries)
+
+    ifd_offset = 8
+    header = b"II*\x00" if endian == "<" else b"MM\x00*"
+    return header + struct.pack(endian + "I", ifd_offset) + _write_exif_ifd(entries, ifd_offset, endian)
+
+
+def build_xmp_packet(image_title: str, image_email: str) -> bytes:
+    title = escape(image_title)
+    email = escape(image_email)
+    packet = (
+        '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>'
+        '<x:xmpmeta xmlns:x="adobe:ns:meta/">'
+        '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+        '<rdf:Description rdf:about="" xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        f'<dc:title><rdf:Alt><rdf:li xml:lang="x-default">{title}</rdf:li></rdf:Alt></dc:title>'
+        f'<dc:description><rdf:Alt><rdf:li xml:lang="x-default">{title}</rdf:li></rdf:Alt></dc:description>'
+        f"<dc:creator><rdf:Seq><rdf:li>{email}</rdf:li></rdf:Seq></dc:creator>"
+        "</rdf:Description>"
+        "</rdf:RDF>"
+        "</x:xmpmeta>"
+        '<?xpacket end="w"?>'
+    )
+    return packet.encode("utf-8")
+
+
+def _jpeg_segment(marker: int, payload: bytes) -> bytes:
+    if len(payload) + 2 > 0xFFFF:
+        raise ValueError("JPEG segment is too large")
+    return struct.pack(">BBH", 0xFF, marker, len(payload) + 2) + payload
+
+
+def _tag_jpeg(image_data: bytes, image_title: str, image_email: str) -> bytes:
+    # Walk the segment headers until the image data, dropping the old EXIF/XMP segments.
+    # The tags of the old EXIF are merged into the new one.
+    position = 2
+    kept_segments: List[bytes] = []
+    existing_exif: Optional[bytes] = None
+    while position + 4 <= len(image_data):
+        if image_data[position] != 0xFF:
+            break
+        marker = image_data[position + 1]
+        if marker == 0xDA or marker == 0xD9:
+            break
+        (length,) = struct.unpack_from(">H", image_data, position + 2)
+        segment = image_data[position : position + 2 + length]
+        payload = segment[4:]
+        is_old_meta = marker == 0xE1 and (payload.startswith(_JPEG_EXIF_HEADER) or payload.startswith(_JPEG_XMP_HEADER))
+        if is_old_meta and existing_exif is None and payload.startswith(_JPEG_EXIF_HEADER):
+            existing_exif = payload[len(_JPEG_EXIF_HEADER) :]
+        if not is_old_meta:
+            kept_segments.append(segment)
+        position += 2 + length
+
+    meta_segments = [
+        _jpeg_segment(0xE1, _JPEG_EXIF_HEADER + build_exif_data(image_title, image_email, existing_exif)),
+        _jpeg_segment(0xE1, _JPEG_XMP_HEADER + build_xmp_packet(image_title, image_email)),
+    ]
+    # EXIF needs to be the first segment, only the JFIF header can be before it.
+    insert_at = 1 if kept_segments and kept_segments[0][1] == 0xE0 else 0
+    all_segments = kept_segments[:insert_at] + meta_segments + kept_segments[insert_at:]
+    return _JPEG_SOI + b"".join(all_segments) + image_data[position:]
+
+
+def _png_itxt_chunk(keyword: str, text: str) -> bytes:
+    chunk_data = keyword.encode("latin-1") + b"\x00\x00\x00\x00\x00" + text.encode("utf-8")
+    return (
+        struct.pack(">I", len(chunk_data)) + b"iTXt" + chunk_data + struct.pack(">I", zlib.crc32(b"iTXt" + chunk_data))
+    )
+
+
+def _tag_png(image_data: bytes, image_title: str, image_email: str) -> bytes:
+    iend_at = image_data.rfind(b"IEND")
+    if iend_at < 4:
+        return image_data
+    text_chunks = [
+        _png_itxt_chunk("Title", image_title),
+        _png_itxt_chunk("Description", image_title),
+        _png_itxt_chunk("Author", image_email),
+        _png_itxt_chunk("Comment", image_email),
+        _png_itxt_chunk("XML:com.adobe.xmp", build_xmp_packet(image_title, image_email).decode("utf-8")),
+    ]
+    # Insert before the IEND chunk, including the length field
+    return image_data[: iend_at - 4] + b"".join(text_chunks) + image_data[iend_at - 4 :]
+
+
+def tag_image_data(image_data: bytes, image_title: str, image_email: str) -> bytes:
+    """Inject the title and email into the image in memory, without re-encoding the image.
+
+    JPEG gets an EXIF (merged with the existing one) and XMP segment, PNG gets iTXt chunks.
+    Other format is returned as it is.
+    """
+    if image_data.startswith(_JPEG_SOI):
+        return _tag_jpeg(image_data, image_title, image_email)
+    if image_data.startswith(_PNG_MAGIC):
+        return _tag_png(image_data, image_title, image_email)
+    return image_data
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from enum import Enum
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from zipfile import ZipFile, ZipInfo
+
+from . import term
+from .utils import format_bytes, lazy_import
+from .zipwriter import ZipRewriter
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageChops
+else:
+    Image = lazy_import("PIL.Image")
+    ImageChops = lazy_import("PIL.ImageChops")
+
+__all__ = (
+    "OptimizerBackend",
+    "OptimizeResult",
+    "OPTIMIZABLE_SUFFIXES",
+    "optimize_image_data",
+    "optimize_images_pillow",
+    "optimize_archive",
+)
+
+console = term.get_console()
+OPTIMIZABLE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+# Yield the original and optimized data of each entry, in the same order as given
+EntryOptimizer = Callable[[ZipFile, List[ZipInfo]], Iterator[Tuple[bytes, bytes]]]
+# Metadata that Pillow might carry over from the source image when re-encoding.
+# ICC profile, DPI and the EXIF orientation are kept on purpose since they change how the image is shown.
+_STRIPPED_INFO = ("exif", "comment", "xmp", "XML:com.adobe.xmp", "photoshop")
+_EXIF_ORIENTATION = 0x0112
+# PNG modes that Pillow writes back exactly as they were read, anything else (16 bits, I, F) is lossy.
+_PNG_SAFE_MODES = ("1", "L", "LA", "P", "RGB", "RGBA")
+
+
+class OptimizerBackend(str, Enum):
+    pillow = "pillow"
+    pingo = "pingo"
+
+
+@dataclass
+class OptimizeResult:
+    name: str
+    before: int
+    after: int
+
+    @property
+    def saved(self) -> int:
+        return self.before - self.after
+
+
+def _strip_metadata(im: Image.Image):
+    for key in _STRIPPED_INFO:
+        im.info.pop(key, None)
+
+
+def _kept_metadata(im: Image.Image) -> Dict[str, Any]:
+    """The save parameters for the metadata that must survive the re-encoding."""
+    params: Dict[str, Any] = {}
+    icc_profile = im.info.get("icc_profile")
+    if icc_profile:
+        params["icc_profile"] = icc_profile
+    dpi = im.info.get("dpi")
+    if dpi:
+        params["dpi"] = dpi
+    orientation = im.getexif().get(_EXIF_ORIENTATION)
+    if orientation is not None and orientation != 1:
+        exif = Image.Exif()
+        exif[_EXIF_ORIENTATION] = orientation
+        params["exif"] = exif.tobytes()
+    return params
+
+
+def _png_bit_depth(image_data: bytes) -> int:
+    # Signature (8), IHDR length and type (8), width and height (8), then the bit depth
+    if len(image_data) < 25 or image_data[12:16] != b"IHDR":
+        return 0
+    return image_data[24]
+
+
+def _is_lossless_png(im: Image.Image, image_data: bytes) -> bool:
+    """Pillow loads 16 bits PNG as 8 bits, re-encoding them would lose data."""
+    return im.mode in _PNG_SAFE_MODES and _png_bit_depth(image_data) <= 8
+
+
+def _reduce_png_mode(im: Image.Image) -> Image.Image:
+    """Losslessly reduce the color mode of the image when possible."""
+    if "transparency" in im.info:
+        return im
+    if im.mode == "RGBA" and im.getchannel("A").getextrema() == (255, 255):
+        im = im.convert("RGB")
+    if im.mode == "RGB":
+        red, green, blue = im.split()
+        if ImageChops.difference(red, green).getbbox() is None and ImageChops.difference(green, blue).getbbox() is None:
+            im = red
+    return im
+
+
+def _encode_png(im: Image.Image, aggresive: bool, metadata: Dict[str, Any]) -> bytes:
+    if aggresive:
+        im = _reduce_png_mode(im)
+    output = BytesIO()
+    im.save(output, "PNG", optimize=True, **metadata)
+    return output.getvalue()
+
+
+def _encode_jpeg(im: Image.Image, aggresive: bool, metadata: Dict[str, Any]) -> bytes:
+    output = BytesIO()
+    params = {"optimize": True, "progressive": aggresive, **metadata}
+    if im.format == "JPEG":
+        # Re-use the original quantization tables so the quality is matched.
+        params["quality"] = "keep"
+        params["subsampling"] = "keep"
+    im.save(output, "JPEG", **params)
+    return output.getvalue()
+
+
+def _encode_webp(im: Image.Image, aggresive: bool, metadata: Dict[str, Any]) -> bytes:
+    output = BytesIO()
+    # WebP does not store the DPI
+    params = {"lossless": True, "quality": 100, "method": 6 if aggresive else 4}
+    params.update((key, value) for key, value in metadata.items() if key != "dpi")
+    im.save(output, "WEBP", **params)
+    return output.getvalue()
+
+
+_ENCODERS = {
+    "JPEG": _encode_jpeg,
+    "PNG": _encode_png,
+    "WEBP": _encode_webp,
+}
+
+
+def optimize_image_data(image_data: bytes, aggresive: bool = False) -> bytes:
+    """Re-encode an image in memory with Pillow.
+
+    The original data is returned if the image cannot be made smaller,
+    or if Pillow can't re-encode it without losing data (e.g. 16 bits PNG).
+    """
+    with Image.open(BytesIO(image_data)) as im:
+        encoder = _ENCODERS.get(im.format)
+        if encoder is None or getattr(im, "is_animated", False):
+            return image_data
+        if im.format == "PNG" and not _is_lossless_png(im, image_data):
+            return image_data
+        im.load()
+        metadata = _kept_metadata(im)
+        _strip_metadata(im)
+        optimized = encoder(im, aggresive, metadata)
+    if len(optimized) < len(image_data):
+        return optimized
+    return image_data
+
+
+def _optimize_file(image_path: Path, aggresive: bool) -> OptimizeResult:
+    original = image_path.read_bytes()
+    optimized = optimize_image_data(original, aggresive)
+    if len(optimized) < len(original):
+        temp_path = image_path.with_name(f".{image_path.name}.nntmp")
+        temp_path.write_bytes(optimized)
+        os.replace(temp_path, image_path)
+    return OptimizeResult(image_path.name, len(original), len(optimized))
+
+
+def optimize_images_pillow(
+    target_directory: Path, aggresive: bool = False, max_workers: Optional[int] = None
+) -> List[OptimizeResult]:
+    resolve_dir = target_directory.resolve()
+    all_images = [x for x in resolve_dir.iterdir() if x.is_file() and x.suffix.lower() in OPTIMIZABLE_SUFFIXES]
+    all_images.sort(key=lambda x: x.name)
+    if not all_images:
+        console.warning("No valid images found in directory, skipping optimization")
+        return []
+
+    results: List[OptimizeResult] = []
+    total_count = len(all_images)
+    console.status(f"Optimizing images... (0/{total_count})")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_optimize_file, image, aggresive): image for image in all_images}
+        for idx, future in enumerate(as_completed(futures), 1):
+            image = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                console.warning(f"Failed to optimize {image.name}, skipping! ({exc})")
+            console.status(f"Optimizing images... ({idx}/{total_count})")
+
+    total_before = sum(x.before for x in results)
+    total_after = sum(x.after for x in results)
+    optimized_count = len([x for x in results if x.saved > 0])
+    console.stop_status(
+        f"Optimized {optimized_count}/{total_count} images, saved {format_bytes(total_before - total_after)} "
+        f"({format_bytes(total_before)} -> {format_bytes(total_after)})"
+    )
+    return results
+
+
+def _is_optimizable_entry(info: ZipInfo) -> bool:
+    return not info.is_dir() and os.path.splitext(info.filename)[1].lower() in OPTIMIZABLE_SUFFIXES
+
+
+def _optimize_entries_pillow(
+    source: ZipFile, entries: List[ZipInfo], aggresive: bool = False, max_workers: Optional[int] = None
+) -> Iterator[Tuple[bytes, bytes]]:
+    max_workers = max_workers or os.cpu_count() or 1
+    # Only keep a few entries in flight so big archive does not need to fit in the memory.
+    max_pending = max_workers * 2
+    pending: Deque[Tuple[ZipInfo, bytes, Future]] = deque()
+
+    def _resolve_oldest():
+        info, original, future = pending.popleft()
+        try:
+            return original, future.result()
+        except Exception as exc:
+            console.warning(f"Failed to optimize {info.filename}, copying as it is! ({exc})")
+            return original, original
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for info in entries:
+            original = source.read(info)
+            pending.append((info, original, executor.submit(optimize_image_data, original, aggresive)))
+            while len(pending) >= max_pending:
+                yield _resolve_oldest()
+        while pending:
+            yield _resolve_oldest()
+
+
+def optimize_archive(
+    archive_path: Path,
+    aggresive: bool = False,
+    max_workers: Optional[int] = None,
+    entry_optimizer: Optional[EntryOptimizer] = None,
+) -> List[OptimizeResult]:
+    """Optimize every image inside a ZIP/CBZ archive.
+
+    The archive is rewritten with the same entry order, compression and comment.
+    Other entries and images that cannot be made smaller are copied raw, without
+    decompressing them. The original archive is only replaced once the new one is completely written.
+    By default the images are optimized with Pillow, use ``entry_optimizer`` for other backend.
+    """
+    results: List[OptimizeResult] = []
+    temp_path = archive_path.with_name(f".{archive_path.name}.nntmp")
+    with ZipFile(archive_path) as source, archive_path.open("rb") as source_fp:
+        all_entries = source.infolist()
+        image_entries = [info for info in all_entries if _is_optimizable_entry(info)]
+        if entry_optimizer is None:
+            optimized_entries = _optimize_entries_pillow(source, image_entries, aggresive, max_workers)
+        else:
+            optimized_entries = entry_optimizer(source, image_entries)
+
+        total_count = len(image_entries)
+        console.status(f"Optimizing archive images... (0/{total_count})")
+        try:
+            with temp_path.open("wb") as target_fp:
+                rewriter = ZipRewriter(source_fp, target_fp)
+                for info in all_entries:
+                    if not _is_optimizable_entry(info):
+                        rewriter.copy(info)
+                        continue
+                    original, optimized = next(optimized_entries)
+                    if len(optimized) < len(original):
+                        rewriter.replace(info, optimized)
+                    else:
+                        optimized = original
+                        rewriter.copy(info)
+                    results.append(OptimizeResult(info.filename, len(original), len(optimized)))
+                    console.status(f"Optimizing archive images... ({len(results)}/{total_count})")
+                rewriter.close(source.comment)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+    os.replace(temp_path, archive_path)
+
+    total_before = sum(x.before for x in results)
+    total_after = sum(x.after for x in results)
+    optimized_count = len([x for x in results if x.saved > 0])
+    console.stop_status(
+        f"Optimized {optimized_count}/{total_count} images, saved {format_bytes(total_before - total_after)} "
+        f"({format_bytes(total_before)} -> {format_bytes(total_after)})"
+    )
+    return results
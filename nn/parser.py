@@ -0,0 +1,409 @@
+"""
+Linear-time parser for the structured filenames used across nn.
+
+The parsers here return exactly the same groups as the patterns in :class:`nn.common.RegexCollection`,
+but scan the filename left-to-right instead of relying on the backtracking regex engine.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .common import RegexCollection
+
+__all__ = (
+    "ParsedFilename",
+    "ChapterFilenameParser",
+    "get_chapter_parser",
+    "parse_cmx_filename",
+    "parse_page_filename",
+)
+
+_PUBLICATION_TOKENS = frozenset(
+    [
+        "dig",
+        "web",
+        "c2c",
+        "mag",
+        "scan",
+        "paper",
+        "raw",
+        "raw-d",
+        "raw-dig",
+        "raw-digital",
+        "raw-m",
+        "raw-mag",
+        "raw-magazine",
+    ]
+)
+_PUBLICATION_TOKEN_MAX = max(len(x) for x in _PUBLICATION_TOKENS)
+_PageRangeRe = re.compile(r"[\d]+x?[\d]?\-?[\d]+")
+
+_Captures = Dict[str, str]
+_Candidates = List[Tuple[int, Optional[_Captures]]]
+_Element = Callable[[str, int], _Candidates]
+
+
+class ParsedFilename:
+    """
+    Result of a filename parse.
+
+    Support ``group()`` with the same group names as the regex, so it can be
+    used in place of a :class:`re.Match` (e.g. in :func:`nn.common.create_chapter`).
+    """
+
+    __slots__ = (
+        "series",
+        "chapter",
+        "extra",
+        "actual",
+        "volume",
+        "volume_ex",
+        "page_start",
+        "page_end",
+        "publication",
+        "chapter_title",
+        "publisher",
+        "postfix",
+    )
+    _GROUPS = {
+        "t": "series",
+        "any": "series",
+        "ch": "chapter",
+        "ex": "extra",
+        "actual": "actual",
+        "vol": "volume",
+        "volex": "volume_ex",
+        "a": "page_start",
+        "b": "page_end",
+        "title": "chapter_title",
+        "anyback": "postfix",
+    }
+
+    def __init__(self, **kwargs: Optional[str]):
+        for slot in self.__slots__:
+            setattr(self, slot, kwargs.get(slot))
+
+    def __repr__(self):
+        filled = ", ".join(f"{x}={getattr(self, x)!r}" for x in self.__slots__ if getattr(self, x) is not None)
+        return f"<ParsedFilename {filled}>"
+
+    def group(self, key: str) -> Optional[str]:
+        try:
+            return getattr(self, self._GROUPS[key])
+        except KeyError:
+            raise IndexError("no such group")
+
+    @classmethod
+    def from_match(cls, match: Optional[re.Match]) -> Optional["ParsedFilename"]:
+        if match is None:
+            return None
+        groups = match.groupdict()
+        return cls(**{cls._GROUPS[key]: value for key, value in groups.items() if key in cls._GROUPS})
+
+
+def _digits(text: str, pos: int, limit: Optional[int] = None) -> int:
+    """Count the decimal digits starting at ``pos``, same as ``[\\d]`` in a str pattern."""
+    end = pos
+    text_len = len(text)
+    while end < text_len and text[end].isdecimal():
+        end += 1
+        if limit is not None and end - pos >= limit:
+            break
+    return end - pos
+
+
+def _optional_char(chars: str) -> _Element:
+    def element(text: str, pos: int) -> _Candidates:
+        if pos < len(text) and text[pos] in chars:
+            return [(pos + 1, None), (pos, None)]
+        return [(pos, None)]
+
+    return element
+
+
+def _actual_element(text: str, pos: int) -> _Candidates:
+    # (?P<actual>[\d]{1,3}[\.][\d]{1,3})?
+    candidates: _Candidates = []
+    base_len = _digits(text, pos, 3)
+    for first in range(base_len, 0, -1):
+        dot_pos = pos + first
+        if dot_pos < len(text) and text[dot_pos] == ".":
+            floating = _digits(text, dot_pos + 1, 3)
+            for second in range(floating, 0, -1):
+                end = dot_pos + 1 + second
+                candidates.append((end, {"actual": text[pos:end]}))
+    candidates.append((pos, None))
+    return candidates
+
+
+def _match_oshot(text: str, pos: int) -> List[int]:
+    ends: List[int] = []
+    # [Oo][Ss]hot
+    if text[pos : pos + 1] in ("O", "o") and text[pos + 1 : pos + 2] in ("S", "s") and text[pos + 2 : pos + 5] == "hot":
+        ends.append(pos + 5)
+    # [Oo]ne[ -]?[Ss]hot
+    if text[pos : pos + 1] in ("O", "o") and text[pos + 1 : pos + 3] == "ne":
+        sep_pos = pos + 3
+        for shot_pos in ([sep_pos + 1] if text[sep_pos : sep_pos + 1] in (" ", "-") else []) + [sep_pos]:
+            if text[shot_pos : shot_pos + 1] in ("S", "s") and text[shot_pos + 1 : shot_pos + 4] == "hot":
+                ends.append(shot_pos + 4)
+    # [Nn][Aa]
+    if text[pos : pos + 1] in ("N", "n") and text[pos + 1 : pos + 2] in ("A", "a"):
+        ends.append(pos + 2)
+    return ends
+
+
+def _volume_element(text: str, pos: int) -> _Candidates:
+    # (?P<vol>v[\d]+(?P<volex>[\#x][\d]{1,2})?|[Oo][Ss]hot|[Oo]ne[ -]?[Ss]hot|[Nn][Aa])?
+    candidates: _Candidates = []
+    if text[pos : pos + 1] == "v":
+        vol_len = _digits(text, pos + 1)
+        for length in range(vol_len, 0, -1):
+            ex_pos = pos + 1 + length
+            if text[ex_pos : ex_pos + 1] in ("#", "x"):
+                ex_len = _digits(text, ex_pos + 1, 2)
+                for ex_digits in range(ex_len, 0, -1):
+                    end = ex_pos + 1 + ex_digits
+                    candidates.append((end, {"vol": text[pos:end], "volex": text[ex_pos:end]}))
+            candidates.append((ex_pos, {"vol": text[pos:ex_pos]}))
+    for end in _match_oshot(text, pos):
+        candidates.append((end, {"vol": text[pos:end]}))
+    candidates.append((pos, None))
+    return candidates
+
+
+def _min_page_end(text: str, pos: int) -> Optional[int]:
+    """Smallest end position of ``p[\\d]+x?[\\d]?\\-?[\\d]+`` starting at ``pos``"""
+    # When the second character is not a digit the first digit run is a single digit,
+    # so the shortest match always fit in 5 characters.
+    for end in range(pos + 2, min(pos + 5, len(text)) + 1):
+        if _PageRangeRe.fullmatch(text, pos, end):
+            return end
+    return None
+
+
+def _page_range(text: str, pos: int) -> Tuple[Optional[str], Optional[str]]:
+    first_len = _digits(text, pos)
+    if first_len < 1:
+        return None, None
+    first = text[pos : pos + first_len]
+    second: Optional[str] = None
+    dash_pos = pos + first_len
+    if text[dash_pos : dash_pos + 1] == "-":
+        second_len = _digits(text, dash_pos + 1)
+        if second_len > 0:
+            second = text[dash_pos + 1 : dash_pos + 1 + second_len]
+    return first, second
+
+
+class ChapterFilenameParser:
+    """
+    Parser equivalent to ``RegexCollection.chapter_re(title, publisher).match(filename)``.
+    """
+
+    def __init__(self, title: str, publisher: Optional[str] = None):
+        self.title = title
+        self.publisher = publisher
+        self._prefix = f"{title} - c"
+        self._publisher_marker = f"] [{publisher}" if publisher is not None else None
+        self._fallback: Optional[re.Pattern] = None
+        self._elements: List[_Element] = [
+            _optional_char("("),
+            _optional_char("c"),
+            _actual_element,
+            _optional_char(")"),
+            _optional_char(" "),
+            _optional_char("("),
+            _volume_element,
+            _optional_char(")"),
+            _optional_char(" "),
+        ]
+
+    def _fallback_match(self, filename: str) -> Optional[ParsedFilename]:
+        # `.` in the original pattern does not match a newline, just let the regex deal with it.
+        if self._fallback is None:
+            self._fallback = RegexCollection.chapter_re(self.title, self.publisher)
+        return ParsedFilename.from_match(self._fallback.match(filename))
+
+    def _find_tail(self, filename: str) -> Optional[Tuple[int, str, Optional[str]]]:
+        """Find the right-most `` [pubtype] ([title] )[Publisher`` section."""
+        marker_pos = filename.rfind(self._publisher_marker)
+        position = len(filename)
+        while True:
+            position = filename.rfind(" [", 0, position)
+            if position < 0:
+                return None
+            close_pos = filename.find("]", position + 2, position + 3 + _PUBLICATION_TOKEN_MAX)
+            if close_pos >= 0 and filename[close_pos + 1 : close_pos + 2] == " ":
+                pub_type = filename[position + 2 : close_pos]
+                rest_pos = close_pos + 2
+                if pub_type in _PUBLICATION_TOKENS:
+                    if filename[rest_pos : rest_pos + 1] == "[" and marker_pos >= rest_pos + 1:
+                        return position, pub_type, filename[rest_pos + 1 : marker_pos]
+                    if filename.startswith(f"[{self.publisher}", rest_pos):
+                        return position, pub_type, None
+
+    def _search(
+        self, filename: str, pos: int, index: int, captures: _Captures, tail: Optional[Tuple[int, str, Optional[str]]]
+    ) -> Optional[Tuple[int, _Captures]]:
+        if index == len(self._elements):
+            if not filename.startswith("- p", pos):
+                return None
+            page_end = _min_page_end(filename, pos + 3)
+            if page_end is None:
+                return None
+            if self.publisher is not None and (tail is None or tail[0] < page_end):
+                return None
+            return pos + 3, captures
+        for next_pos, capture in self._elements[index](filename, pos):
+            result = self._search(filename, next_pos, index + 1, {**captures, **capture} if capture else captures, tail)
+            if result is not None:
+                return result
+        return None
+
+    def parse(self, filename: str) -> Optional[ParsedFilename]:
+        if "\n" in filename:
+            return self._fallback_match(filename)
+        if not filename.startswith(self._prefix):
+            return None
+
+        pos = len(self._prefix)
+        ch_len = _digits(filename, pos)
+        if ch_len < 1:
+            return None
+        captures: _Captures = {"ch": filename[pos : pos + ch_len]}
+        pos += ch_len
+
+        # (?P<ex>[\#x.][\d]{1,2})? followed by a space
+        if filename[pos : pos + 1] in ("#", "x", "."):
+            ex_len = _digits(filename, pos + 1, 2)
+            if ex_len > 0:
+                captures["ex"] = filename[pos : pos + 1 + ex_len]
+                pos += 1 + ex_len
+        if filename[pos : pos + 1] != " ":
+            return None
+        pos += 1
+
+        tail: Optional[Tuple[int, str, Optional[str]]] = None
+        if self.publisher is not None:
+            tail = self._find_tail(filename)
+            if tail is None:
+                return None
+
+        result = self._search(filename, pos, 0, captures, tail)
+        if result is None:
+            return None
+        page_pos, captures = result
+        page_start, page_end = _page_range(filename, page_pos)
+        parsed = ParsedFilename(
+            series=self.title,
+            chapter=captures.get("ch"),
+            extra=captures.get("ex"),
+            actual=captures.get("actual"),
+            volume=captures.get("vol"),
+            volume_ex=captures.get("volex"),
+            page_start=page_start,
+            page_end=page_end,
+        )
+        if tail is not None:
+            parsed.publication = tail[1]
+            parsed.chapter_title = tail[2]
+            parsed.publisher = self.publisher
+        return parsed
+
+    def match(self, filename: str) -> Optional[ParsedFilename]:
+        """Alias of :meth:`parse`, to be used in place of a compiled pattern."""
+        return self.parse(filename)
+
+
+@lru_cache(maxsize=64)
+def get_chapter_parser(title: str, publisher: Optional[str] = None) -> ChapterFilenameParser:
+    return ChapterFilenameParser(title, publisher)
+
+
+def _cmx_rest(filename: str, pos: int) -> Optional[ParsedFilename]:
+    # (?:\- (?P<vol>v[\d]{1,3}))?(?P<volex>\.[\d]{1,2})? \- p(?P<a>[\d]{1,3})\-?(?P<b>[\d]{1,3})?
+    vol_candidates: List[Tuple[int, Optional[str]]] = []
+    if filename.startswith("- v", pos):
+        vol_len = _digits(filename, pos + 3, 3)
+        for length in range(vol_len, 0, -1):
+            vol_candidates.append((pos + 3 + length, filename[pos + 2 : pos + 3 + length]))
+    vol_candidates.append((pos, None))
+
+    for vol_end, volume in vol_candidates:
+        volex_candidates: List[Tuple[int, Optional[str]]] = []
+        if filename[vol_end : vol_end + 1] == ".":
+            volex_len = _digits(filename, vol_end + 1, 2)
+            for length in range(volex_len, 0, -1):
+                volex_candidates.append((vol_end + 1 + length, filename[vol_end : vol_end + 1 + length]))
+        volex_candidates.append((vol_end, None))
+
+        for volex_end, volume_ex in volex_candidates:
+            if not filename.startswith(" - p", volex_end):
+                continue
+            page_pos = volex_end + 4
+            first_len = _digits(filename, page_pos, 3)
+            if first_len < 1:
+                continue
+            page_start = filename[page_pos : page_pos + first_len]
+            second_pos = page_pos + first_len
+            if filename[second_pos : second_pos + 1] == "-":
+                second_pos += 1
+            second_len = _digits(filename, second_pos, 3)
+            page_end = filename[second_pos : second_pos + second_len] if second_len > 0 else None
+            return ParsedFilename(
+                series=filename[:pos],
+                volume=volume,
+                volume_ex=volume_ex,
+                page_start=page_start,
+                page_end=page_end,
+            )
+    return None
+
+
+@lru_cache(maxsize=4096)
+def parse_cmx_filename(filename: str) -> Optional[ParsedFilename]:
+    """Parser equivalent to ``RegexCollection.cmx_re().match(filename)``."""
+    for pos in range(1, len(filename)):
+        if filename[pos] not in ("-", ".", " "):
+            continue
+        parsed = _cmx_rest(filename, pos)
+        if parsed is not None:
+            return parsed
+    return None
+
+
+@lru_cache(maxsize=4096)
+def parse_page_filename(filename: str) -> Optional[ParsedFilename]:
+    """Parser equivalent to ``RegexCollection.page_re().match(filename)``."""
+    line_end = filename.find("\n")
+    if line_end < 0:
+        line_end = len(filename)
+
+    position = line_end
+    while True:
+        position = filename.rfind("p", 0, position)
+        if position < 0:
+            return None
+        if filename[position + 1 : position + 2].isdecimal():
+            break
+
+    page_pos = position + 1
+    first_len = _digits(filename, page_pos, 3)
+    second_pos = page_pos + first_len
+    if filename[second_pos : second_pos + 1] == "-":
+        second_pos += 1
+    second_len = _digits(filename, second_pos, 3)
+    back_pos = second_pos + second_len
+    back_end = filename.find("\n", back_pos)
+    if back_end < 0:
+        back_end = len(filename)
+    return ParsedFilename(
+        series=filename[:position],
+        page_start=filename[page_pos : page_pos + first_len],
+        page_end=filename[second_pos:back_pos] if second_len > 0 else None,
+        postfix=filename[back_pos:back_end],
+    )
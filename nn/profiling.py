@@ -0,0 +1,130 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from . import term
+from .trace import add_span_hook, remove_span_hook
+from .utils import format_bytes, get_peak_rss
+
+__all__ = (
+    "ProfileMode",
+    "run_profiled",
+)
+
+console = term.get_console()
+TOP_COUNT = 20
+
+
+class ProfileMode(str, Enum):
+    cpu = "cpu"
+    mem = "mem"
+
+
+def _profile_name(command_name: str) -> str:
+    return f"{command_name}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+def _run_cpu_profile(func: Callable[[], Any], output_dir: Path, name: str) -> Any:
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        return func()
+    finally:
+        profiler.disable()
+        stats_file = output_dir / f"{name}.prof"
+        profiler.dump_stats(str(stats_file))
+
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_COUNT)
+        summary_file = output_dir / f"{name}.txt"
+        summary_file.write_text(summary.getvalue(), encoding="utf-8")
+
+        console.info(f"CPU profile written to {stats_file} (open with `python -m pstats` or snakeviz)")
+        console.info(f"Top {TOP_COUNT} functions by cumulative time:")
+        stats_table = summary.getvalue().splitlines()
+        header_at = next((idx for idx, line in enumerate(stats_table) if line.strip().startswith("ncalls")), 0)
+        for line in stats_table[header_at : header_at + TOP_COUNT + 1]:
+            console.console.print(line, markup=False)
+
+
+@dataclass
+class _PhaseMemory:
+    calls: int = 0
+    allocated: int = 0
+    peak: int = 0
+    enter_stack: List[int] = field(default_factory=list)
+
+
+class _MemoryRecorder:
+    """Record the traced memory of each phase, and a snapshot the first time a phase finished."""
+
+    def __init__(self, output_dir: Path, name: str):
+        self.output_dir = output_dir
+        self.name = name
+        self.phases: Dict[str, _PhaseMemory] = {}
+
+    def __call__(self, phase_name: str, entering: bool):
+        phase = self.phases.setdefault(phase_name, _PhaseMemory())
+        current, _ = tracemalloc.get_traced_memory()
+        if entering:
+            phase.enter_stack.append(current)
+            return
+        start = phase.enter_stack.pop() if phase.enter_stack else current
+        phase.calls += 1
+        phase.allocated += current - start
+        phase.peak = max(phase.peak, current)
+        if phase.calls == 1:
+            tracemalloc.take_snapshot().dump(str(self.output_dir / f"{self.name}-{phase_name}.snapshot"))
+
+
+def _run_memory_profile(func: Callable[[], Any], output_dir: Path, name: str) -> Any:
+    recorder = _MemoryRecorder(output_dir, name)
+    tracemalloc.start(10)
+    start_snapshot = tracemalloc.take_snapshot()
+    add_span_hook(recorder)
+    try:
+        return func()
+    finally:
+        remove_span_hook(recorder)
+        end_snapshot = tracemalloc.take_snapshot()
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        end_snapshot.dump(str(output_dir / f"{name}-end.snapshot"))
+
+        report_lines = [f"Traced peak: {format_bytes(traced_peak)}"]
+        peak_rss = get_peak_rss()
+        if peak_rss is not None:
+            report_lines.append(f"Peak RSS: {format_bytes(peak_rss)}")
+            report_lines.append(f"Peak RSS (child processes): {format_bytes(get_peak_rss(True))}")
+        report_lines.append("")
+        report_lines.append("Phases (net allocated, traced peak):")
+        for phase_name, phase in sorted(recorder.phases.items()):
+            report_lines.append(
+                f"  {phase_name}: {phase.calls} calls, {format_bytes(phase.allocated)}, {format_bytes(phase.peak)}"
+            )
+        report_lines.append("")
+        report_lines.append(f"Top {TOP_COUNT} allocations since start:")
+        for stat in end_snapshot.compare_to(start_snapshot, "lineno")[:TOP_COUNT]:
+            report_lines.append(f"  {stat}")
+
+        report_file = output_dir / f"{name}-mem.txt"
+        report_file.write_text("\n".join(report_lines) + "\n", encoding="utf-8")
+        console.info(f"Memory profile written to {report_file}")
+        for line in report_lines:
+            console.console.print(line, markup=False)
+
+
+def run_profiled(mode: ProfileMode, output_dir: Path, command_name: str, func: Callable[[], Any]) -> Any:
+    """Run the function with the CPU or memory profiler, and write the result to the output directory."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    name = _profile_name(command_name)
+    if mode == ProfileMode.cpu:
+        return _run_cpu_profile(func, output_dir, name)
+    return _run_memory_profile(func, output_dir, name)
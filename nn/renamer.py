@@ -0,0 +1,144 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .file_handler import random_name
+
+__all__ = (
+    "RENAME_JOURNAL",
+    "RenameCollisionError",
+    "RenameJournalError",
+    "RenamePlan",
+    "undo_renames",
+)
+
+RENAME_JOURNAL = ".nn-rename-journal.json"
+
+
+class RenameCollisionError(ValueError):
+    pass
+
+
+class RenameJournalError(Exception):
+    pass
+
+
+class RenamePlan:
+    """
+    A set of renames inside a single folder that is checked and applied at once.
+
+    Every rename is written to a journal file first, so it can be rolled back with
+    :func:`undo_renames` even if the process stopped halfway.
+    Files that would be overwritten by another rename in the plan (chains and cycles)
+    are moved to a temporary name first.
+    """
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self._renames: Dict[str, str] = {}
+
+    def __len__(self):
+        return len(self._renames)
+
+    def add(self, source: Path, target_name: str):
+        if source.parent != self.folder:
+            raise ValueError(f"{source} is not inside {self.folder}")
+        if source.name == target_name:
+            return
+        self._renames[source.name] = target_name
+
+    def check_collisions(self):
+        """Raise :class:`RenameCollisionError` if a rename would overwrite another file."""
+        seen_targets: Dict[str, str] = {}
+        errors: List[str] = []
+        for source, target in self._renames.items():
+            if target in seen_targets:
+                errors.append(f"{source} and {seen_targets[target]} are both renamed to {target}")
+                continue
+            seen_targets[target] = source
+            if target not in self._renames and (self.folder / target).exists():
+                errors.append(f"{source} would overwrite the existing file {target}")
+        if errors:
+            raise RenameCollisionError("Rename collision found:\n" + "\n".join(errors))
+
+    def find_cycles(self) -> List[List[str]]:
+        """Find renames that form a cycle, e.g. a -> b and b -> a."""
+        cycles: List[List[str]] = []
+        visited = set()
+        for start in self._renames:
+            chain: List[str] = []
+            current: Optional[str] = start
+            while current is not None and current not in visited and current not in chain:
+                chain.append(current)
+                current = self._renames.get(current)
+            if current is not None and current in chain:
+                cycles.append(chain[chain.index(current) :])
+            visited.update(chain)
+        return cycles
+
+    def _write_journal(self, entries: List[Dict[str, Optional[str]]], state: str):
+        journal_path = self.folder / RENAME_JOURNAL
+        temp_path = journal_path.with_name(f"{RENAME_JOURNAL}.nntmp")
+        with temp_path.open("w", encoding="utf-8") as fp:
+            json.dump({"state": state, "renames": entries}, fp, indent=4, ensure_ascii=False)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temp_path, journal_path)
+
+    def apply(self, journal: bool = True):
+        """Apply all the renames, call :meth:`check_collisions` first."""
+        if not self._renames:
+            return
+
+        all_targets = set(self._renames.values())
+        entries: List[Dict[str, Optional[str]]] = []
+        for source, target in self._renames.items():
+            temp_name = None
+            # The source is the target of another rename, move it away first.
+            if source in all_targets:
+                temp_name = f".{source}.{random_name()}.nntmp"
+            entries.append({"source": source, "target": target, "temp": temp_name})
+        if journal:
+            self._write_journal(entries, "pending")
+
+        for entry in entries:
+            if entry["temp"] is not None:
+                os.replace(self.folder / entry["source"], self.folder / entry["temp"])
+        if journal:
+            self._write_journal(entries, "renaming")
+        for entry in entries:
+            current = entry["temp"] or entry["source"]
+            os.replace(self.folder / current, self.folder / entry["target"])
+
+        if journal:
+            self._write_journal(entries, "done")
+
+
+def undo_renames(folder: Path) -> int:
+    """Roll back the last :class:`RenamePlan` applied in the folder, return the number of files restored."""
+    journal_path = folder / RENAME_JOURNAL
+    if not journal_path.exists():
+        raise RenameJournalError(f"No rename journal found in {folder}")
+    try:
+        journal_data = json.loads(journal_path.read_text(encoding="utf-8"))
+        entries = journal_data["renames"]
+        state = journal_data["state"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise RenameJournalError(f"Invalid rename journal in {folder}: {exc}")
+
+    undo_plan = RenamePlan(folder)
+    for entry in entries:
+        # The process might be stopped at any point, find where the file is now.
+        # Before the temporary names are done, the target might still be another file.
+        locations = (entry["temp"], entry["source"])
+        if state != "pending":
+            locations = (entry["temp"], entry["target"], entry["source"])
+        for current in locations:
+            if current is not None and (folder / current).exists():
+                undo_plan.add(folder / current, entry["source"])
+                break
+    undo_plan.check_collisions()
+    undo_plan.apply(journal=False)
+    journal_path.unlink()
+    return len(undo_plan)
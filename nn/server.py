@@ -0,0 +1,265 @@
+"""
+Job server of ``nn serve``.
+
+The server keeps the imported commands, the config, the discovered executables and the exiftool
+sessions warm, so a ``nn --client <command>`` job only pays for the work itself.
+The jobs run one after the other inside the server process, with the console, the standard
+output and the working directory of the client. See :mod:`nn.client` for the protocol.
+"""
+
+from __future__ import annotations
+
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+import click
+from rich.markup import escape
+
+from . import config, exiftool, term
+from .client import PROTOCOL_VERSION, encode_message
+
+__all__ = (
+    "UNSUPPORTED_COMMANDS",
+    "ServerAlreadyRunning",
+    "JobServer",
+)
+
+console = term.get_console()
+# Interactive or long-lived commands, they can't run inside the server
+UNSUPPORTED_COMMANDS = ("config", "serve", "watch")
+# The heavy dependencies that are only imported on first use by the commands
+_WARM_MODULES = ("PIL.Image", "numpy", "lxml.etree", "py7zr", "ftfy", "unrar.cffi.rarfile")
+
+
+class ServerAlreadyRunning(RuntimeError):
+    pass
+
+
+class _NoInputError(io.UnsupportedOperation):
+    pass
+
+
+class _NoInput(io.TextIOBase):
+    """Standard input of the jobs, nobody can answer the prompts from the server."""
+
+    def readable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def fileno(self) -> int:
+        raise _NoInputError("the standard input is not available under --client")
+
+    def read(self, size: Optional[int] = -1) -> str:
+        raise _NoInputError("the standard input is not available under --client")
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        raise _NoInputError("the standard input is not available under --client")
+
+
+def _needs_input(exc: BaseException) -> bool:
+    """Whether the job failed because it prompted, the commands wrap the error in UnrecoverableNNError."""
+    exc_info = getattr(exc, "exc_info", None)
+    if exc_info is not None:
+        exc = exc_info[1]
+    while exc is not None:
+        if isinstance(exc, _NoInputError):
+            return True
+        exc = exc.__context__
+    return False
+
+
+class _ConnectionWriter(io.TextIOBase):
+    """Text stream that send everything written to it to the client, as ``output`` messages."""
+
+    encoding = "utf-8"
+
+    def __init__(self, connection_fp: BinaryIO, terminal: bool):
+        self._fp = connection_fp
+        self._terminal = terminal
+        self._lock = threading.Lock()
+        self.connected = True
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._terminal
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        if text:
+            self.send({"output": text})
+        return len(text)
+
+    def send(self, message: Dict[str, Any]):
+        with self._lock:
+            if not self.connected:
+                return
+            try:
+                self._fp.write(encode_message(message))
+                self._fp.flush()
+            except OSError:
+                # The client went away (e.g. Ctrl+C), the job still finish
+                self.connected = False
+
+
+class JobServer:
+    def __init__(self, socket_path: Path):
+        self.socket_path = socket_path
+        self._socket: Optional[socket.socket] = None
+
+    def bind(self):
+        if self.socket_path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.socket_path))
+            except OSError:
+                # Left over by a server that was killed
+                self.socket_path.unlink()
+            else:
+                raise ServerAlreadyRunning(f"A server is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the current user can connect, the jobs run with our permissions
+        previous_umask = os.umask(0o177)
+        try:
+            server_socket.bind(str(self.socket_path))
+        finally:
+            os.umask(previous_umask)
+        server_socket.listen(64)
+        self._socket = server_socket
+
+    def warm_up(self):
+        """Import every command and heavy dependency, read the config and look up the executables."""
+        from .cli.base import test_or_find_exiftool, test_or_find_magick, test_or_find_pingo
+        from .cmd import LAZY_COMMANDS
+        from .cmd import main as nn_main
+
+        with click.Context(nn_main) as ctx:
+            for command_name in LAZY_COMMANDS:
+                nn_main.get_command(ctx, command_name)
+        for module_name in _WARM_MODULES:
+            try:
+                importlib.import_module(module_name)
+            except ImportError:
+                pass
+
+        executables = config.get_config().executables
+        test_or_find_magick(executables.magick_path, False)
+        test_or_find_pingo(executables.pingo_path, False)
+        test_or_find_exiftool(executables.exiftool_path, False)
+        exiftool.enable_sessions()
+
+    def serve_forever(self):
+        if self._socket is None:
+            raise RuntimeError("The server is not bound, call bind() first")
+        while True:
+            connection, _ = self._socket.accept()
+            with connection:
+                try:
+                    self._handle(connection)
+                except OSError as exc:
+                    # The client went away, this should never stop the server
+                    console.warning(f"Lost the connection to the client: {exc}")
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+        exiftool.close_sessions()
+
+    def _handle(self, connection: socket.socket):
+        with connection.makefile("rb") as read_fp, connection.makefile("wb") as write_fp:
+            request_line = read_fp.readline()
+            if not request_line:
+                # Only checking if the server is running
+                return
+            try:
+                request = json.loads(request_line)
+                argv: List[str] = [str(arg) for arg in request["argv"]]
+                cwd = str(request["cwd"])
+                terminal = bool(request.get("terminal", False))
+                width: Optional[int] = request.get("width")
+            except (ValueError, KeyError, TypeError) as exc:
+                writer = _ConnectionWriter(write_fp, False)
+                writer.write(f"nn: invalid request: {exc}\n")
+                writer.send({"exit": 2})
+                return
+
+            writer = _ConnectionWriter(write_fp, terminal)
+            if request.get("version") != PROTOCOL_VERSION:
+                writer.write("nn: the client and the server versions do not match, restart `nn serve`\n")
+                writer.send({"exit": 2})
+                return
+
+            start = time.perf_counter()
+            exit_code = self._run_job(argv, cwd, writer, terminal, width)
+            writer.send({"exit": exit_code})
+            elapsed = (time.perf_counter() - start) * 1000
+            console.info(escape(f"nn {' '.join(argv)} -> {exit_code} ({elapsed:.0f}ms)"))
+
+    def _run_job(
+        self, argv: List[str], cwd: str, writer: _ConnectionWriter, terminal: bool, width: Optional[int]
+    ) -> int:
+        from .cmd import main as nn_main
+
+        if argv and argv[0] in UNSUPPORTED_COMMANDS:
+            writer.write(f"nn: `{argv[0]}` can't be used with --client\n")
+            return 2
+
+        previous_cwd = os.getcwd()
+        try:
+            os.chdir(cwd)
+        except OSError as exc:
+            writer.write(f"nn: can't use the working directory of the client: {exc}\n")
+            return 1
+        # Nobody can answer the prompts, fail them instead of waiting on the server terminal
+        previous_stdin = sys.stdin
+        sys.stdin = _NoInput()
+        try:
+            with console.redirect(writer, force_terminal=terminal, width=width):
+                with redirect_stdout(writer), redirect_stderr(writer):
+                    try:
+                        result = nn_main.main(
+                            args=argv, prog_name="nn", standalone_mode=False, obj={"SERVER_JOB": True}
+                        )
+                    except click.Abort:
+                        writer.write("Aborted!\n")
+                        return 1
+                    except Exception as exc:
+                        if _needs_input(exc):
+                            writer.write(
+                                f"nn: `{argv[0]}` needs to ask for input, which is not possible with --client. "
+                                "Give everything with the options (e.g. --spec), or run it without --client\n"
+                            )
+                            return 1
+                        if isinstance(exc, click.ClickException):
+                            exc.show()
+                            return exc.exit_code
+                        traceback.print_exc()
+                        return 1
+        finally:
+            sys.stdin = previous_stdin
+            os.chdir(previous_cwd)
+        # The commands return 1 when they failed, give it to the scripts
+        return result if isinstance(result, int) else 0
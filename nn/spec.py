@@ -0,0 +1,159 @@
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .common import (
+    ChapterRange,
+    ChapterRangeIndex,
+    int_or_float,
+    parse_ch_ranges,
+    safe_int,
+    validate_ch_ranges,
+)
+
+__all__ = (
+    "ReleaseSpec",
+    "SpecError",
+    "load_release_spec",
+)
+
+
+class SpecError(ValueError):
+    pass
+
+
+@dataclass
+class ReleaseSpec:
+    """
+    Non-interactive information for the `releases` and `manualsplit` commands.
+
+    Example (YAML)::
+
+        volume: 1
+        regex: "p(?:([\\d]{1,4})(?:-)?([\\d]{1,4})?).*"  # manualsplit only
+        chapters:
+          - number: 1
+            range: 1-20
+            title: The Beginning
+          - number: 1.5
+            range: 21  # open-ended, until the next chapter
+        special_naming:  # releases only, page number -> page type
+          1: Cover
+        custom_pages:  # manualsplit only, filename match -> page number
+          cover.jpg: 0
+    """
+
+    chapters: ChapterRangeIndex
+    special_naming: Dict[int, str] = field(default_factory=dict)
+    custom_pages: Dict[str, int] = field(default_factory=dict)
+    regex: Optional[str] = None
+    volume: Optional[int] = None
+
+
+def _read_spec_data(spec_file: Path) -> Any:
+    contents = spec_file.read_text(encoding="utf-8")
+    if spec_file.suffix.lower() in (".yml", ".yaml"):
+        try:
+            import yaml
+        except ImportError:
+            raise SpecError("PyYAML is required to read YAML spec file, please install it or use JSON instead")
+        try:
+            return yaml.safe_load(contents)
+        except yaml.YAMLError as exc:
+            raise SpecError(f"Failed to parse YAML spec file: {exc}")
+    try:
+        return json.loads(contents)
+    except json.JSONDecodeError as exc:
+        raise SpecError(f"Failed to parse JSON spec file: {exc}")
+
+
+def _parse_chapters(chapters: Any) -> ChapterRangeIndex:
+    if not isinstance(chapters, list) or not chapters:
+        raise SpecError("`chapters` must be a non-empty list")
+
+    chapter_index = ChapterRangeIndex()
+    for idx, chapter in enumerate(chapters):
+        if not isinstance(chapter, dict):
+            raise SpecError(f"`chapters[{idx}]` must be a dict")
+
+        number = int_or_float(str(chapter.get("number", "")))
+        if number is None:
+            raise SpecError(f"`chapters[{idx}].number` must be an integer or floating number")
+
+        ch_range = str(chapter.get("range", "")).strip()
+        if not validate_ch_ranges(ch_range):
+            raise SpecError(f"`chapters[{idx}].range` must be a page range (x-y with x <= y, or x)")
+        actual_ranges, is_single = parse_ch_ranges(ch_range)
+
+        title = chapter.get("title")
+        if title is not None and (not isinstance(title, str) or not title.strip()):
+            raise SpecError(f"`chapters[{idx}].title` must be a non-empty string")
+
+        try:
+            chapter_index.add(ChapterRange(number, title, actual_ranges, is_single))
+        except ValueError as exc:
+            # Overlapping or empty page range
+            raise SpecError(f"`chapters[{idx}]`: {exc}")
+    return chapter_index
+
+
+def _parse_special_naming(special_naming: Any) -> Dict[int, str]:
+    if not isinstance(special_naming, dict):
+        raise SpecError("`special_naming` must be a dict of page number to page type")
+
+    parsed: Dict[int, str] = {}
+    for page, data in special_naming.items():
+        page_number = safe_int(str(page))
+        if page_number is None:
+            raise SpecError(f"`special_naming` key {page!r} must be a page number")
+        if not isinstance(data, str) or not data.strip():
+            raise SpecError(f"`special_naming.{page}` must be a non-empty string")
+        parsed[page_number] = data
+    return parsed
+
+
+def _parse_custom_pages(custom_pages: Any) -> Dict[str, int]:
+    if not isinstance(custom_pages, dict):
+        raise SpecError("`custom_pages` must be a dict of filename match to page number")
+
+    parsed: Dict[str, int] = {}
+    for file_name, page in custom_pages.items():
+        page_number = safe_int(str(page))
+        if page_number is None:
+            raise SpecError(f"`custom_pages.{file_name}` must be a page number")
+        if not str(file_name).strip():
+            raise SpecError("`custom_pages` filename match cannot be empty")
+        parsed[str(file_name)] = page_number
+    return parsed
+
+
+def load_release_spec(spec_file: Path) -> ReleaseSpec:
+    data = _read_spec_data(spec_file)
+    if not isinstance(data, dict):
+        raise SpecError("Spec file must contain a mapping at the top level")
+
+    spec = ReleaseSpec(chapters=_parse_chapters(data.get("chapters")))
+    if data.get("special_naming") is not None:
+        spec.special_naming = _parse_special_naming(data["special_naming"])
+    if data.get("custom_pages") is not None:
+        spec.custom_pages = _parse_custom_pages(data["custom_pages"])
+
+    regex = data.get("regex")
+    if regex is not None:
+        if not isinstance(regex, str):
+            raise SpecError("`regex` must be a string")
+        try:
+            re.compile(regex)
+        except re.error as exc:
+            raise SpecError(f"`regex` is not a valid regex: {exc}")
+    spec.regex = regex
+
+    volume = data.get("volume")
+    if volume is not None:
+        volume = safe_int(str(volume))
+        if volume is None:
+            raise SpecError("`volume` must be an integer")
+    spec.volume = volume
+    return spec
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .utils import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+else:
+    np = lazy_import("numpy")
+    Image = lazy_import("PIL.Image")
+
+__all__ = (
+    "SpreadsBackend",
+    "SplitOffset",
+    "PageEdges",
+    "SpreadCandidate",
+    "join_spread",
+    "split_spread",
+    "find_gutter",
+    "find_gutter_offset",
+    "load_page_edges",
+    "score_spread",
+    "detect_spreads",
+)
+# How much the gutter search prefers columns near the center
+_GUTTER_CENTER_BIAS = 0.25
+# Maximum downscale used when decoding JPEG in draft mode
+_DRAFT_SCALE = 4
+# An edge with less deviation than this is considered blank (e.g. white margin)
+_BLANK_EDGE_STD = 2.0
+
+
+class SpreadsBackend(str, Enum):
+    pillow = "pillow"
+    magick = "magick"
+
+
+@dataclass
+class SplitOffset:
+    width: int
+    offset: int
+
+    @property
+    def center_delta(self) -> int:
+        return self.offset - self.width // 2
+
+
+def _load_image(image_path: Path) -> Image.Image:
+    with Image.open(image_path) as im:
+        im.load()
+    if im.mode in ("RGB", "RGBA", "L"):
+        return im
+    if im.mode in ("LA", "PA") or "transparency" in im.info:
+        return im.convert("RGBA")
+    return im.convert("RGB")
+
+
+def _common_mode(images: List[Image.Image]) -> str:
+    modes = {im.mode for im in images}
+    if "RGBA" in modes:
+        return "RGBA"
+    if modes == {"L"}:
+        return "L"
+    return "RGB"
+
+
+def _save_image(im: Image.Image, output_path: Path, quality: float):
+    temp_path = output_path.with_name(f".{output_path.name}.nntmp")
+    if output_path.suffix.lower() == ".png":
+        # Follow magick, which use the tens digit of the quality as the zlib level
+        im.save(temp_path, "PNG", compress_level=min(9, int(quality) // 10))
+    else:
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        # Follow magick, which does not subsample the chroma for quality 90 or above
+        im.save(temp_path, "JPEG", quality=round(quality), subsampling=0 if quality >= 90 else 2, optimize=True)
+    os.replace(temp_path, output_path)
+
+
+def join_spread(input_paths: List[Path], output_path: Path, quality: float) -> Path:
+    """Join the images horizontally (from left to right), the same as magick `+append`."""
+    images = [_load_image(image_path) for image_path in input_paths]
+    mode = _common_mode(images)
+    arrays = [np.asarray(im if im.mode == mode else im.convert(mode)) for im in images]
+
+    height = max(array.shape[0] for array in arrays)
+    width = sum(array.shape[1] for array in arrays)
+    canvas_shape = (height, width) if mode == "L" else (height, width, len(mode))
+    # Smaller images are aligned to the top, with white background like magick.
+    canvas = np.full(canvas_shape, 255, dtype=np.uint8)
+    offset = 0
+    for array in arrays:
+        canvas[: array.shape[0], offset : offset + array.shape[1]] = array
+        offset += array.shape[1]
+
+    _save_image(Image.fromarray(canvas, mode), output_path, quality)
+    return output_path
+
+
+def find_gutter(im: Image.Image, window: float = 0.0, sample_width: int = 512) -> int:
+    """Find the column where the spread should be splitted.
+
+    The gutter is the most uniform column (lowest variance) inside the window around the center,
+    the window is the fraction of the width searched on each side. The center is used when
+    no column stands out, e.g. when the art continues through the gutter.
+    """
+    width = im.width
+    middle = width // 2
+    if window <= 0:
+        return middle
+
+    gray = im.convert("L")
+    if gray.width > sample_width:
+        gray = gray.resize((sample_width, max(1, round(gray.height * sample_width / gray.width))), Image.BILINEAR)
+    pixels = np.asarray(gray, dtype=np.float32)
+    sample_count = pixels.shape[1]
+    center = sample_count / 2
+    half_window = max(1, round(sample_count * window))
+    start = max(1, int(center) - half_window)
+    end = min(sample_count - 1, int(center) + half_window + 1)
+    if end - start < 3:
+        return middle
+
+    raw_std = pixels[:, start:end].std(axis=0)
+    column_std = np.convolve(raw_std, np.ones(3) / 3, mode="same")
+    distance = np.abs(np.arange(start, end) + 0.5 - center) / half_window
+    cost = column_std * (1.0 + _GUTTER_CENTER_BIAS * distance)
+    best = int(np.argmin(cost))
+    if column_std[best] >= 0.5 * float(np.median(column_std)):
+        return middle
+
+    # The gutter is usually wider than a column, use the middle of it.
+    is_gutter = raw_std <= raw_std[best] + max(2.0, 0.1 * float(np.median(raw_std)))
+    left = best
+    while left > 0 and is_gutter[left - 1]:
+        left -= 1
+    right = best
+    while right < len(is_gutter) - 1 and is_gutter[right + 1]:
+        right += 1
+    gutter = start + (left + right + 1) / 2
+    return min(width - 1, max(1, round(gutter * width / sample_count)))
+
+
+def find_gutter_offset(image_path: Path, window: float = 0.0) -> SplitOffset:
+    with Image.open(image_path) as im:
+        if window <= 0:
+            return SplitOffset(im.width, im.width // 2)
+        return SplitOffset(im.width, find_gutter(im, window))
+
+
+def split_spread(
+    input_path: Path, output_paths: Tuple[Path, Path], quality: float, gutter_window: float = 0.0
+) -> SplitOffset:
+    """Split the image horizontally at the gutter, and return the width and the column used.
+
+    With no gutter window this is the same as magick `-crop 50%x100%`.
+    """
+    im = _load_image(input_path)
+    offset = find_gutter(im, gutter_window)
+    array = np.asarray(im)
+    left_path, right_path = output_paths
+    _save_image(Image.fromarray(array[:, :offset], im.mode), left_path, quality)
+    _save_image(Image.fromarray(array[:, offset:], im.mode), right_path, quality)
+    return SplitOffset(im.width, offset)
+
+
+@dataclass
+class PageEdges:
+    left: np.ndarray
+    right: np.ndarray
+    aspect: float
+
+
+@dataclass
+class SpreadCandidate:
+    first: int
+    second: int
+    score: float
+
+
+def load_page_edges(image_path: Path, sample_height: int = 256) -> PageEdges:
+    """Load the left and right edge profiles of a grayscale version of the image.
+
+    Only the height is downscaled, since the edge columns need to stay next to the gutter.
+    """
+    with Image.open(image_path) as im:
+        width, height = im.size
+        # JPEG can be decoded directly at a reduced scale, which is a lot faster
+        im.draft("L", (width // _DRAFT_SCALE, height // _DRAFT_SCALE))
+        gray = im.convert("L")
+    edges = []
+    # Only the outermost column, the next ones are already further from the other page
+    for box in ((0, 0, 1, gray.height), (gray.width - 1, 0, gray.width, gray.height)):
+        strip = gray.crop(box).resize((1, sample_height), Image.BILINEAR)
+        edges.append(np.asarray(strip, dtype=np.float32)[:, 0])
+    return PageEdges(edges[0], edges[1], width / height)
+
+
+def score_spread(left_page: PageEdges, right_page: PageEdges) -> float:
+    """Score how likely the two pages are two halves of the same spread, from 0 to 1.
+
+    The right edge of the left page is compared with the left edge of the right page,
+    since a spread should continue seamlessly through the gutter.
+    """
+    left_edge = left_page.right
+    right_edge = right_page.left
+    if left_edge.std() < _BLANK_EDGE_STD or right_edge.std() < _BLANK_EDGE_STD:
+        return 0.0
+    correlation = float(np.corrcoef(left_edge, right_edge)[0, 1])
+    if correlation <= 0:
+        return 0.0
+    continuity = 1.0 - float(np.abs(left_edge - right_edge).mean()) / 255.0
+    aspect_match = min(left_page.aspect, right_page.aspect) / max(left_page.aspect, right_page.aspect)
+    return correlation * continuity * aspect_match
+
+
+def detect_spreads(
+    pages: Dict[int, Path], reverse: bool = False, threshold: float = 0.5, max_workers: Optional[int] = None
+) -> List[SpreadCandidate]:
+    """Find the consecutive pages that look like a spread.
+
+    Each page will only be part of one spread, the best scoring candidate wins.
+    """
+    page_numbers = sorted(pages.keys())
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        all_edges = dict(zip(page_numbers, executor.map(load_page_edges, [pages[x] for x in page_numbers])))
+
+    candidates: List[SpreadCandidate] = []
+    for first, second in zip(page_numbers, page_numbers[1:]):
+        if second != first + 1:
+            continue
+        first_edges = all_edges[first]
+        second_edges = all_edges[second]
+        # Page that is already landscape is most likely already a spread
+        if first_edges.aspect > 1 or second_edges.aspect > 1:
+            continue
+        if reverse:
+            score = score_spread(second_edges, first_edges)
+        else:
+            score = score_spread(first_edges, second_edges)
+        if score >= threshold:
+            candidates.append(SpreadCandidate(first, second, score))
+
+    selected: List[SpreadCandidate] = []
+    used_pages = set()
+    for candidate in sorted(candidates, key=lambda x: x.score, reverse=True):
+        if candidate.first in used_pages or candidate.second in used_pages:
+            continue
+        used_pages.update((candidate.first, candidate.second))
+        selected.append(candidate)
+    selected.sort(key=lambda x: x.first)
+    return selected
@@ -1,243 +1,362 @@
-import time
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Callable, List, Optional, Union, overload
-
-import inquirer
-from rich.console import Console as RichConsole
-from rich.theme import Theme as RichTheme
-
-if TYPE_CHECKING:
-    from rich.status import Status as RichStatus
-
-__all__ = ("get_console", "ConsoleChoice")
-
-rich_theme = RichTheme(
-    {
-        "success": "green bold",
-        "warning": "yellow bold",
-        "error": "red bold",
-        "highlight": "magenta bold",
-        "info": "cyan bold",
-    }
-)
-AnyType = Union[str, bytes, int, float]
-ValidateFunc = Callable[[str], bool]
-ValidationType = Union[ValidateFunc, str]
-
-
-@dataclass
-class ConsoleChoice:
-    name: str
-    value: Optional[str] = None
-
-    def __post_init__(self):
-        self.value = self.value or self.name
-
-
-class Console:
-    def __init__(self, debug_mode: bool = False):
-        self.__debug_mode = debug_mode
-        self.console = RichConsole(highlight=False, theme=rich_theme, soft_wrap=True)
-        self._status: Optional["RichStatus"] = None
-        self.__last_known_status: Optional[str] = None
-
-    def enable_debug(self):
-        self.__debug_mode = True
-
-    def disable_debug(self):
-        self.__debug_mode = False
-
-    def __wrap_theme(self, text: str, theme: str):
-        if self.__debug_mode:
-            return f"[{text}]"
-        return f"[[{theme}]{text}[/{theme}]]"
-
-    def info(self, *args, **kwargs):
-        self.console.print(self.__wrap_theme("INFO", "info"), *args, **kwargs)
-
-    def warning(self, *args, **kwargs):
-        self.console.print(self.__wrap_theme("WARN", "warning"), *args, **kwargs)
-
-    def error(self, *args, **kwargs):
-        self.console.print(self.__wrap_theme("ERROR", "error"), *args, **kwargs)
-
-    def __beautiful_status(self, message: str, **kwargs_spinner_style):
-        if not self._status:
-            default = {}
-            if self.is_advanced():
-                default = {"spinner": "dots"}
-            else:
-                default = {"spinner": "line", "refresh_per_second": 6}
-            st_args = {**default, **kwargs_spinner_style}
-
-            self._status = self.console.status(message, **st_args)
-            self._status.start()
-        else:
-            self._status.update(message, **kwargs_spinner_style)
-
-    def __debug_status(self, message: str):
-        self.console.print(message + "\r", end="")
-
-    def status(self, message: str, **kwargs_spinner_style):
-        self.__last_known_status = message
-        if not self.__debug_mode:
-            self.__beautiful_status(message, **kwargs_spinner_style)
-        else:
-            self.__debug_status(message)
-
-    @overload
-    def stop_status(self) -> None:
-        ...
-
-    @overload
-    def stop_status(self, final_text: str) -> None:
-        ...
-
-    def stop_status(self, final_text: Optional[str] = None) -> None:
-        final_text = final_text or self.__last_known_status
-        if self._status:
-            if final_text is not None:
-                self._status.update(final_text)
-            self._status.stop()
-            self._status = None
-            if final_text is not None:
-                self.info(final_text)
-        elif self.__debug_mode:
-            if final_text is not None:
-                self.__debug_status(final_text)
-            self.console.print()
-
-    def log(self, *args, **kwargs):
-        if self.__debug_mode:
-            self.console.log(self.__wrap_theme("LOG", "highlight"), *args, **kwargs)
-
-    def sleep(self, duration: int):
-        time.sleep(duration)
-
-    def is_advanced(self):
-        return not self.console.legacy_windows
-
-    @overload
-    def choice(
-        self,
-        message: Optional[str] = ...,
-        choices: List[AnyType] = ...,
-        default: Optional[Union[AnyType, ConsoleChoice]] = ...,
-    ) -> str:
-        ...
-
-    @overload
-    def choice(
-        self,
-        message: Optional[str] = ...,
-        choices: List[ConsoleChoice] = ...,
-        default: Optional[Union[AnyType, ConsoleChoice]] = ...,
-    ) -> ConsoleChoice:
-        ...
-
-    def choice(
-        self,
-        message: Optional[str] = None,
-        choices: Union[List[AnyType], List[ConsoleChoice]] = [],
-        default: Optional[Union[AnyType, ConsoleChoice]] = None,
-    ) -> Union[AnyType, ConsoleChoice]:
-        if not choices:
-            raise ValueError("No choices provided")
-        message = message or "Please choose an option"
-        console_choice = []
-        any_cchoice = False
-        for choice in choices:
-            if isinstance(choice, ConsoleChoice):
-                console_choice.append(choice.value)
-                any_cchoice = True
-            else:
-                console_choice.append(choice)
-        default_val = None
-        if isinstance(default, ConsoleChoice):
-            default_val = default.value
-        else:
-            default_val = default
-        answers = inquirer.list_input(message, choices=console_choice, default=default_val)
-        if any_cchoice:
-            return choices[console_choice.index(answers)]
-        return answers
-
-    @overload
-    def inquire(
-        self,
-        prompt: str,
-        validation: ValidateFunc = ...,
-        default: Optional[AnyType] = ...,
-    ) -> AnyType:
-        ...
-
-    @overload
-    def inquire(
-        self,
-        prompt: str,
-        validation: str = ...,
-        default: Optional[AnyType] = ...,
-    ) -> AnyType:
-        ...
-
-    def _internal_validation(self, text_input: str, validation: ValidateFunc):
-        try:
-            is_valid = validation(text_input)
-            return bool(is_valid)  # Coerce None to bool to avoid error
-        except Exception:
-            return False
-
-    def inquire(
-        self, prompt: str, validation: Optional[ValidateFunc] = None, default: Optional[AnyType] = None
-    ) -> AnyType:
-        # Custom inquirer
-        inquired_text = default
-        while True:
-            print_this = f"{self.__wrap_theme('?', 'warning')} {prompt}"
-            if default is not None:
-                print_this += f" [default: {default}]"
-            input_temp = self.console.input(print_this + ": ")
-            if not input_temp and default is not None:
-                # Ignore validation
-                break
-
-            if validation is not None:
-                if self._internal_validation(input_temp, validation):
-                    inquired_text = input_temp
-                    break
-                else:
-                    # Show error temporary and ask again
-                    error_text = input_temp or "[No Input]"
-                    self.console.print(
-                        f"{self.__wrap_theme('ERROR', 'error')} Failed to validate input:",
-                        error_text,
-                    )
-                    continue
-            inquired_text = input_temp or ""
-            break
-
-        return inquired_text
-
-    def confirm(self, prompt: Optional[str] = None) -> bool:
-        prompt = prompt or "Are you sure?"
-        return inquirer.confirm(prompt, default=False)
-
-    def enter(self):
-        self.console.print()
-
-    # Aliases
-    warn = warning
-    verbose = log
-    debug = log
-    i = info
-    w = warning
-    e = error
-    d = log
-    v = log
-
-
-ROOT_CONSOLE = Console()
-
-
-def get_console():
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, TextIO, Union, overload
+
+from rich.console import Console as RichConsole
+from rich.theme import Theme as RichTheme
+
+if TYPE_CHECKING:
+    from rich.status import Status as RichStatus
+
+__all__ = ("get_console", "ConsoleChoice", "ConsoleProgress")
+
+rich_theme = RichTheme(
+    {
+        "success": "green bold",
+        "warning": "yellow bold",
+        "error": "red bold",
+        "highlight": "magenta bold",
+        "info": "cyan bold",
+    }
+)
+AnyType = Union[str, bytes, int, float]
+ValidateFunc = Callable[[str], bool]
+ValidationType = Union[ValidateFunc, str]
+
+
+@dataclass
+class ConsoleChoice:
+    name: str
+    value: Optional[str] = None
+
+    def __post_init__(self):
+        self.value = self.value or self.name
+
+
+def _format_eta(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class ConsoleProgress:
+    """
+    Progress for the hot loop, counting items and bytes.
+
+    :meth:`advance` only adds to the counters, the status is rendered from a background
+    thread at most ``refresh_per_second`` times, with the speed and ETA.
+    """
+
+    def __init__(
+        self,
+        console: "Console",
+        message: str,
+        total: Optional[int] = None,
+        unit: str = "pages",
+        refresh_per_second: float = 4,
+    ):
+        self.console = console
+        self.message = message
+        self.total = total
+        self.unit = unit
+        self.count = 0
+        self.size = 0
+        self._interval = 1.0 / max(0.1, refresh_per_second)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_time = time.perf_counter()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def advance(self, count: int = 1, size: int = 0, total: Optional[int] = None):
+        with self._lock:
+            self.count += count
+            self.size += size
+            if total is not None:
+                self.total = total
+
+    def render(self) -> str:
+        elapsed = max(time.perf_counter() - self._start_time, 1e-9)
+        with self._lock:
+            count, size, total = self.count, self.size, self.total
+        text = f"{self.message} ({count}/{total if total is not None else '???'})"
+        if count < 1:
+            return text
+        rate = count / elapsed
+        text += f" - {rate:.1f} {self.unit}/s"
+        if size > 0:
+            text += f", {size / elapsed / 1000 / 1000:.1f} MB/s"
+        if total is not None and total >= count:
+            text += f", ETA {_format_eta((total - count) / rate)}"
+        return text
+
+    def _refresh_loop(self):
+        while not self._stopped.wait(self._interval):
+            self.console.status(self.render())
+
+    def start(self) -> "ConsoleProgress":
+        self._start_time = time.perf_counter()
+        self.console.status(self.render())
+        self._thread = threading.Thread(target=self._refresh_loop, name="nn-progress", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, final_text: Optional[str] = None):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if final_text is None:
+            elapsed = time.perf_counter() - self._start_time
+            final_text = f"{self.message} ({self.count}/{self.total or self.count}) in {elapsed:.2f}s"
+            if self.count > 0 and elapsed > 0:
+                final_text += f" - {self.count / elapsed:.1f} {self.unit}/s"
+                if self.size > 0:
+                    final_text += f", {self.size / elapsed / 1000 / 1000:.1f} MB/s"
+        self.console.stop_status(final_text)
+
+
+class Console:
+    def __init__(self, debug_mode: bool = False):
+        self.__debug_mode = debug_mode
+        self.console = RichConsole(highlight=False, theme=rich_theme, soft_wrap=True)
+        self._status: Optional["RichStatus"] = None
+        self.__last_known_status: Optional[str] = None
+
+    def enable_debug(self):
+        self.__debug_mode = True
+
+    @contextmanager
+    def redirect(
+        self, file: TextIO, force_terminal: Optional[bool] = None, width: Optional[int] = None
+    ) -> Iterator["Console"]:
+        """Print to another file inside the `with` block, e.g. the connection of a `nn --client` job."""
+        self.stop_status()
+        previous = self.console
+        self.console = RichConsole(
+            highlight=False, theme=rich_theme, soft_wrap=True, file=file, force_terminal=force_terminal, width=width
+        )
+        try:
+            yield self
+        finally:
+            self.stop_status()
+            self.console = previous
+
+    def disable_debug(self):
+        self.__debug_mode = False
+
+    def __wrap_theme(self, text: str, theme: str):
+        if self.__debug_mode:
+            return f"[{text}]"
+        return f"[[{theme}]{text}[/{theme}]]"
+
+    def info(self, *args, **kwargs):
+        self.console.print(self.__wrap_theme("INFO", "info"), *args, **kwargs)
+
+    def warning(self, *args, **kwargs):
+        self.console.print(self.__wrap_theme("WARN", "warning"), *args, **kwargs)
+
+    def error(self, *args, **kwargs):
+        self.console.print(self.__wrap_theme("ERROR", "error"), *args, **kwargs)
+
+    def __beautiful_status(self, message: str, **kwargs_spinner_style):
+        if not self._status:
+            default = {}
+            if self.is_advanced():
+                default = {"spinner": "dots"}
+            else:
+                default = {"spinner": "line", "refresh_per_second": 6}
+            st_args = {**default, **kwargs_spinner_style}
+
+            self._status = self.console.status(message, **st_args)
+            self._status.start()
+        else:
+            self._status.update(message, **kwargs_spinner_style)
+
+    def __debug_status(self, message: str):
+        self.console.print(message + "\r", end="")
+
+    def status(self, message: str, **kwargs_spinner_style):
+        self.__last_known_status = message
+        if not self.__debug_mode:
+            self.__beautiful_status(message, **kwargs_spinner_style)
+        else:
+            self.__debug_status(message)
+
+    @overload
+    def stop_status(self) -> None:
+        ...
+
+    @overload
+    def stop_status(self, final_text: str) -> None:
+        ...
+
+    def stop_status(self, final_text: Optional[str] = None) -> None:
+        final_text = final_text or self.__last_known_status
+        if self._status:
+            if final_text is not None:
+                self._status.update(final_text)
+            self._status.stop()
+            self._status = None
+            if final_text is not None:
+                self.info(final_text)
+        elif self.__debug_mode:
+            if final_text is not None:
+                self.__debug_status(final_text)
+            self.console.print()
+
+    def progress(
+        self, message: str, total: Optional[int] = None, unit: str = "pages", refresh_per_second: float = 4
+    ) -> ConsoleProgress:
+        """Create a rate-limited progress, use it as a context manager or call `start` and `stop`."""
+        return ConsoleProgress(self, message, total, unit, refresh_per_second)
+
+    def log(self, *args, **kwargs):
+        if self.__debug_mode:
+            self.console.log(self.__wrap_theme("LOG", "highlight"), *args, **kwargs)
+
+    def sleep(self, duration: int):
+        time.sleep(duration)
+
+    def is_advanced(self):
+        return not self.console.legacy_windows
+
+    @overload
+    def choice(
+        self,
+        message: Optional[str] = ...,
+        choices: List[AnyType] = ...,
+        default: Optional[Union[AnyType, ConsoleChoice]] = ...,
+    ) -> str:
+        ...
+
+    @overload
+    def choice(
+        self,
+        message: Optional[str] = ...,
+        choices: List[ConsoleChoice] = ...,
+        default: Optional[Union[AnyType, ConsoleChoice]] = ...,
+    ) -> ConsoleChoice:
+        ...
+
+    def choice(
+        self,
+        message: Optional[str] = None,
+        choices: Union[List[AnyType], List[ConsoleChoice]] = [],
+        default: Optional[Union[AnyType, ConsoleChoice]] = None,
+    ) -> Union[AnyType, ConsoleChoice]:
+        if not choices:
+            raise ValueError("No choices provided")
+        message = message or "Please choose an option"
+        console_choice = []
+        any_cchoice = False
+        for choice in choices:
+            if isinstance(choice, ConsoleChoice):
+                console_choice.append(choice.value)
+                any_cchoice = True
+            else:
+                console_choice.append(choice)
+        default_val = None
+        if isinstance(default, ConsoleChoice):
+            default_val = default.value
+        else:
+            default_val = default
+        import inquirer
+
+        answers = inquirer.list_input(message, choices=console_choice, default=default_val)
+        if any_cchoice:
+            return choices[console_choice.index(answers)]
+        return answers
+
+    @overload
+    def inquire(
+        self,
+        prompt: str,
+        validation: ValidateFunc = ...,
+        default: Optional[AnyType] = ...,
+    ) -> AnyType:
+        ...
+
+    @overload
+    def inquire(
+        self,
+        prompt: str,
+        validation: str = ...,
+        default: Optional[AnyType] = ...,
+    ) -> AnyType:
+        ...
+
+    def _internal_validation(self, text_input: str, validation: ValidateFunc):
+        try:
+            is_valid = validation(text_input)
+            return bool(is_valid)  # Coerce None to bool to avoid error
+        except Exception:
+            return False
+
+    def inquire(
+        self, prompt: str, validation: Optional[ValidateFunc] = None, default: Optional[AnyType] = None
+    ) -> AnyType:
+        # Custom inquirer
+        inquired_text = default
+        while True:
+            print_this = f"{self.__wrap_theme('?', 'warning')} {prompt}"
+            if default is not None:
+                print_this += f" [default: {default}]"
+            input_temp = self.console.input(print_this + ": ")
+            if not input_temp and default is not None:
+                # Ignore validation
+                break
+
+            if validation is not None:
+                if self._internal_validation(input_temp, validation):
+                    inquired_text = input_temp
+                    break
+                else:
+                    # Show error temporary and ask again
+                    error_text = input_temp or "[No Input]"
+                    self.console.print(
+                        f"{self.__wrap_theme('ERROR', 'error')} Failed to validate input:",
+                        error_text,
+                    )
+                    continue
+            inquired_text = input_temp or ""
+            break
+
+        return inquired_text
+
+    def confirm(self, prompt: Optional[str] = None) -> bool:
+        prompt = prompt or "Are you sure?"
+        import inquirer
+
+        return inquirer.confirm(prompt, default=False)
+
+    def enter(self):
+        self.console.print()
+
+    # Aliases
+    warn = warning
+    verbose = log
+    debug = log
+    i = info
+    w = warning
+    e = error
+    d = log
+    v = log
+
+
+ROOT_CONSOLE = Console()
+
+
+def get_console():
     return ROOT_CONSOLE
\ No newline at end of file
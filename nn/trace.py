@@ -0,0 +1,190 @@
+import functools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO, TypeVar
+
+__all__ = (
+    "span",
+    "traced",
+    "enable_tracing",
+    "is_tracing",
+    "write_trace",
+    "add_span_hook",
+    "remove_span_hook",
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+# Called with the span name and True when entering, False when leaving
+SpanHook = Callable[[str, bool], None]
+# Inherited by the worker processes, so they also record their spans
+_TRACE_DIR_ENV = "NN_TRACE_DIR"
+
+_lock = threading.Lock()
+_events: List[Dict[str, Any]] = []
+_trace_dir: Optional[str] = os.environ.get(_TRACE_DIR_ENV)
+_owner_pid: Optional[int] = None
+_worker_file: Optional[TextIO] = None
+_span_hooks: List[SpanHook] = []
+
+
+def _record(event: Dict[str, Any]):
+    global _worker_file
+
+    if os.getpid() == _owner_pid:
+        with _lock:
+            _events.append(event)
+        return
+
+    # Worker process, the events are written to a file per process and merged by the owner.
+    with _lock:
+        if _worker_file is None:
+            _worker_file = open(os.path.join(_trace_dir, f"{os.getpid()}.jsonl"), "a", encoding="utf-8", buffering=1)
+        _worker_file.write(json.dumps(event) + "\n")
+
+
+class _Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name: str, category: str, args: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        for hook in _span_hooks:
+            hook(self.name, True)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        end = time.perf_counter_ns()
+        for hook in _span_hooks:
+            hook(self.name, False)
+        if _trace_dir is None:
+            return
+        event = {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": self.start / 1000,
+            "dur": (end - self.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if self.args:
+            event["args"] = {key: str(value) for key, value in self.args.items()}
+        _record(event)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def is_tracing() -> bool:
+    return _trace_dir is not None
+
+
+def span(name: str, category: str = "nn", **args: Any):
+    """Record the time spent inside the `with` block as a named phase.
+
+    This does nothing unless tracing is enabled, so it is cheap enough for the per-page loops.
+    """
+    if _trace_dir is None and not _span_hooks:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name: Optional[str] = None, category: str = "nn") -> Callable[[F], F]:
+    """Decorator version of :func:`span`, default to the function name."""
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def add_span_hook(hook: SpanHook):
+    """Call the hook every time a span is entered or left, used by the memory profiler."""
+    _span_hooks.append(hook)
+
+
+def remove_span_hook(hook: SpanHook):
+    if hook in _span_hooks:
+        _span_hooks.remove(hook)
+
+
+def enable_tracing():
+    """Start recording spans in this process and every worker process started after this."""
+    global _trace_dir, _owner_pid
+
+    if _owner_pid == os.getpid():
+        return
+    _trace_dir = tempfile.mkdtemp(prefix="nn-trace-")
+    _owner_pid = os.getpid()
+    os.environ[_TRACE_DIR_ENV] = _trace_dir
+
+
+def write_trace(output: Path) -> int:
+    """Write all the recorded spans in the Chrome trace format, return the number of spans.
+
+    The file can be opened with `chrome://tracing` or https://ui.perfetto.dev
+    """
+    global _trace_dir, _owner_pid
+
+    if _trace_dir is None or _owner_pid != os.getpid():
+        return 0
+
+    with _lock:
+        all_events = list(_events)
+        _events.clear()
+    for worker_trace in sorted(Path(_trace_dir).glob("*.jsonl")):
+        with worker_trace.open("r", encoding="utf-8") as fp:
+            for line in fp:
+                line = line.strip()
+                if line:
+                    all_events.append(json.loads(line))
+    shutil.rmtree(_trace_dir, ignore_errors=True)
+    os.environ.pop(_TRACE_DIR_ENV, None)
+    owner_pid = _owner_pid
+    _trace_dir = None
+    # Can be enabled again, e.g. by the next job of `nn serve`
+    _owner_pid = None
+
+    span_count = len(all_events)
+    process_names = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {"name": "nn" if pid == owner_pid else f"nn worker ({pid})"},
+        }
+        for pid in sorted({event["pid"] for event in all_events} | {owner_pid})
+    ]
+    all_events.sort(key=lambda x: x["ts"])
+    with output.open("w", encoding="utf-8") as fp:
+        json.dump({"traceEvents": process_names + all_events, "displayTimeUnit": "ms"}, fp)
+    return span_count
@@ -1,81 +1,140 @@
-import re
-from typing import Optional, Union
-
-__all__ = (
-    "secure_filename",
-    "clean_title",
-    "is_oneshot",
-    "decode_or",
-    "encode_or",
-)
-
-
-def secure_filename(fn: str):
-    replacement = {
-        "/": "／",
-        ":": "：",
-        "<": "＜",
-        ">": "＞",
-        '"': "”",
-        # "'": "’",
-        "\\": "＼",
-        "?": "？",
-        "*": "⋆",
-        "|": "｜",
-        "#": "",
-    }
-    for k, v in replacement.items():
-        fn = fn.replace(k, v)
-    EMOJI_PATTERN = re.compile(
-        "(["
-        "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F700-\U0001F77F"  # alchemical symbols
-        "\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
-        "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
-        "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-        "\U0001FA00-\U0001FA6F"  # Chess Symbols
-        "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-        "\U00002702-\U000027B0"  # Dingbats
-        "])"
-    )
-    fn = re.sub(EMOJI_PATTERN, "_", fn)
-    return fn
-
-
-def clean_title(title: str):
-    if not title:
-        return title
-    if title.endswith("]"):
-        title = title[:-1]
-    return title
-
-
-def is_oneshot(title: str):
-    title = title.lower()
-    valid_oshot = [
-        "na",
-        "oshot",
-        "oneshot",
-        "one-shot",
-        "one shot",
-    ]
-    return title in valid_oshot
-
-
-def decode_or(any: Optional[Union[str, bytes]]) -> Optional[str]:
-    if any is None:
-        return None
-    if isinstance(any, bytes):
-        return any.decode("utf-8")
-    return any
-
-
-def encode_or(any: Optional[Union[str, bytes]]) -> Optional[bytes]:
-    if any is None:
-        return None
-    if isinstance(any, str):
-        return any.encode("utf-8")
-    return any
\ No newline at end of file
+import importlib
+import re
+import sys
+from types import ModuleType
+from typing import Any, Optional, Union
+
+__all__ = (
+    "secure_filename",
+    "clean_title",
+    "is_oneshot",
+    "decode_or",
+    "encode_or",
+    "format_bytes",
+    "lazy_import",
+    "get_peak_rss",
+)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Not available on Windows
+    resource = None
+
+
+def secure_filename(fn: str):
+    replacement = {
+        "/": "／",
+        ":": "：",
+        "<": "＜",
+        ">": "＞",
+        '"': "”",
+        # "'": "’",
+        "\\": "＼",
+        "?": "？",
+        "*": "⋆",
+        "|": "｜",
+        "#": "",
+    }
+    for k, v in replacement.items():
+        fn = fn.replace(k, v)
+    EMOJI_PATTERN = re.compile(
+        "(["
+        "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+        "\U0001F300-\U0001F5FF"  # symbols & pictographs
+        "\U0001F600-\U0001F64F"  # emoticons
+        "\U0001F680-\U0001F6FF"  # transport & map symbols
+        "\U0001F700-\U0001F77F"  # alchemical symbols
+        "\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
+        "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
+        "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
+        "\U0001FA00-\U0001FA6F"  # Chess Symbols
+        "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
+        "\U00002702-\U000027B0"  # Dingbats
+        "])"
+    )
+    fn = re.sub(EMOJI_PATTERN, "_", fn)
+    return fn
+
+
+def clean_title(title: str):
+    if not title:
+        return title
+    if title.endswith("]"):
+        title = title[:-1]
+    return title
+
+
+def is_oneshot(title: str):
+    title = title.lower()
+    valid_oshot = [
+        "na",
+        "oshot",
+        "oneshot",
+        "one-shot",
+        "one shot",
+    ]
+    return title in valid_oshot
+
+
+def decode_or(any: Optional[Union[str, bytes]]) -> Optional[str]:
+    if any is None:
+        return None
+    if isinstance(any, bytes):
+        return any.decode("utf-8")
+    return any
+
+
+def encode_or(any: Optional[Union[str, bytes]]) -> Optional[bytes]:
+    if any is None:
+        return None
+    if isinstance(any, str):
+        return any.encode("utf-8")
+    return any
+
+
+def format_bytes(size: Union[int, float]) -> str:
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    for unit in ["B", "KiB", "MiB"]:
+        if size < 1024:
+            if unit == "B":
+                return f"{sign}{int(size)} {unit}"
+            return f"{sign}{size:.2f} {unit}"
+        size /= 1024
+    return f"{sign}{size:.2f} GiB"
+
+
+class _LazyModule:
+    def __init__(self, name: str):
+        self.__name = name
+        self.__module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self.__module is None:
+            self.__module = importlib.import_module(self.__name)
+        return getattr(self.__module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self.__module is not None else "not loaded"
+        return f"<lazy module {self.__name!r} ({state})>"
+
+
+def lazy_import(name: str) -> Any:
+    """Return a proxy that only imports the module on the first attribute access.
+
+    Used for heavy dependencies that are not needed by every command,
+    so `nn` can start without importing them.
+    """
+    return _LazyModule(name)
+
+
+def get_peak_rss(children: bool = False) -> Optional[int]:
+    """Return the peak resident memory in bytes, of this process or the finished child processes."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    if sys.platform == "darwin":
+        return usage.ru_maxrss
+    return usage.ru_maxrss * 1024
@@ -0,0 +1,215 @@
+"""
+Watch a folder for new files or folders, and report them once they stopped changing.
+
+Use inotify on Linux, and fallback to polling everywhere else (or on network shares where
+inotify does not see the changes made by other machines).
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+__all__ = (
+    "InboxWatcher",
+    "entry_signature",
+    "is_ignored_entry",
+)
+
+# Partial downloads and editor/OS leftovers, the real file will appear later.
+_IGNORED_PREFIXES = (".", "~")
+_IGNORED_SUFFIXES = (".part", ".partial", ".tmp", ".crdownload", ".!qb", ".download")
+
+# <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+Signature = Tuple[int, int, int]
+
+
+def is_ignored_entry(name: str) -> bool:
+    lower_name = name.lower()
+    return lower_name.startswith(_IGNORED_PREFIXES) or lower_name.endswith(_IGNORED_SUFFIXES)
+
+
+def entry_signature(path: Path) -> Optional[Signature]:
+    """Return (file count, total size, latest mtime) of a file or a folder, None if it vanished."""
+    try:
+        if not path.is_dir():
+            stat = path.stat()
+            return 1, stat.st_size, stat.st_mtime_ns
+        file_count = total_size = latest_mtime = 0
+        for root, _, files in os.walk(path):
+            for file in files:
+                try:
+                    stat = os.stat(os.path.join(root, file))
+                except FileNotFoundError:
+                    continue
+                file_count += 1
+                total_size += stat.st_size
+                latest_mtime = max(latest_mtime, stat.st_mtime_ns)
+        return file_count, total_size, latest_mtime
+    except FileNotFoundError:
+        return None
+
+
+class _Inotify:
+    """Minimal inotify binding, only used to wake up when something happened in the folder."""
+
+    def __init__(self, folder: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        watch_desc = libc.inotify_add_watch(self._fd, os.fsencode(str(folder)), _IN_WATCH_MASK)
+        if watch_desc < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, os.strerror(errno), str(folder))
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Wait until something happened in the folder, return False on timeout."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            _, mask, _, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+            if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                raise FileNotFoundError("The watched folder was removed or moved")
+            offset += _INOTIFY_EVENT.size + name_len
+        return True
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+@dataclass
+class _EntryState:
+    signature: Signature
+    changed_at: float
+
+
+class InboxWatcher:
+    """
+    Report the entries of the inbox once they did not change for ``settle_time`` seconds.
+
+    Call :meth:`poll` in a loop, and :meth:`forget` once an entry has been taken care of.
+    """
+
+    def __init__(self, inbox: Path, settle_time: float = 5.0, poll_interval: float = 1.0, force_poll: bool = False):
+        self.inbox = inbox
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self._entries: Dict[str, _EntryState] = {}
+        self._inotify: Optional[_Inotify] = None
+        self._fallback_reason: Optional[str] = None
+        if force_poll:
+            self._fallback_reason = "polling requested"
+        elif not sys.platform.startswith("linux"):
+            self._fallback_reason = "inotify is only available on Linux"
+        else:
+            try:
+                self._inotify = _Inotify(inbox)
+            except (OSError, AttributeError) as exc:
+                # AttributeError: libc without inotify (e.g. musl in some containers)
+                self._fallback_reason = f"inotify unavailable: {exc}"
+        # Always list the folder on the first poll, to pick up what was dropped while we were not running.
+        self._need_rescan = True
+
+    @property
+    def mode(self) -> str:
+        if self._inotify is not None:
+            return "inotify"
+        return f"polling every {self.poll_interval:g}s ({self._fallback_reason})"
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def forget(self, name: str):
+        """Stop tracking an entry, e.g. after it was moved out of the inbox."""
+        self._entries.pop(name, None)
+
+    def _list_inbox(self) -> Set[str]:
+        return {entry.name for entry in os.scandir(self.inbox) if not is_ignored_entry(entry.name)}
+
+    def poll(self, busy: bool = False) -> List[Path]:
+        """
+        Wait for a change (or the poll interval), and return the settled entries, oldest first.
+
+        With inotify this blocks until something happen in the inbox, unless an entry is still
+        settling or ``busy`` is set (e.g. some jobs are running and need to be checked).
+        """
+        if self._inotify is not None:
+            timeout = self.poll_interval if (self._entries or busy) else None
+            if self._inotify.wait(0 if self._need_rescan else timeout):
+                self._need_rescan = True
+        elif not self._need_rescan:
+            time.sleep(self.poll_interval)
+            self._need_rescan = True
+
+        names = set(self._entries.keys())
+        if self._need_rescan:
+            names = self._list_inbox()
+            for name in list(self._entries.keys()):
+                if name not in names:
+                    self._entries.pop(name)
+            self._need_rescan = False
+
+        now = time.monotonic()
+        settled: List[Tuple[float, str]] = []
+        for name in names:
+            signature = entry_signature(self.inbox / name)
+            if signature is None:
+                self._entries.pop(name, None)
+                continue
+            state = self._entries.get(name)
+            if state is None or state.signature != signature:
+                self._entries[name] = _EntryState(signature, now)
+                continue
+            if now - state.changed_at >= self.settle_time:
+                settled.append((state.changed_at, name))
+        settled.sort()
+        return [self.inbox / name for _, name in settled]
@@ -0,0 +1,342 @@
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Deque, List, Optional, Tuple, Union
+from zipfile import BadZipFile, ZipInfo
+
+__all__ = (
+    "LocalHeader",
+    "ZipSource",
+    "ZipRewriter",
+    "write_zip",
+    "read_first_local_header",
+)
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_LOCAL_MAGIC = b"PK\x03\x04"
+_CENTRAL_MAGIC = b"PK\x01\x02"
+_END_MAGIC = b"PK\x05\x06"
+_ZIP_STORED = 0
+_ZIP_DEFLATED = 8
+_ZIP_VERSION = 20
+# The external attributes hold Unix mode bits, so the "version made by" host must be Unix
+_ZIP_CREATE_SYSTEM = 3
+_ZIP_CREATE_VERSION = (_ZIP_CREATE_SYSTEM << 8) | _ZIP_VERSION
+_UTF8_FLAG = 0x800
+_DATA_DESCRIPTOR_FLAG = 0x08
+_DATA_DESCRIPTOR_MAGIC = b"PK\x07\x08"
+_ZIP_LIMIT = 0xFFFFFFFF
+
+
+@dataclass
+class ZipSource:
+    name: str
+    data: Union[bytes, Path]
+    compress: bool = True
+
+
+@dataclass
+class _PreparedEntry:
+    name: bytes
+    flags: int
+    method: int
+    dos_time: int
+    dos_date: int
+    crc: int
+    size: int
+    external_attr: int
+    data: bytes
+
+
+@dataclass
+class LocalHeader:
+    name: str
+    method: int
+    size: int
+    extra_size: int
+    data_offset: int
+
+
+def _dos_date_time(timestamp: float):
+    year, month, day, hour, minute, second = time.localtime(timestamp)[:6]
+    year = max(1980, year)
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def _prepare_entry(source: ZipSource, compress_level: int) -> _PreparedEntry:
+    external_attr = 0o600 << 16
+    if isinstance(source.data, Path):
+        stat = source.data.stat()
+        raw_data = source.data.read_bytes()
+        dos_time, dos_date = _dos_date_time(stat.st_mtime)
+        external_attr = (stat.st_mode & 0xFFFF) << 16
+    else:
+        raw_data = source.data
+        dos_time, dos_date = _dos_date_time(time.time())
+
+    method = _ZIP_STORED
+    data = raw_data
+    if source.compress:
+        compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15)
+        compressed = compressor.compress(raw_data) + compressor.flush()
+        if len(compressed) < len(raw_data):
+            method = _ZIP_DEFLATED
+            data = compressed
+
+    try:
+        name = source.name.encode("ascii")
+        flags = 0
+    except UnicodeEncodeError:
+        name = source.name.encode("utf-8")
+        flags = _UTF8_FLAG
+    return _PreparedEntry(
+        name, flags, method, dos_time, dos_date, zlib.crc32(raw_data), len(raw_data), external_attr, data
+    )
+
+
+def write_zip(
+    target: Path,
+    sources: List[ZipSource],
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    compress_level: int = 6,
+) -> int:
+    """Write a ZIP file with the entries in the exact order given.
+
+    The entries are read and compressed in a thread pool (zlib releases the GIL),
+    but written one by one so the order is always kept. Entries that do not get
+    smaller when compressed are stored. The file is written to a temporary name first,
+    so a failed write never leaves a partial target. Return the number of entries written.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_workers * 2
+    central_directory: List[bytes] = []
+    offset = 0
+
+    def _write_entry(fp, entry: _PreparedEntry):
+        nonlocal offset
+        if offset > _ZIP_LIMIT or entry.size > _ZIP_LIMIT or len(entry.data) > _ZIP_LIMIT:
+            raise ValueError(f"{target.name} is too large, ZIP64 is not supported")
+        fp.write(
+            _LOCAL_HEADER.pack(
+                _LOCAL_MAGIC,
+                _ZIP_VERSION,
+                entry.flags,
+                entry.method,
+                entry.dos_time,
+                entry.dos_date,
+                entry.crc,
+                len(entry.data),
+                entry.size,
+                len(entry.name),
+                0,
+            )
+        )
+        fp.write(entry.name)
+        fp.write(entry.data)
+        central_directory.append(
+            _CENTRAL_HEADER.pack(
+                _CENTRAL_MAGIC,
+                _ZIP_CREATE_VERSION,
+                _ZIP_VERSION,
+                entry.flags,
+                entry.method,
+                entry.dos_time,
+                entry.dos_date,
+                entry.crc,
+                len(entry.data),
+                entry.size,
+                len(entry.name),
+                0,
+                0,
+                0,
+                0,
+                entry.external_attr,
+                offset,
+            )
+            + entry.name
+        )
+        offset += _LOCAL_HEADER.size + len(entry.name) + len(entry.data)
+        if progress is not None:
+            progress(len(central_directory), len(sources))
+
+    temp_target = target.with_name(f".{target.name}.nntmp")
+    try:
+        with temp_target.open("wb") as fp, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: Deque[Future] = deque()
+            for source in sources:
+                pending.append(executor.submit(_prepare_entry, source, compress_level))
+                while len(pending) >= max_pending:
+                    _write_entry(fp, pending.popleft().result())
+            while pending:
+                _write_entry(fp, pending.popleft().result())
+
+            central_data = b"".join(central_directory)
+            if len(central_directory) > 0xFFFF or offset > _ZIP_LIMIT:
+                raise ValueError(f"{target.name} is too large, ZIP64 is not supported")
+            fp.write(central_data)
+            fp.write(
+                _END_RECORD.pack(
+                    _END_MAGIC, 0, 0, len(central_directory), len(central_directory), len(central_data), offset, 0
+                )
+            )
+        os.replace(temp_target, target)
+    except BaseException:
+        try:
+            temp_target.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+    return len(central_directory)
+
+
+def _dos_date_time_of(info: ZipInfo) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = info.date_time
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+class ZipRewriter:
+    """
+    Write a new ZIP file from the entries of an existing one, in the order they are given.
+
+    :meth:`copy` writes the entry exactly as it is in the source (local header, compressed data,
+    CRC and sizes) without decompressing it. :meth:`replace` writes new data for the entry, with
+    the same compression, timestamp, attributes and extra fields. Call :meth:`close` at the end.
+    """
+
+    def __init__(self, source_fp: BinaryIO, target_fp: BinaryIO, compress_level: int = 6):
+        self._source_fp = source_fp
+        self._target_fp = target_fp
+        self._compress_level = compress_level
+        self._central_directory: List[bytes] = []
+        self._offset = 0
+
+    def _read_local_header(self, info: ZipInfo) -> Tuple[tuple, bytes, bytes]:
+        if info.header_offset > _ZIP_LIMIT or info.compress_size > _ZIP_LIMIT or info.file_size > _ZIP_LIMIT:
+            raise ValueError(f"{info.filename} is too large, ZIP64 is not supported")
+        self._source_fp.seek(info.header_offset)
+        header_data = self._source_fp.read(_LOCAL_HEADER.size)
+        if len(header_data) < _LOCAL_HEADER.size or not header_data.startswith(_LOCAL_MAGIC):
+            raise BadZipFile(f"Bad local header of {info.filename}")
+        header = _LOCAL_HEADER.unpack(header_data)
+        name = self._source_fp.read(header[9])
+        extra = self._source_fp.read(header[10])
+        return header, name, extra
+
+    def _add_entry(
+        self,
+        info: ZipInfo,
+        local_data: bytes,
+        name: bytes,
+        version: int,
+        flags: int,
+        method: int,
+        crc: int,
+        compress_size: int,
+        file_size: int,
+    ):
+        if self._offset > _ZIP_LIMIT:
+            raise ValueError("The ZIP file is too large, ZIP64 is not supported")
+        dos_time, dos_date = _dos_date_time_of(info)
+        comment = info.comment or b""
+        self._central_directory.append(
+            _CENTRAL_HEADER.pack(
+                _CENTRAL_MAGIC,
+                (info.create_system << 8) | info.create_version,
+                version,
+                flags,
+                method,
+                dos_time,
+                dos_date,
+                crc,
+                compress_size,
+                file_size,
+                len(name),
+                len(info.extra),
+                len(comment),
+                0,
+                info.internal_attr,
+                info.external_attr,
+                self._offset,
+            )
+            + name
+            + info.extra
+            + comment
+        )
+        self._target_fp.write(local_data)
+        self._offset += len(local_data)
+
+    def copy(self, info: ZipInfo):
+        header, name, extra = self._read_local_header(info)
+        data = self._source_fp.read(info.compress_size)
+        descriptor = b""
+        if info.flag_bits & _DATA_DESCRIPTOR_FLAG:
+            # CRC and sizes are after the data, with an optional signature
+            descriptor = self._source_fp.read(4)
+            descriptor += self._source_fp.read(12 if descriptor == _DATA_DESCRIPTOR_MAGIC else 8)
+        if len(data) != info.compress_size:
+            raise BadZipFile(f"Truncated data of {info.filename}")
+        local_data = _LOCAL_HEADER.pack(*header) + name + extra + data + descriptor
+        self._add_entry(
+            info, local_data, name, header[1], info.flag_bits, info.compress_type, info.CRC, len(data), info.file_size
+        )
+
+    def replace(self, info: ZipInfo, data: bytes):
+        _, name, extra = self._read_local_header(info)
+        method = _ZIP_STORED
+        compressed = data
+        if info.compress_type != _ZIP_STORED:
+            compressor = zlib.compressobj(self._compress_level, zlib.DEFLATED, -15)
+            compressed = compressor.compress(data) + compressor.flush()
+            method = _ZIP_DEFLATED
+        # The sizes are known, no data descriptor
+        flags = info.flag_bits & _UTF8_FLAG
+        crc = zlib.crc32(data)
+        dos_time, dos_date = _dos_date_time_of(info)
+        local_header = _LOCAL_HEADER.pack(
+            _LOCAL_MAGIC,
+            _ZIP_VERSION,
+            flags,
+            method,
+            dos_time,
+            dos_date,
+            crc,
+            len(compressed),
+            len(data),
+            len(name),
+            len(extra),
+        )
+        local_data = local_header + name + extra + compressed
+        self._add_entry(info, local_data, name, _ZIP_VERSION, flags, method, crc, len(compressed), len(data))
+
+    def close(self, comment: bytes = b""):
+        central_data = b"".join(self._central_directory)
+        entry_count = len(self._central_directory)
+        if entry_count > 0xFFFF or self._offset > _ZIP_LIMIT:
+            raise ValueError("The ZIP file is too large, ZIP64 is not supported")
+        self._target_fp.write(central_data)
+        self._target_fp.write(
+            _END_RECORD.pack(_END_MAGIC, 0, 0, entry_count, entry_count, len(central_data), self._offset, len(comment))
+            + comment
+        )
+
+
+def read_first_local_header(target: Path) -> Optional[LocalHeader]:
+    """Read the local header of the first entry in the ZIP file, return None if it's not a ZIP file."""
+    with target.open("rb") as fp:
+        header_data = fp.read(_LOCAL_HEADER.size)
+        if len(header_data) < _LOCAL_HEADER.size:
+            return None
+        header = _LOCAL_HEADER.unpack(header_data)
+        if header[0] != _LOCAL_MAGIC:
+            return None
+        name = fp.read(header[9]).decode("utf-8", "replace")
+    data_offset = _LOCAL_HEADER.size + header[9] + header[10]
+    return LocalHeader(name, header[3], header[7], header[10], data_offset)
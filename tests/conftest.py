@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import pytest
+
+from nn import config
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_config_dir(tmp_path_factory: pytest.TempPathFactory):
+    """Never read or write the config of the user running the tests."""
+    config_dir: Path = tmp_path_factory.mktemp("nn-config")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(config, "CONFIG_DIR", config_dir)
+        monkeypatch.setattr(config, "_config_handler", None)
+        monkeypatch.setattr(config, "_executable_cache", None)
+        yield config_dir
@@ -0,0 +1,72 @@
+import os
+import stat
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from nn import config
+from nn.cli import base
+from nn.cmd import main
+
+
+@pytest.fixture
+def probes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> List[List[str]]:
+    monkeypatch.setattr(config, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(config, "_executable_cache", None)
+    probed: List[List[str]] = []
+
+    def _fake_probe(arguments: List[str]):
+        probed.append(arguments)
+        return "12.40"
+
+    monkeypatch.setattr(base, "_probe_exec", _fake_probe)
+    return probed
+
+
+def _fake_exec(tmp_path: Path) -> Path:
+    exec_path = tmp_path / "exiftool"
+    exec_path.write_text("#!/bin/sh\necho 12.40\n")
+    exec_path.chmod(exec_path.stat().st_mode | stat.S_IXUSR)
+    return exec_path
+
+
+def test_changed_executable_is_rediscovered(tmp_path: Path, probes: List[List[str]]):
+    exec_path = _fake_exec(tmp_path)
+    assert base.test_or_find_exiftool(str(exec_path), force_search=False) == str(exec_path)
+    assert base.test_or_find_exiftool(str(exec_path), force_search=False) == str(exec_path)
+    assert len(probes) == 1
+    assert (tmp_path / "executables.json").exists()
+
+    # Updated in place, e.g. by the package manager
+    mtime = exec_path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(exec_path, ns=(mtime, mtime))
+    base.test_or_find_exiftool(str(exec_path), force_search=False)
+    assert len(probes) == 2
+
+    with exec_path.open("a") as fp:
+        fp.write("# new version\n")
+    os.utime(exec_path, ns=(mtime, mtime))
+    base.test_or_find_exiftool(str(exec_path), force_search=False)
+    assert len(probes) == 3
+
+    base.test_or_find_exiftool(str(exec_path), force_search=False)
+    assert len(probes) == 3
+
+
+def test_force_search_skips_cache(tmp_path: Path, probes: List[List[str]]):
+    exec_path = _fake_exec(tmp_path)
+    base.test_or_find_exiftool(str(exec_path), force_search=False)
+    base.test_or_find_exiftool(str(exec_path), force_search=True)
+    assert len(probes) == 2
+
+
+def test_rediscover_clears_cache(tmp_path: Path, probes: List[List[str]]):
+    exec_path = _fake_exec(tmp_path)
+    base.test_or_find_exiftool(str(exec_path), force_search=False)
+    assert config.get_executable_cache().get("exiftool", str(exec_path)) is not None
+
+    main.main(args=["tag", "--rediscover", "--help"], prog_name="nn", standalone_mode=False)
+    assert config.get_executable_cache().get("exiftool", str(exec_path)) is None
+    base.test_or_find_exiftool(str(exec_path), force_search=False)
+    assert len(probes) == 2
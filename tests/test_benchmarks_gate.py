@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from benchmarks.corpus import Corpus, CorpusSpec
+from benchmarks.gate import ComparisonStatus, compare_results, format_comparisons
+from benchmarks.runner import BenchmarkResult, ResultsFile, read_results, run_benchmarks, write_results
+from benchmarks.suite import BenchContext, Benchmark, Workload
+
+
+def _working(ctx: BenchContext) -> Workload:
+    workload = Workload()
+    workload.add(10)
+    return workload
+
+
+def _broken(ctx: BenchContext) -> Workload:
+    raise AttributeError("'SevenZipFile' object has no attribute 'read'")
+
+
+def _result(name: str, median: float) -> BenchmarkResult:
+    return BenchmarkResult(name, "test", "", "pages", timings=[median] * 9, items=1)
+
+
+def test_failed_benchmark_does_not_stop_the_run(tmp_path: Path):
+    corpus = Corpus(tmp_path, CorpusSpec())
+    benchmarks = [
+        Benchmark("test.broken", "test", "", _broken),
+        Benchmark("test.working", "test", "", _working),
+    ]
+    results = run_benchmarks(benchmarks, corpus, repeat=2, warmup=0)
+    assert [result.name for result in results] == ["test.broken", "test.working"]
+    assert results[0].failed
+    assert "SevenZipFile" in results[0].error
+    assert not results[1].failed
+    assert len(results[1].timings) == 2
+
+    # Round trip through the results file
+    results_file = tmp_path / "results.json"
+    write_results(results_file, results, corpus.spec, 2, 0)
+    assert read_results(results_file).results["test.broken"].error == results[0].error
+
+
+def test_compare_results_status():
+    baseline = ResultsFile(
+        corpus=CorpusSpec(),
+        results={
+            "same": _result("same", 1.0),
+            "slower": _result("slower", 1.0),
+            "noisy": _result("noisy", 1.0),
+            "broken": _result("broken", 1.0),
+        },
+        thresholds={"noisy": 0.5},
+    )
+    current = {
+        "same": _result("same", 1.01),
+        "slower": _result("slower", 1.2),
+        "noisy": _result("noisy", 1.2),
+        "broken": BenchmarkResult("broken", "test", "", "pages", error="RuntimeError: boom"),
+        "added": _result("added", 1.0),
+    }
+    comparisons = {comparison.name: comparison for comparison in compare_results(baseline, current, 0.1)}
+    assert comparisons["same"].status == ComparisonStatus.ok
+    assert comparisons["slower"].status == ComparisonStatus.regressed
+    assert comparisons["noisy"].status == ComparisonStatus.ok
+    assert comparisons["broken"].status == ComparisonStatus.failed
+    assert comparisons["broken"].change is None
+    assert comparisons["added"].status == ComparisonStatus.new
+
+    lines = format_comparisons(list(comparisons.values()))
+    assert "broken failed: RuntimeError: boom" in lines
@@ -0,0 +1,50 @@
+import pytest
+
+from nn.common import (
+    ChapterRange,
+    ChapterRangeIndex,
+    ChapterRangeOverlapError,
+    parse_ch_ranges,
+    validate_ch_ranges,
+)
+
+
+@pytest.mark.parametrize("value", ["3", "1-5", "5-5", " 2-4 "])
+def test_validate_ch_ranges_accepts(value: str):
+    assert validate_ch_ranges(value)
+
+
+@pytest.mark.parametrize("value", ["", "x", "5-3", "1-2-3", "1-", "-2", "a-b"])
+def test_validate_ch_ranges_rejects(value: str):
+    assert not validate_ch_ranges(value)
+
+
+def test_parse_ch_ranges():
+    assert parse_ch_ranges("3") == (range(3, 4), True)
+    assert parse_ch_ranges("1-5") == (range(1, 6), False)
+
+
+def test_chapter_range_index_find():
+    index = ChapterRangeIndex(
+        [
+            ChapterRange(2, None, range(10, 20)),
+            ChapterRange(1, None, range(0, 10)),
+            ChapterRange(3, None, [25], True),
+        ]
+    )
+    assert [chapter.number for chapter in index] == [1, 2, 3]
+    assert index.find(0).number == 1
+    assert index.find(19).number == 2
+    assert index.find(22) is None
+    assert index.find(100).number == 3
+
+
+def test_chapter_range_index_rejects_overlap():
+    index = ChapterRangeIndex([ChapterRange(1, None, range(0, 10))])
+    with pytest.raises(ChapterRangeOverlapError):
+        index.add(ChapterRange(2, None, range(9, 12)))
+
+
+def test_chapter_range_index_rejects_empty_range():
+    with pytest.raises(ValueError):
+        ChapterRangeIndex([ChapterRange(1, None, range(5, 4))])
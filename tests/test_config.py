@@ -0,0 +1,45 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from nn import config
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(config, "CONFIG_DIR", tmp_path)
+    return tmp_path
+
+
+def _write_config(config_dir: Path, rip_credit: str, mtime_ns: int):
+    config_file = config_dir / "config.json"
+    config_file.write_text(json.dumps({"defaults": {"rip_credit": rip_credit}}), encoding="utf-8")
+    os.utime(config_file, ns=(mtime_ns, mtime_ns))
+
+
+def test_first_time_creates_config(config_dir: Path):
+    handler = config.ConfigHandler()
+    assert handler.config.defaults.rip_credit == "bob"
+    assert handler.is_first_time()
+    assert (config_dir / "config.json").exists()
+
+
+def test_config_revalidated_after_interval(config_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    _write_config(config_dir, "first", 1_000_000_000)
+    handler = config.ConfigHandler()
+    assert handler.config.defaults.rip_credit == "first"
+
+    # Not checked again right away, the config is read for every formatted filename
+    _write_config(config_dir, "second", 2_000_000_000)
+    assert handler.config.defaults.rip_credit == "first"
+
+    monkeypatch.setattr(config, "_REVALIDATE_INTERVAL", 0.0)
+    assert handler.config.defaults.rip_credit == "second"
+
+
+def test_invalid_config(config_dir: Path):
+    (config_dir / "config.json").write_text(json.dumps({"defaults": {"rip_credit": 1}}), encoding="utf-8")
+    with pytest.raises(config.ConfigError):
+        config.ConfigHandler().config
@@ -0,0 +1,60 @@
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from nn.file_handler import patch_zip_comment
+
+
+def _make_zip(target: Path, comment: Optional[bytes] = None) -> Path:
+    with zipfile.ZipFile(target, "w") as zip_file:
+        if comment is not None:
+            zip_file.comment = comment
+        zip_file.writestr("p001.jpg", b"\xff\xd8\xff\xd9")
+        zip_file.writestr("ComicInfo.xml", b"<ComicInfo/>", zipfile.ZIP_DEFLATED)
+    return target
+
+
+def _check_zip(target: Path, comment: bytes):
+    with zipfile.ZipFile(target) as zip_file:
+        assert zip_file.comment == comment
+        assert zip_file.testzip() is None
+        assert zip_file.read("p001.jpg") == b"\xff\xd8\xff\xd9"
+
+
+def test_patch_zip_comment_without_comment(tmp_path: Path):
+    target = _make_zip(tmp_path / "chapter.cbz")
+    patch_zip_comment(target, "Ripped by nn")
+    _check_zip(target, b"Ripped by nn")
+
+
+def test_patch_zip_comment_with_comment(tmp_path: Path):
+    # The old comment looks like an End Of Central Directory record
+    target = _make_zip(tmp_path / "chapter.cbz", b"PK\x05\x06" + b"old comment " * 20)
+    patch_zip_comment(target, "new")
+    _check_zip(target, b"new")
+    patch_zip_comment(target, None)
+    _check_zip(target, b"")
+
+
+def test_patch_zip_comment_rejects_zip64(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # Any archive with more entries than the limit is written as ZIP64
+    with monkeypatch.context() as patch:
+        patch.setattr(zipfile, "ZIP_FILECOUNT_LIMIT", 1)
+        target = _make_zip(tmp_path / "chapter.cbz")
+    original = target.read_bytes()
+    assert b"PK\x06\x07" in original
+    with pytest.raises(zipfile.LargeZipFile):
+        patch_zip_comment(target, "Ripped by nn")
+    assert target.read_bytes() == original
+
+
+@pytest.mark.parametrize("keep", [slice(None, -1), slice(None, -22), slice(None, -100), slice(40, None)])
+def test_patch_zip_comment_rejects_truncated(tmp_path: Path, keep: slice):
+    target = _make_zip(tmp_path / "chapter.cbz", b"comment")
+    truncated = target.read_bytes()[keep]
+    target.write_bytes(truncated)
+    with pytest.raises(zipfile.BadZipFile):
+        patch_zip_comment(target, "Ripped by nn")
+    assert target.read_bytes() == truncated
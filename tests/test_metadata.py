@@ -0,0 +1,67 @@
+import io
+import struct
+
+import pytest
+
+from nn.metadata import build_exif_data, tag_image_data
+
+Image = pytest.importorskip("PIL.Image")
+
+TITLE = "Series Title - c001 (v01) - p000 [Cover] [dig] [Publisher] [nao]"
+EMAIL = "nao@example.com"
+
+
+def _jpeg(exif=None) -> bytes:
+    fp = io.BytesIO()
+    kwargs = {} if exif is None else {"exif": exif}
+    Image.new("RGB", (16, 8), (200, 10, 10)).save(fp, "JPEG", **kwargs)
+    return fp.getvalue()
+
+
+def _read_exif(image_data: bytes):
+    with Image.open(io.BytesIO(image_data)) as im:
+        return im.getexif()
+
+
+def test_tag_jpeg_without_exif():
+    exif = _read_exif(tag_image_data(_jpeg(), TITLE, EMAIL))
+    assert exif[0x010E] == TITLE
+    assert exif[0x013B] == EMAIL
+
+
+def test_tag_jpeg_keeps_existing_exif():
+    original = Image.Exif()
+    original[0x0112] = 6  # Orientation
+    original[0x010E] = "Old description"
+    original[0x0131] = "Scanner Software"
+    original.get_ifd(0x8769)[0x9003] = "2020:01:02 03:04:05"  # DateTimeOriginal
+    image_data = _jpeg(original.tobytes())
+
+    tagged = tag_image_data(image_data, TITLE, EMAIL)
+    exif = _read_exif(tagged)
+    assert exif[0x0112] == 6
+    assert exif[0x0131] == "Scanner Software"
+    assert exif[0x010E] == TITLE
+    assert exif.get_ifd(0x8769)[0x9003] == "2020:01:02 03:04:05"
+    # Tagging again replaces our tags instead of duplicating them
+    assert _read_exif(tag_image_data(tagged, TITLE, EMAIL)) == exif
+    with Image.open(io.BytesIO(tagged)) as im:
+        im.load()
+
+
+def test_build_exif_data_big_endian():
+    # IFD0 with only Orientation (SHORT) = 3
+    existing = b"MM\x00*" + struct.pack(">IHHHIHHI", 8, 1, 0x0112, 3, 1, 3, 0, 0)
+    tiff = build_exif_data(TITLE, EMAIL, existing)
+    assert tiff.startswith(b"MM\x00*")
+
+    exif = Image.Exif()
+    exif.load(tiff)
+    assert exif[0x0112] == 3
+    assert exif[0x010E] == TITLE
+
+
+def test_build_exif_data_broken_exif():
+    exif = Image.Exif()
+    exif.load(build_exif_data(TITLE, EMAIL, b"II*\x00\xff\xff\xff\xff"))
+    assert exif[0x013B] == EMAIL
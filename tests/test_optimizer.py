@@ -0,0 +1,56 @@
+import os
+import struct
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from nn.optimizer import optimize_archive
+
+# Extended timestamp extra field, kept by the rewrite
+_EXTRA = struct.pack("<2HBL", 0x5455, 5, 1, 1_600_000_000)
+
+
+def _shrink_first(source: zipfile.ZipFile, entries: List[zipfile.ZipInfo]) -> Iterator[Tuple[bytes, bytes]]:
+    for index, info in enumerate(entries):
+        original = source.read(info)
+        yield original, original[: len(original) // 2] if index == 0 else original
+
+
+def _raw_entry(archive: Path, info: zipfile.ZipInfo) -> bytes:
+    with archive.open("rb") as fp:
+        fp.seek(info.header_offset)
+        header = fp.read(30)
+        name_size, extra_size = struct.unpack("<2H", header[26:])
+        return header + fp.read(name_size + extra_size + info.compress_size)
+
+
+def test_optimize_archive_copies_unchanged_entries(tmp_path: Path):
+    archive = tmp_path / "chapter.cbz"
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.comment = b"nn archive"
+        zip_file.writestr("ComicInfo.xml", b"<ComicInfo/>" * 50, zipfile.ZIP_DEFLATED)
+        shrunk = zipfile.ZipInfo("p001.png", (2021, 5, 4, 12, 30, 10))
+        shrunk.compress_type = zipfile.ZIP_DEFLATED
+        shrunk.extra = _EXTRA
+        zip_file.writestr(shrunk, b"\x89PNG" + b"\x00" * 4000)
+        # Random data, deflate cannot make it smaller either
+        zip_file.writestr("p002.jpg", os.urandom(4096), zipfile.ZIP_DEFLATED)
+    with zipfile.ZipFile(archive) as zip_file:
+        before = {info.filename: _raw_entry(archive, info) for info in zip_file.infolist()}
+
+    results = optimize_archive(archive, entry_optimizer=_shrink_first)
+    assert [(result.name, result.saved) for result in results] == [("p001.png", 2002), ("p002.jpg", 0)]
+    assert not list(tmp_path.glob(".*.nntmp"))
+
+    with zipfile.ZipFile(archive) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.comment == b"nn archive"
+        infos = zip_file.infolist()
+        assert [info.filename for info in infos] == ["ComicInfo.xml", "p001.png", "p002.jpg"]
+        assert _raw_entry(archive, infos[0]) == before["ComicInfo.xml"]
+        assert _raw_entry(archive, infos[2]) == before["p002.jpg"]
+
+        assert infos[1].extra == _EXTRA
+        assert infos[1].date_time == (2021, 5, 4, 12, 30, 10)
+        assert infos[1].compress_type == zipfile.ZIP_DEFLATED
+        assert zip_file.read("p001.png") == (b"\x89PNG" + b"\x00" * 4000)[:2002]
@@ -0,0 +1,133 @@
+"""
+Conformance of the linear-time parsers against the original regexes of RegexCollection.
+
+The corpus is the filenames nn generates, plus random mutations of them around the
+characters the patterns care about, so the near misses are compared too.
+"""
+
+import itertools
+import random
+import re
+from typing import Iterator, List, Optional
+
+import pytest
+
+from nn.cli.constants import M_PUBLICATION_TYPES
+from nn.common import ChapterRange, RegexCollection, format_daiz_like_filename
+from nn.parser import ChapterFilenameParser, parse_cmx_filename, parse_page_filename
+
+TITLE = "Series Title"
+PUBLISHER = "Publisher"
+_MUTATION_CHARS = " -.#x()[]pcv0123456789OoSshtNnAa"
+_MUTATIONS_PER_NAME = 4
+
+
+def _chapters() -> List[ChapterRange]:
+    return [
+        ChapterRange(1, "Start", range(0, 5)),
+        ChapterRange(1.5, None, range(5, 8)),
+        ChapterRange(2, None, range(8, 10)),
+        ChapterRange(2.6, "Extra [Part]", range(10, 12)),
+        ChapterRange(12, "Single", [12], True),
+    ]
+
+
+def _generated_names() -> Iterator[str]:
+    chapters = _chapters()
+    extra_maps = {}
+    for chapter in sorted(chapters, key=lambda x: x.number):
+        extra_maps.setdefault(chapter.base, []).append(chapter)
+    variants = itertools.product(
+        M_PUBLICATION_TYPES.values(),
+        [None, 1, 2.5, 13],
+        [None, "Cover", "ToC"],
+        [(None, None), ("HQ", 2)],
+        ["OShot", "NA", "One Shot", "oneshot"],
+    )
+    for publication, volume, extra, (quality, revision), fallback in variants:
+        for chapter in chapters:
+            for page in ("000", "7", "012-013", "100x1"):
+                image_name, _ = format_daiz_like_filename(
+                    TITLE,
+                    PUBLISHER,
+                    2020,
+                    chapter,
+                    page,
+                    publication,
+                    "nao",
+                    "square",
+                    volume,
+                    extra,
+                    quality,
+                    revision,
+                    extra_maps,
+                    fallback,
+                )
+                yield image_name
+
+
+def _cmx_names() -> Iterator[str]:
+    for volume, volume_ex, page in itertools.product(
+        ["", "- v1", "- v12", "- v1234"], ["", ".5", ".25", ".123"], ["1", "012", "012-013", "1234", "12-"]
+    ):
+        yield f"{TITLE} {volume}{volume_ex} - p{page}"
+        yield f"{TITLE}{volume}{volume_ex} - p{page} [dig]"
+
+
+def _mutate(name: str, rng: random.Random) -> str:
+    position = rng.randrange(len(name) + 1)
+    action = rng.randrange(3)
+    char = rng.choice(_MUTATION_CHARS)
+    if action == 0:
+        return name[:position] + char + name[position:]
+    if action == 1:
+        return name[:position] + name[position + 1 :]
+    return name[:position] + char + name[position + 1 :]
+
+
+def _corpus(names: Iterator[str], seed: int) -> List[str]:
+    rng = random.Random(seed)
+    corpus: List[str] = []
+    for name in names:
+        corpus.append(name)
+        corpus.extend(_mutate(name, rng) for _ in range(_MUTATIONS_PER_NAME))
+    return sorted(set(corpus))
+
+
+def _assert_same_groups(pattern: "re.Pattern[str]", match: Optional[re.Match], parsed, filename: str):
+    if match is None:
+        assert parsed is None, f"{filename!r}: the regex does not match but the parser does ({parsed!r})"
+        return
+    assert parsed is not None, f"{filename!r}: the regex matches but the parser does not"
+    for group in pattern.groupindex:
+        assert parsed.group(group) == match.group(group), f"{filename!r}: group {group} differ"
+
+
+CHAPTER_CORPUS = _corpus(_generated_names(), seed=28)
+CMX_CORPUS = _corpus(_cmx_names(), seed=280)
+
+
+@pytest.mark.parametrize("publisher", [PUBLISHER, None], ids=["title-regex", "basic-regex"])
+def test_chapter_parser_matches_regex(publisher: Optional[str]):
+    pattern = RegexCollection.chapter_re(TITLE, publisher)
+    parser = ChapterFilenameParser(TITLE, publisher)
+    for filename in CHAPTER_CORPUS:
+        _assert_same_groups(pattern, pattern.match(filename), parser.parse(filename), filename)
+
+
+def test_page_parser_matches_regex():
+    pattern = RegexCollection.page_re()
+    for filename in CHAPTER_CORPUS + CMX_CORPUS:
+        _assert_same_groups(pattern, pattern.match(filename), parse_page_filename(filename), filename)
+
+
+def test_cmx_parser_matches_regex():
+    pattern = RegexCollection.cmx_re()
+    for filename in CMX_CORPUS + CHAPTER_CORPUS[::10]:
+        _assert_same_groups(pattern, pattern.match(filename), parse_cmx_filename(filename), filename)
+
+
+def test_corpus_covers_both_outcomes():
+    pattern = RegexCollection.chapter_re(TITLE, PUBLISHER)
+    matched = sum(1 for filename in CHAPTER_CORPUS if pattern.match(filename) is not None)
+    assert 0 < matched < len(CHAPTER_CORPUS)
@@ -0,0 +1,79 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from nn import renamer
+from nn.cli.releases import _apply_rename_plan
+from nn.cmd import main
+from nn.renamer import RENAME_JOURNAL, RenameCollisionError, RenamePlan
+
+
+def _make_files(folder: Path, contents: Dict[str, str]):
+    for name, content in contents.items():
+        (folder / name).write_text(content)
+
+
+def _read_files(folder: Path) -> Dict[str, str]:
+    return {file.name: file.read_text() for file in folder.iterdir() if file.name != RENAME_JOURNAL}
+
+
+def _cycle_plan(folder: Path) -> RenamePlan:
+    _make_files(folder, {"a.jpg": "a", "b.jpg": "b"})
+    plan = RenamePlan(folder)
+    plan.add(folder / "a.jpg", "b.jpg")
+    plan.add(folder / "b.jpg", "a.jpg")
+    return plan
+
+
+def test_collision_aborts_before_renaming(tmp_path: Path):
+    _make_files(tmp_path, {"a.jpg": "a", "b.jpg": "b", "c.jpg": "c"})
+    plan = RenamePlan(tmp_path)
+    plan.add(tmp_path / "a.jpg", "x.jpg")
+    plan.add(tmp_path / "b.jpg", "c.jpg")
+    with pytest.raises(RenameCollisionError, match="b.jpg would overwrite the existing file c.jpg"):
+        plan.check_collisions()
+
+    assert not _apply_rename_plan(plan)
+    assert _read_files(tmp_path) == {"a.jpg": "a", "b.jpg": "b", "c.jpg": "c"}
+    assert not (tmp_path / RENAME_JOURNAL).exists()
+
+
+def test_cycle_uses_temporary_names(tmp_path: Path):
+    plan = _cycle_plan(tmp_path)
+    plan.check_collisions()
+    assert plan.find_cycles() == [["a.jpg", "b.jpg"]]
+
+    plan.apply()
+    assert _read_files(tmp_path) == {"a.jpg": "b", "b.jpg": "a"}
+    journal = json.loads((tmp_path / RENAME_JOURNAL).read_text(encoding="utf-8"))
+    assert journal["state"] == "done"
+    assert all(entry["temp"] is not None for entry in journal["renames"])
+
+
+def test_undo_interrupted_renames(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    plan = _cycle_plan(tmp_path)
+    real_replace = os.replace
+
+    def _interrupted_replace(source, target):
+        # Stop right before the second file gets its final name
+        if Path(source).name.startswith(".b.jpg."):
+            raise KeyboardInterrupt
+        real_replace(source, target)
+
+    monkeypatch.setattr(renamer.os, "replace", _interrupted_replace)
+    with pytest.raises(KeyboardInterrupt):
+        plan.apply()
+    monkeypatch.undo()
+
+    journal = json.loads((tmp_path / RENAME_JOURNAL).read_text(encoding="utf-8"))
+    assert journal["state"] == "renaming"
+    assert sorted(_read_files(tmp_path).values()) == ["a", "b"]
+    assert "a.jpg" not in _read_files(tmp_path)
+
+    exit_code = main.main(args=["releases", "--undo", str(tmp_path)], prog_name="nn", standalone_mode=False)
+    assert exit_code == 0
+    assert _read_files(tmp_path) == {"a.jpg": "a", "b.jpg": "b"}
+    assert not (tmp_path / RENAME_JOURNAL).exists()
@@ -0,0 +1,39 @@
+import io
+import json
+from pathlib import Path
+from typing import Tuple
+
+from nn.server import JobServer, _ConnectionWriter
+
+
+def _release_folder(folder: Path) -> Path:
+    folder.mkdir()
+    for page in range(1, 3):
+        (folder / f"Title - v01 - p{page:03d}.jpg").write_bytes(b"\xff\xd8\xff\xd9")
+    return folder
+
+
+def _run_job(tmp_path: Path, *argv: str) -> Tuple[int, str]:
+    connection_fp = io.BytesIO()
+    writer = _ConnectionWriter(connection_fp, False)
+    exit_code = JobServer(tmp_path / "nn.sock")._run_job(list(argv), str(tmp_path), writer, False, 120)
+    messages = [json.loads(line) for line in connection_fp.getvalue().splitlines()]
+    return exit_code, "".join(message.get("output", "") for message in messages)
+
+
+def test_job_prompt_fails_clearly(tmp_path: Path):
+    _release_folder(tmp_path / "release")
+    exit_code, output = _run_job(tmp_path, "releases", "release", "-t", "Title", "-pub", "Pub")
+    assert exit_code == 1
+    assert "needs to ask for input, which is not possible with --client" in output
+    assert "Traceback" not in output
+
+
+def test_job_does_not_report_server_memory(tmp_path: Path):
+    _release_folder(tmp_path / "release")
+    exit_code, output = _run_job(
+        tmp_path, "releasesch", "release", "-t", "Title", "-pub", "Pub", "-ch", "1", "--no-tag"
+    )
+    assert exit_code == 0, output
+    assert "Done! (Took" in output
+    assert "peak memory" not in output
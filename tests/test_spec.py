@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from nn.spec import SpecError, load_release_spec
+
+
+def _write_spec(tmp_path: Path, data: dict, suffix: str = ".json") -> Path:
+    spec_file = tmp_path / f"spec{suffix}"
+    spec_file.write_text(json.dumps(data), encoding="utf-8")
+    return spec_file
+
+
+def test_load_release_spec(tmp_path: Path):
+    spec = load_release_spec(
+        _write_spec(
+            tmp_path,
+            {
+                "volume": 2,
+                "chapters": [
+                    {"number": 1, "range": "1-20", "title": "The Beginning"},
+                    {"number": 1.5, "range": "21"},
+                ],
+                "special_naming": {"1": "Cover"},
+            },
+        )
+    )
+    assert spec.volume == 2
+    assert [chapter.number for chapter in spec.chapters] == [1, 1.5]
+    assert spec.chapters.find(30).number == 1.5
+    assert spec.special_naming == {1: "Cover"}
+
+
+def test_load_release_spec_yaml(tmp_path: Path):
+    pytest.importorskip("yaml")
+    spec_file = tmp_path / "spec.yaml"
+    spec_file.write_text("chapters:\n  - number: 1\n    range: 1-5\n", encoding="utf-8")
+    assert len(load_release_spec(spec_file).chapters) == 1
+
+
+@pytest.mark.parametrize("page_range", ["5-3", "1-2-3", "a-b", ""])
+def test_load_release_spec_invalid_range(tmp_path: Path, page_range: str):
+    spec_file = _write_spec(tmp_path, {"chapters": [{"number": 1, "range": page_range}]})
+    with pytest.raises(SpecError):
+        load_release_spec(spec_file)
+
+
+def test_load_release_spec_overlap(tmp_path: Path):
+    spec_file = _write_spec(tmp_path, {"chapters": [{"number": 1, "range": "1-10"}, {"number": 2, "range": "10-12"}]})
+    with pytest.raises(SpecError):
+        load_release_spec(spec_file)
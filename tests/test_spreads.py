@@ -0,0 +1,114 @@
+import math
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from nn.cli import spreads_manager
+from nn.cmd import main
+from nn.spreads import SplitOffset, detect_spreads, join_spread, split_spread
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _gradient_page(path: Path, width: int, height: int, shift: int = 0):
+    im = Image.new("RGB", (width, height))
+    im.putdata([((x + shift) * 3 % 256, y * 5 % 256, (x * y) % 256) for y in range(height) for x in range(width)])
+    im.save(path)
+
+
+def _edge_page(path: Path, left_frequency: float, right_frequency: float, width: int = 40, height: int = 90):
+    """A page that fades from one wave on the left edge to another one on the right edge."""
+    waves = [
+        [128 + 100 * math.sin(y * frequency) for y in range(height)] for frequency in (left_frequency, right_frequency)
+    ]
+    im = Image.new("L", (width, height))
+    im.putdata(
+        [
+            round(waves[0][y] + (waves[1][y] - waves[0][y]) * x / (width - 1))
+            for y in range(height)
+            for x in range(width)
+        ]
+    )
+    im.save(path)
+
+
+def test_join_and_split_round_trip(tmp_path: Path):
+    left, right = tmp_path / "p001.png", tmp_path / "p002.png"
+    _gradient_page(left, 60, 80)
+    _gradient_page(right, 60, 80, shift=60)
+
+    joined = join_spread([left, right], tmp_path / "p001-002.png", 90)
+    with Image.open(joined) as im:
+        assert im.size == (120, 80)
+
+    outputs = (tmp_path / "a.png", tmp_path / "b.png")
+    assert split_spread(joined, outputs, 90) == SplitOffset(120, 60)
+    for original, output in zip((left, right), outputs):
+        with Image.open(original) as original_im, Image.open(output) as output_im:
+            assert output_im.size == (60, 80)
+            assert output_im.tobytes() == original_im.tobytes()
+
+
+def test_join_pads_shorter_page(tmp_path: Path):
+    _gradient_page(tmp_path / "p001.png", 50, 80)
+    _gradient_page(tmp_path / "p002.png", 40, 60)
+    joined = join_spread([tmp_path / "p001.png", tmp_path / "p002.png"], tmp_path / "p001-002.png", 90)
+    with Image.open(joined) as im:
+        assert im.size == (90, 80)
+        assert im.getpixel((89, 79)) == (255, 255, 255)
+
+
+def test_split_with_magick_backend(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    _gradient_page(tmp_path / "p001-002.png", 120, 80)
+    commands: List[List[str]] = []
+
+    def _fake_magick(command: List[str], **kwargs):
+        commands.append(command)
+        output = Path(command[-1])
+        for index in range(2):
+            (output.parent / f"{output.stem}-{index}{output.suffix}").write_bytes(b"")
+
+    def _no_pillow(*args, **kwargs):
+        raise AssertionError("Pillow backend used")
+
+    monkeypatch.setattr(spreads_manager, "test_or_find_magick", lambda magick_path, force_search: "/usr/bin/magick")
+    monkeypatch.setattr(spreads_manager.sp, "run", _fake_magick)
+    monkeypatch.setattr(spreads_manager, "split_spread", _no_pillow)
+
+    args = ["spreads", "split", str(tmp_path), "-b", "magick", "-gw", "0"]
+    main.main(args=args, prog_name="nn", standalone_mode=False)
+    assert len(commands) == 1
+    assert commands[0][:2] == ["magick", "convert"]
+    assert "50%x100%" in commands[0]
+    assert (tmp_path / "p001.png").exists()
+    assert (tmp_path / "p002.png").exists()
+    assert (tmp_path / "backup" / "p001-002.png").exists()
+
+
+def test_detect_spreads(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # 1-2 continue through the gutter, 3-4 do not
+    _edge_page(tmp_path / "p001.png", 0.11, 0.23)
+    _edge_page(tmp_path / "p002.png", 0.23, 0.05)
+    _edge_page(tmp_path / "p003.png", 0.37, 0.17)
+    _edge_page(tmp_path / "p004.png", 0.61, 0.29)
+    # Both continue page 4, but it's unknown which one is the real page 5
+    _edge_page(tmp_path / "p005.png", 0.29, 0.41)
+    _edge_page(tmp_path / "Alt - p005.png", 0.29, 0.41)
+
+    pages = {number: tmp_path / f"p{number:03d}.png" for number in range(1, 6)}
+    candidates = detect_spreads(pages, max_workers=1)
+    assert [(x.first, x.second) for x in candidates] == [(1, 2), (4, 5)]
+    assert candidates[0].score > 0.9
+
+    detected: Dict[str, list] = {}
+
+    def _record_detect(pages, *args):
+        detected["pages"] = sorted(pages)
+        detected["candidates"] = detect_spreads(pages, *args)
+        return detected["candidates"]
+
+    monkeypatch.setattr(spreads_manager, "detect_spreads", _record_detect)
+    main.main(args=["spreads", "detect", str(tmp_path), "-j", "1"], prog_name="nn", standalone_mode=False)
+    assert detected["pages"] == [1, 2, 3, 4]
+    assert [(x.first, x.second) for x in detected["candidates"]] == [(1, 2)]
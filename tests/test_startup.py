@@ -0,0 +1,62 @@
+"""
+The CLI must start without importing the heavy dependencies, they are only needed by the commands.
+
+Each check runs in a fresh interpreter, since the other tests import them.
+"""
+
+import json
+import os
+import subprocess as sp
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("PIL", "numpy", "lxml", "py7zr", "ftfy", "rarfile", "unrar")
+# Loose on purpose, only catches something like an eager import of every command
+STARTUP_LIMIT = 5.0
+
+_CHECK_SCRIPT = """
+import json
+import sys
+
+{code}
+
+loaded = sorted({{name.split(".")[0] for name in sys.modules}}.intersection({heavy!r}))
+sys.stdout.write("\\n" + json.dumps(loaded))
+"""
+
+
+def _run(code: str, tmp_path: Path):
+    env = os.environ.copy()
+    env["HOME"] = str(tmp_path)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT_DIR), env.get("PYTHONPATH")]))
+    script = _CHECK_SCRIPT.format(code=code, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    proc = sp.run([sys.executable, "-c", script], cwd=str(tmp_path), env=env, stdout=sp.PIPE, stderr=sp.PIPE)
+    elapsed = time.perf_counter() - start
+    assert proc.returncode == 0, proc.stderr.decode("utf-8", "replace")
+    output = proc.stdout.decode("utf-8").rstrip().rsplit("\n", 1)[-1]
+    return json.loads(output), elapsed
+
+
+def test_import_cmd_is_light(tmp_path: Path):
+    loaded, elapsed = _run("import nn.cmd", tmp_path)
+    assert loaded == []
+    assert elapsed < STARTUP_LIMIT
+
+
+@pytest.mark.parametrize("args", [["--help"], ["releases", "--help"], ["spreads", "--help"]])
+def test_help_is_light(tmp_path: Path, args):
+    code = f"""
+from nn.cmd import main
+try:
+    main(args={args!r}, prog_name="nn")
+except SystemExit as exc:
+    assert exc.code in (0, None), exc.code
+"""
+    loaded, elapsed = _run(code, tmp_path)
+    assert loaded == []
+    assert elapsed < STARTUP_LIMIT
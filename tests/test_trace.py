@@ -0,0 +1,36 @@
+import json
+from pathlib import Path
+
+from nn import trace
+from nn.cmd import main
+
+
+def _release_folder(folder: Path) -> Path:
+    folder.mkdir()
+    for page in range(1, 4):
+        (folder / f"p{page:03d}.jpg").write_bytes(b"\xff\xd8\xff\xd9")
+    return folder
+
+
+def _run_traced(folder: Path, trace_file: Path):
+    args = ["--trace", str(trace_file), "releasesch", str(folder), "-t", "Title", "-pub", "Pub", "-ch", "1", "--no-tag"]
+    main.main(args=args, prog_name="nn", standalone_mode=False)
+
+
+def test_write_trace_without_tracing(tmp_path: Path):
+    assert trace.write_trace(tmp_path / "trace.json") == 0
+    assert not (tmp_path / "trace.json").exists()
+
+
+def test_trace_twice_in_one_process(tmp_path: Path):
+    # The same process traces job after job in `nn serve`
+    for index in range(2):
+        trace_file = tmp_path / f"trace-{index}.json"
+        _run_traced(_release_folder(tmp_path / f"release-{index}"), trace_file)
+
+        trace_data = json.loads(trace_file.read_text(encoding="utf-8"))
+        events = trace_data["traceEvents"]
+        process_names = [event for event in events if event["ph"] == "M"]
+        assert [event["args"]["name"] for event in process_names] == ["nn"]
+        assert any(event["ph"] == "X" for event in events)
+        assert not trace.is_tracing()
@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from nn.cli.watch import (
+    WATCH_LOG_NAME,
+    WORK_DIR_NAME,
+    _claim_entry,
+    _finish_job,
+    _parse_steps,
+    _recover_interrupted,
+    _run_watch_job,
+)
+from nn.watcher import InboxWatcher
+
+_SETTLE_TIME = 0.3
+
+
+def _poll_until_settled(watcher: InboxWatcher, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        settled = watcher.poll()
+        if settled:
+            return settled
+    return []
+
+
+def test_entry_reported_once_settled(tmp_path: Path):
+    release = tmp_path / "release.cbz"
+    release.write_bytes(b"a" * 10)
+    with InboxWatcher(tmp_path, settle_time=_SETTLE_TIME, poll_interval=0.05, force_poll=True) as watcher:
+        assert watcher.poll() == []
+        # Still being copied
+        last_change = time.monotonic()
+        for size in range(20, 60, 10):
+            release.write_bytes(b"a" * size)
+            last_change = time.monotonic()
+            assert watcher.poll() == []
+
+        assert _poll_until_settled(watcher) == [release]
+        assert time.monotonic() - last_change >= _SETTLE_TIME
+
+
+def test_partial_downloads_are_ignored(tmp_path: Path):
+    for name in ("release.cbz.part", "release.tmp", ".hidden.cbz", "~lock.cbz"):
+        (tmp_path / name).write_bytes(b"a")
+    (tmp_path / "release.cbz").write_bytes(b"a")
+    with InboxWatcher(tmp_path, settle_time=_SETTLE_TIME, poll_interval=0.05, force_poll=True) as watcher:
+        assert _poll_until_settled(watcher) == [tmp_path / "release.cbz"]
+
+
+def test_failed_job_moved_to_quarantine(tmp_path: Path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    entry = inbox / "release.cbz"
+    entry.write_bytes(b"a")
+    # Missing the required options, the step fails with a usage error
+    steps = _parse_steps(None, None, ("releases {input}",))
+
+    job = _claim_entry(entry, inbox / WORK_DIR_NAME, steps)
+    assert job is not None
+    assert not entry.exists()
+    future: Future = Future()
+    future.set_result(_run_watch_job(job))
+    assert not future.result().success
+
+    _finish_job(job, future, tmp_path / "outbox", tmp_path / "quarantine")
+    quarantined = tmp_path / "quarantine" / "release"
+    assert (quarantined / "release.cbz").read_bytes() == b"a"
+    log = (quarantined / WATCH_LOG_NAME).read_text(encoding="utf-8")
+    assert "Step 1/1: nn releases" in log
+    assert "Failed: step 1 (releases) failed" in log
+    assert not (tmp_path / "outbox").exists()
+    assert list((inbox / WORK_DIR_NAME).iterdir()) == []
+
+
+def test_interrupted_job_quarantined_on_startup(tmp_path: Path):
+    workdir = tmp_path / "inbox" / WORK_DIR_NAME / "release"
+    workdir.mkdir(parents=True)
+    (workdir / "release.cbz").write_bytes(b"a")
+
+    _recover_interrupted(workdir.parent, tmp_path / "quarantine")
+    quarantined = tmp_path / "quarantine" / "release"
+    assert (quarantined / "release.cbz").read_bytes() == b"a"
+    assert "interrupted" in (quarantined / WATCH_LOG_NAME).read_text(encoding="utf-8")
+    assert list(workdir.parent.iterdir()) == []
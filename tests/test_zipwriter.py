@@ -0,0 +1,51 @@
+import stat
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from nn.zipwriter import ZipSource, read_first_local_header, write_zip
+
+
+def test_write_zip(tmp_path: Path):
+    image_path = tmp_path / "image.png"
+    image_path.write_bytes(b"\x89PNG" + bytes(range(256)) * 4)
+    image_path.chmod(0o644)
+    target = tmp_path / "book.epub"
+
+    written = write_zip(
+        target,
+        [
+            ZipSource("mimetype", b"application/epub+zip", compress=False),
+            ZipSource("OEBPS/content.opf", b"<package/>" * 100),
+            ZipSource("OEBPS/Images/image.png", image_path),
+        ],
+        max_workers=2,
+    )
+    assert written == 3
+    assert not list(tmp_path.glob(".*.nntmp"))
+
+    with zipfile.ZipFile(target) as zip_file:
+        assert zip_file.testzip() is None
+        infos = zip_file.infolist()
+        assert [info.filename for info in infos] == ["mimetype", "OEBPS/content.opf", "OEBPS/Images/image.png"]
+        assert infos[0].compress_type == zipfile.ZIP_STORED
+        assert infos[1].compress_type == zipfile.ZIP_DEFLATED
+        assert all(info.create_system == 3 for info in infos)
+        assert stat.S_IMODE(infos[2].external_attr >> 16) == 0o644
+        assert zip_file.read("OEBPS/Images/image.png") == image_path.read_bytes()
+
+    header = read_first_local_header(target)
+    assert header is not None
+    assert header.name == "mimetype"
+    assert header.extra_size == 0
+
+
+def test_write_zip_failure_keeps_target(tmp_path: Path):
+    target = tmp_path / "book.epub"
+    target.write_bytes(b"previous")
+
+    with pytest.raises(FileNotFoundError):
+        write_zip(target, [ZipSource("a.txt", b"a"), ZipSource("missing.png", tmp_path / "missing.png")])
+    assert target.read_bytes() == b"previous"
+    assert not list(tmp_path.glob(".*.nntmp"))